@@ -0,0 +1,354 @@
+"""
+Per-stage pipeline benchmarks.
+
+Runs each processing stage on synthetic feedback, records throughput
+and peak Python memory, writes the results to JSON and optionally
+compares them with a stored baseline.
+
+Usage:
+    python benchmarks/run_benchmarks.py --sizes 1k,100k
+    python benchmarks/run_benchmarks.py --sizes 1k --compare benchmarks/baseline.json
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+import shutil
+import argparse
+import platform
+import tempfile
+import tracemalloc
+from datetime import datetime
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# The storage stage writes to a throwaway database, never data/feedback.db
+_BENCH_DIR = tempfile.mkdtemp(prefix="feedback_bench_")
+atexit.register(shutil.rmtree, _BENCH_DIR, ignore_errors=True)
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_BENCH_DIR, 'bench.db')}"
+
+import numpy as np
+import pandas as pd
+
+from synthetic import generate_feedback, FILLER, POSITIVE, NEGATIVE, NEUTRAL, TOPICS
+from processing.cleaner import clean_text, clean_batch
+from processing.categorizer import categorize_batch
+from processing.sentiment import SentimentAnalyzer
+from intelligence.clustering import IssueClusterIndex
+from intelligence.priority import calculate_priority_batch
+from intelligence.trend import analyze_sentiment_trend
+from database.db import engine
+from database.models import Base
+from services.storage_service import compute_feedback_keys, store_to_database
+
+
+# Configuration
+DEFAULT_SIZES = "1k,100k"
+DEFAULT_OUTPUT_DIR = os.path.join(ROOT_DIR, "data", "benchmarks")
+REGRESSION_THRESHOLD = 0.2        # 20% slower or larger counts as a regression
+TRANSFORMER_MAX_ROWS = 2000       # the stand-in model is slow on large sizes
+DEFAULT_REPEAT = 3                # timed runs per stage; the fastest is kept
+MIN_COMPARE_SECONDS = 0.01        # faster stages are timer noise, not compared
+
+STAGES = [
+    'clean_text', 'clean_batch', 'vader_sentiment', 'transformer_sentiment', 'categorize_feedback',
+    'issue_clustering', 'calculate_priority', 'store_to_database', 'analyze_sentiment_trend'
+]
+
+
+def parse_size(value: str) -> int:
+    """Parse sizes like '1k', '100k' or '1M'."""
+    value = value.strip().lower()
+    multiplier = {'k': 1_000, 'm': 1_000_000}.get(value[-1:], 1)
+    return int(float(value.rstrip('km')) * multiplier)
+
+
+def build_tiny_transformer():
+    """
+    Build a tiny randomly initialized DistilBERT sentiment pipeline.
+    
+    Exercises the same tokenization, batching and pipeline code as the
+    real model, offline and fast; its predictions are meaningless.
+    
+    Returns:
+        HuggingFace pipeline, or None when transformers/torch are missing
+    """
+    try:
+        import torch
+        from transformers import (
+            BertTokenizerFast, DistilBertConfig, DistilBertForSequenceClassification, pipeline
+        )
+    except ImportError:
+        return None
+    
+    words = sorted({word for phrase in FILLER + POSITIVE + NEGATIVE + NEUTRAL + TOPICS for word in phrase.split()})
+    tokens = ['[PAD]', '[UNK]', '[CLS]', '[SEP]', '[MASK]'] + words
+    with tempfile.TemporaryDirectory() as tmp:
+        vocab_path = os.path.join(tmp, "vocab.txt")
+        with open(vocab_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(tokens))
+        tokenizer = BertTokenizerFast(vocab_file=vocab_path, do_lower_case=True)
+    
+    config = DistilBertConfig(
+        vocab_size=len(tokens), dim=32, hidden_dim=64, n_layers=2, n_heads=2,
+        id2label={0: 'NEGATIVE', 1: 'POSITIVE'}, label2id={'NEGATIVE': 0, 'POSITIVE': 1}
+    )
+    torch.manual_seed(0)
+    model = DistilBertForSequenceClassification(config).eval()
+    return pipeline("sentiment-analysis", model=model, tokenizer=tokenizer, truncation=True)
+
+
+def prepare_inputs(df: pd.DataFrame, seed: int) -> dict:
+    """Precompute the inputs each stage consumes, outside the timed sections."""
+    rng = np.random.default_rng(seed)
+    cleaned = clean_batch(df['content'])
+    scores = rng.uniform(-1, 1, len(df))
+    
+    processed = df.copy()
+    processed['feedback_key'] = compute_feedback_keys(processed)
+    processed['sentiment_score'] = scores
+    processed['sentiment_label'] = np.where(scores >= 0.05, 'positive', np.where(scores <= -0.05, 'negative', 'neutral'))
+    processed['category'] = rng.choice(['Bug', 'Feature Request', 'Performance', 'UI/UX', 'Other'], len(df))
+    processed['priority_score'] = np.round(rng.uniform(0, 100, len(df)), 2)
+    processed['cluster_id'] = rng.integers(1, max(2, len(df) // 10), len(df))
+    
+    return {
+        'raw': df['content'].tolist(),
+        'cleaned': cleaned,
+        'scores': scores,
+        'frequencies': rng.integers(1, 500, len(df)),
+        'recency_days': rng.integers(0, 40, len(df)),
+        'processed': processed,
+    }
+
+
+def make_stages(inputs: dict, tiny_transformer) -> dict:
+    """
+    Build the stage callables for one dataset.
+    
+    Returns:
+        dict of stage name -> (callable, rows processed, untimed setup
+        callable or None), or None when the stage cannot run here
+    """
+    analyzer = SentimentAnalyzer()
+    
+    def run_transformer():
+        transformer_analyzer = SentimentAnalyzer()
+        transformer_analyzer._transformer = tiny_transformer
+        transformer_analyzer.transformer_sentiment_batch(inputs['cleaned'][:TRANSFORMER_MAX_ROWS])
+    
+    def reset_database():
+        Base.metadata.drop_all(engine)
+    
+    rows = len(inputs['raw'])
+    return {
+        'clean_text': (lambda: [clean_text(text) for text in inputs['raw']], rows, None),
+        'clean_batch': (lambda: clean_batch(inputs['raw']), rows, None),
+        'vader_sentiment': (lambda: analyzer.vader_sentiment_batch(inputs['cleaned']), rows, None),
+        'transformer_sentiment': (
+            (run_transformer, min(rows, TRANSFORMER_MAX_ROWS), None) if tiny_transformer is not None else None
+        ),
+        'categorize_feedback': (lambda: categorize_batch(pd.Series(inputs['cleaned'], dtype=object)), rows, None),
+        'issue_clustering': (lambda: IssueClusterIndex().assign_batch(inputs['cleaned']), rows, None),
+        'calculate_priority': (
+            lambda: calculate_priority_batch(inputs['scores'], inputs['frequencies'], inputs['recency_days']),
+            rows, None
+        ),
+        'store_to_database': (lambda: store_to_database(inputs['processed']), rows, reset_database),
+        'analyze_sentiment_trend': (
+            lambda: analyze_sentiment_trend(inputs['processed'][['date', 'sentiment_score']]),
+            rows, None
+        ),
+    }
+
+
+def measure(func, rows: int, track_memory: bool, setup=None, repeat: int = DEFAULT_REPEAT) -> dict:
+    """
+    Time a stage (best of repeat runs), then optionally rerun it under tracemalloc.
+    
+    setup, if given, runs untimed before each run.
+    
+    Memory is measured in a separate run because tracing slows Python
+    code down. It covers Python and NumPy allocations, not memory held
+    by native libraries such as SQLite or torch.
+    """
+    wall, cpu = None, None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start_wall, start_cpu = time.perf_counter(), time.process_time()
+        func()
+        elapsed = time.perf_counter() - start_wall
+        if wall is None or elapsed < wall:
+            wall, cpu = elapsed, time.process_time() - start_cpu
+    
+    result = {
+        'rows': rows,
+        'seconds': round(wall, 4),
+        'cpu_seconds': round(cpu, 4),
+        'rows_per_sec': round(rows / wall, 1) if wall > 0 else None,
+        'peak_mb': None,
+    }
+    if track_memory:
+        if setup is not None:
+            setup()
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result['peak_mb'] = round(peak / 2 ** 20, 2)
+    return result
+
+
+def run_benchmarks(sizes: list, stages: list, seed: int, length_profile: str,
+                   duplicate_ratio: float, emoji_rate: float, url_rate: float,
+                   track_memory: bool = True, repeat: int = DEFAULT_REPEAT) -> dict:
+    """
+    Run the selected stages for every dataset size.
+    
+    Returns:
+        Benchmark report dict (see write_report)
+    """
+    tiny_transformer = build_tiny_transformer() if 'transformer_sentiment' in stages else None
+    results = []
+    
+    for size in sizes:
+        print(f"\nGenerating {size:,} synthetic reviews...")
+        df = generate_feedback(size, seed, length_profile, duplicate_ratio, emoji_rate, url_rate)
+        inputs = prepare_inputs(df, seed)
+        stage_funcs = make_stages(inputs, tiny_transformer)
+        
+        for stage in stages:
+            if stage_funcs[stage] is None:
+                print(f"  {stage:26s} skipped (transformers/torch not installed)")
+                continue
+            func, rows, setup = stage_funcs[stage]
+            result = measure(func, rows, track_memory, setup, repeat)
+            result.update({'size': size, 'stage': stage})
+            results.append(result)
+            peak = f"{result['peak_mb']:9.1f} MB" if result['peak_mb'] is not None else ""
+            print(f"  {stage:26s} {result['seconds']:9.3f}s {result['rows_per_sec'] or 0:14,.0f} rows/s {peak}")
+    
+    return {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {
+            'seed': seed,
+            'length_profile': length_profile,
+            'duplicate_ratio': duplicate_ratio,
+            'emoji_rate': emoji_rate,
+            'url_rate': url_rate,
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def compare_reports(current: dict, baseline: dict, threshold: float = REGRESSION_THRESHOLD) -> list:
+    """
+    Compare a report with a baseline report.
+    
+    A stage regresses when its throughput drops, or its peak memory
+    grows, by more than threshold (as a fraction). Throughput of stages
+    finishing within MIN_COMPARE_SECONDS is not compared.
+    
+    Returns:
+        List of regression description strings (empty = no regressions)
+    """
+    if current['config'] != baseline['config']:
+        print("Warning: baseline was generated with a different dataset config")
+    
+    previous = {(r['size'], r['stage']): r for r in baseline['results']}
+    regressions = []
+    print(f"\n{'stage':26s} {'size':>9s} {'baseline/s':>14s} {'current/s':>14s} {'change':>8s}")
+    for result in current['results']:
+        base = previous.get((result['size'], result['stage']))
+        if base is None or not base['rows_per_sec'] or not result['rows_per_sec']:
+            continue
+        
+        change = result['rows_per_sec'] / base['rows_per_sec'] - 1
+        flag = ''
+        if max(result['seconds'], base['seconds']) < MIN_COMPARE_SECONDS:
+            flag = '  (too fast to compare)'
+        elif change < -threshold:
+            flag = '  REGRESSION'
+            regressions.append(f"{result['stage']} @ {result['size']:,}: throughput {change:+.0%}")
+        if base['peak_mb'] and result['peak_mb'] and result['peak_mb'] > base['peak_mb'] * (1 + threshold):
+            flag = '  REGRESSION'
+            regressions.append(
+                f"{result['stage']} @ {result['size']:,}: peak memory {base['peak_mb']} -> {result['peak_mb']} MB"
+            )
+        print(f"{result['stage']:26s} {result['size']:>9,} {base['rows_per_sec']:>14,.0f} "
+              f"{result['rows_per_sec']:>14,.0f} {change:>+8.0%}{flag}")
+    return regressions
+
+
+def write_report(report: dict, path: str) -> str:
+    """Write a benchmark report as JSON and return its path."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def main():
+    """Parse arguments, run the benchmarks and compare with a baseline."""
+    parser = argparse.ArgumentParser(description="Per-stage pipeline benchmarks")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated sizes, e.g. 1k,100k,1M")
+    parser.add_argument("--stages", default=",".join(STAGES), help="Comma-separated stage names")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--length-profile", default="mixed", choices=["short", "mixed", "long"])
+    parser.add_argument("--duplicate-ratio", type=float, default=0.2)
+    parser.add_argument("--emoji-rate", type=float, default=0.1)
+    parser.add_argument("--url-rate", type=float, default=0.05)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Timed runs per stage (best is kept)")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc memory pass")
+    parser.add_argument("--output", help="Result JSON path (default: data/benchmarks/benchmark_<timestamp>.json)")
+    parser.add_argument("--compare", metavar="BASELINE", help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="Allowed slowdown / memory growth before flagging (fraction)")
+    args = parser.parse_args()
+    
+    stages = [stage.strip() for stage in args.stages.split(",") if stage.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))} (expected: {', '.join(STAGES)})")
+    
+    report = run_benchmarks(
+        [parse_size(size) for size in args.sizes.split(",")],
+        stages,
+        seed=args.seed,
+        length_profile=args.length_profile,
+        duplicate_ratio=args.duplicate_ratio,
+        emoji_rate=args.emoji_rate,
+        url_rate=args.url_rate,
+        track_memory=not args.no_memory,
+        repeat=args.repeat,
+    )
+    
+    output = args.output or os.path.join(
+        DEFAULT_OUTPUT_DIR, f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    print(f"\nResults saved to {write_report(report, output)}")
+    
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_reports(report, baseline, args.threshold)
+        if regressions:
+            print("\nRegressions:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            sys.exit(1)
+        print("\nNo regressions.")
+
+
+if __name__ == "__main__":
+    main()
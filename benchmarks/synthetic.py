@@ -0,0 +1,108 @@
+"""
+Synthetic feedback generator.
+
+Builds deterministic review datasets for benchmarks, with control over
+size, text length, duplicate share and emoji/URL density.
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+
+# Phrase pools; category keywords come from the categorizer's vocabulary
+POSITIVE = ['great', 'love it', 'excellent', 'works well', 'very good', 'amazing', 'nice update', 'smooth']
+NEGATIVE = ['terrible', 'awful', 'hate', 'worst app', 'disappointed', 'useless', 'annoying', 'bad']
+NEUTRAL = ['ok', 'fine i guess', 'it is an app', 'average', 'no opinion']
+TOPICS = [
+    'it keeps crashing', 'there is a bug in chat', 'login error after update', 'the app freezes',
+    'please add dark mode', 'i wish it had backups', 'feature request for stickers',
+    'so slow to load', 'battery drain is heavy', 'lag when scrolling',
+    'the ui is confusing', 'new layout looks ugly', 'button is hard to find',
+]
+FILLER = [
+    'the', 'app', 'when', 'i', 'open', 'my', 'phone', 'messages', 'today', 'again',
+    'after', 'using', 'for', 'months', 'and', 'still', 'but', 'with', 'friends', 'video',
+]
+EMOJIS = ['😀', '😡', '👍', '👎', '❤', '😢', '🔥', '⭐']
+URLS = ['https://example.com/help', 'www.example.org/faq', 'http://bit.ly/x1y2']
+
+# Word-count distributions
+LENGTH_PROFILES = {
+    'short': (1, 6),      # uniform word count range
+    'mixed': None,        # log-normal, median ~12 words
+    'long': (60, 300),
+}
+
+SOURCES = ['google_play', 'CSV Upload', 'HuggingFace Dataset']
+
+
+def _word_counts(rng, size: int, profile: str) -> np.ndarray:
+    """Draw the number of words per review for a length profile."""
+    if profile not in LENGTH_PROFILES:
+        raise ValueError(f"Unknown length profile: {profile} (expected one of {list(LENGTH_PROFILES)})")
+    bounds = LENGTH_PROFILES[profile]
+    if bounds is None:
+        return np.clip(rng.lognormal(mean=2.5, sigma=0.8, size=size), 1, 400).astype(int)
+    return rng.integers(bounds[0], bounds[1] + 1, size=size)
+
+
+def generate_feedback(size: int, seed: int = 42, length_profile: str = 'mixed',
+                      duplicate_ratio: float = 0.2, emoji_rate: float = 0.1,
+                      url_rate: float = 0.05) -> pd.DataFrame:
+    """
+    Generate a deterministic synthetic feedback dataset.
+    
+    Args:
+        size: Number of reviews
+        seed: Random seed (same arguments always give the same data)
+        length_profile: 'short', 'mixed' or 'long'
+        duplicate_ratio: Share of reviews copied verbatim from another review
+        emoji_rate: Probability that a review contains emojis
+        url_rate: Probability that a review contains a URL
+    
+    Returns:
+        DataFrame with columns: id, content, rating, date, source
+    """
+    rng = np.random.default_rng(seed)
+    word_counts = _word_counts(rng, size, length_profile)
+    tone = rng.choice(3, size=size, p=[0.45, 0.35, 0.2])  # positive, negative, neutral
+    has_topic = rng.random(size) < 0.6
+    has_emoji = rng.random(size) < emoji_rate
+    has_url = rng.random(size) < url_rate
+    
+    contents = []
+    for i in range(size):
+        pool = (POSITIVE, NEGATIVE, NEUTRAL)[tone[i]]
+        parts = [pool[rng.integers(len(pool))]]
+        if has_topic[i]:
+            parts.append(TOPICS[rng.integers(len(TOPICS))])
+        remaining = max(0, word_counts[i] - sum(len(part.split()) for part in parts))
+        if remaining:
+            parts.append(' '.join(rng.choice(FILLER, size=remaining)))
+        if has_emoji[i]:
+            parts.append(''.join(rng.choice(EMOJIS, size=rng.integers(1, 4))))
+        if has_url[i]:
+            parts.append(URLS[rng.integers(len(URLS))])
+        text = ' '.join(parts)
+        contents.append(text[0].upper() + text[1:] + '.')
+    
+    # Replace a share of reviews with verbatim copies of other reviews
+    duplicates = np.flatnonzero(rng.random(size) < duplicate_ratio)
+    if len(duplicates):
+        originals = rng.integers(0, size, size=len(duplicates))
+        for target, source in zip(duplicates, originals):
+            contents[target] = contents[source]
+    
+    ratings = np.where(tone == 0, rng.integers(4, 6, size), np.where(tone == 1, rng.integers(1, 3, size), 3))
+    start = datetime(2024, 1, 1)
+    seconds = rng.integers(0, 30 * 86400, size=size)
+    
+    return pd.DataFrame({
+        'id': np.arange(1, size + 1),
+        'content': contents,
+        'rating': ratings.astype(float),
+        'date': pd.to_datetime([start + timedelta(seconds=int(s)) for s in seconds]),
+        'source': np.array(SOURCES)[rng.integers(0, len(SOURCES), size=size)],
+    })
@@ -0,0 +1,52 @@
+"""
+Transformer backend parity check.
+
+Scores a fixed feedback sample with the full-precision model and another
+inference backend, and reports label agreement, score drift and timing.
+
+Usage:
+    python check_backend_parity.py --backend int8
+    python check_backend_parity.py --backend onnx --sample 500
+"""
+
+import os
+import sys
+import argparse
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from fetchers.csv_loader import load_feedback_from_csv
+from processing.cleaner import clean_text
+from processing.sentiment import TRANSFORMER_BACKENDS, compare_backends
+
+
+DEFAULT_SAMPLE_CSV = "data/external_feedback.csv"
+DEFAULT_SAMPLE_SIZE = 1000
+
+
+def main():
+    """Run the parity check and print a summary."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backend", choices=[b for b in TRANSFORMER_BACKENDS if b != 'pytorch'], default="int8")
+    parser.add_argument("--csv", default=DEFAULT_SAMPLE_CSV, help="Feedback CSV to sample")
+    parser.add_argument("--sample", type=int, default=DEFAULT_SAMPLE_SIZE, help="Number of rows (first N)")
+    args = parser.parse_args()
+    
+    df = load_feedback_from_csv(args.csv)
+    texts = [clean_text(text) for text in df['content'].head(args.sample)]
+    
+    print(f"Comparing '{args.backend}' against 'pytorch' on {len(texts)} texts from {args.csv}...")
+    report = compare_backends(texts, args.backend)
+    
+    print(f"  Label agreement:      {report['label_agreement']:.2%}")
+    print(f"  Mean |score diff|:    {report['mean_abs_score_diff']:.4f}")
+    print(f"  Max |score diff|:     {report['max_abs_score_diff']:.4f}")
+    for name, seconds in report['seconds'].items():
+        print(f"  {name:8s} inference:   {seconds:.2f}s")
+    speedup = report['seconds']['pytorch'] / max(report['seconds'][args.backend], 1e-9)
+    print(f"  Speedup:              {speedup:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
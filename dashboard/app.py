@@ -5,11 +5,34 @@ Interactive dashboard for visualizing feedback insights and analytics.
 """
 
 import os
+import sys
 import glob
+from datetime import date
+
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
 
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(ROOT_DIR, "data")
+sys.path.insert(0, os.path.join(ROOT_DIR, "src"))
+
+from services.parquet_store import has_parquet_store, load_feedback, partition_values, store_version
+
+
+PARQUET_STORE_DIR = os.path.join(DATA_DIR, "processed_feedback")
+
+# Columns the dashboard reads from the Parquet store
+DASHBOARD_COLUMNS = [
+    'date', 'source', 'content', 'sentiment_label',
+    'sentiment_score', 'category', 'priority_score'
+]
+
+
+# Cache sizes: loaded frames and per-filter derived views kept in memory
+LOAD_CACHE_ENTRIES = 4
+VIEW_CACHE_ENTRIES = 32
+
 
 # Page configuration
 st.set_page_config(
@@ -19,24 +42,74 @@ st.set_page_config(
 )
 
 
-def load_latest_csv():
-    """Load the most recent processed CSV file from data/ folder."""
-    data_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
-    csv_files = glob.glob(os.path.join(data_dir, "processed_feedback_*.csv"))
+def latest_csv_path():
+    """Return the most recent processed CSV file in data/, or None."""
+    csv_files = glob.glob(os.path.join(DATA_DIR, "processed_feedback_*.csv"))
     
     if not csv_files:
         return None
     
     # Get most recent file
-    latest_file = max(csv_files, key=os.path.getctime)
-    df = pd.read_csv(latest_file)
+    return max(csv_files, key=os.path.getctime)
+
+
+def data_version():
+    """
+    Fingerprint the current data.
+    
+    Cached loaders are keyed on this value, so a new pipeline run
+    invalidates them while widget reruns reuse the loaded frames. The
+    Parquet store is identified by the version marker each export
+    rewrites, so no dataset files are listed on a rerun.
+    """
+    if has_parquet_store(PARQUET_STORE_DIR):
+        return ('parquet', store_version(PARQUET_STORE_DIR))
+    
+    latest_file = latest_csv_path()
+    if latest_file is None:
+        return None
+    return ('csv', latest_file, os.path.getmtime(latest_file))
+
+
+# Loaded frames are shared (not copied) across reruns and must be treated
+# as read-only; max_entries bounds how many stay in memory.
+@st.cache_resource(max_entries=LOAD_CACHE_ENTRIES)
+def load_csv(path, mtime):
+    """Load a processed CSV file (mtime is part of the cache key)."""
+    df = pd.read_csv(path)
     df['date'] = pd.to_datetime(df['date'])
     return df
 
 
+def load_latest_csv():
+    """Load the most recent processed CSV file from data/ folder."""
+    latest_file = latest_csv_path()
+    if latest_file is None:
+        return None
+    return load_csv(latest_file, os.path.getmtime(latest_file))
+
+
+@st.cache_data(max_entries=LOAD_CACHE_ENTRIES)
+def load_partitions(version):
+    """List days and sources in the Parquet store for a data version."""
+    return partition_values(PARQUET_STORE_DIR)
+
+
+@st.cache_resource(max_entries=LOAD_CACHE_ENTRIES)
+def load_parquet(version, date_range, sources):
+    """Load the selected days and sources from the Parquet store."""
+    return load_feedback(
+        PARQUET_STORE_DIR,
+        columns=DASHBOARD_COLUMNS,
+        start_date=date_range[0],
+        end_date=date_range[1],
+        sources=list(sources)
+    )
+
+
 def apply_filters(df, date_range, sources, sentiments):
-    """Apply sidebar filters to dataframe."""
-    filtered = df.copy()
+    """Apply sidebar filters to dataframe (the input is not modified)."""
+    filtered = df
     
     # Date filter
     filtered = filtered[
@@ -55,23 +128,72 @@ def apply_filters(df, date_range, sources, sentiments):
     return filtered
 
 
+@st.cache_data(max_entries=VIEW_CACHE_ENTRIES)
+def build_views(version, date_range, sources, sentiments, _df):
+    """
+    Compute the filtered frame and every aggregate the page displays.
+    
+    Memoized per data version and filter combination; _df is not hashed
+    (its identity is implied by version and the load filters).
+    """
+    filtered_df = apply_filters(_df, date_range, list(sources), list(sentiments))
+    if filtered_df.empty:
+        return None
+    
+    top_issues = filtered_df.groupby('category').agg({
+        'content': 'count',
+        'sentiment_score': 'mean',
+        'priority_score': 'mean'
+    }).rename(columns={'content': 'count'})
+    top_issues = top_issues.sort_values('count', ascending=False).head(5)
+    top_issues['sentiment_score'] = top_issues['sentiment_score'].round(3)
+    top_issues['priority_score'] = top_issues['priority_score'].round(2)
+    
+    high_priority = filtered_df.nlargest(10, 'priority_score')[
+        ['date', 'source', 'category', 'sentiment_label', 'priority_score', 'content']
+    ].copy()
+    high_priority['date'] = high_priority['date'].dt.strftime('%Y-%m-%d')
+    high_priority['content'] = high_priority['content'].str[:100] + '...'
+    
+    return {
+        'total': len(filtered_df),
+        'avg_sentiment': filtered_df['sentiment_score'].mean(),
+        'positive_pct': (filtered_df['sentiment_label'] == 'positive').mean() * 100,
+        'negative_pct': (filtered_df['sentiment_label'] == 'negative').mean() * 100,
+        'sentiment_counts': filtered_df['sentiment_label'].value_counts(),
+        'daily_sentiment': filtered_df.groupby(filtered_df['date'].dt.date)['sentiment_score'].mean(),
+        'category_counts': filtered_df['category'].value_counts(),
+        'top_issues': top_issues,
+        'high_priority': high_priority
+    }
+
+
 def main():
     """Main dashboard application."""
     st.title("📊 Feedback Intelligence Dashboard")
     
-    # Load data
-    df = load_latest_csv()
-    
-    if df is None or df.empty:
-        st.warning("No processed feedback data found. Run app.py first to generate data.")
-        return
+    # Load data: the Parquet store is pruned by the sidebar filters at
+    # read time; legacy CSV exports are loaded whole and filtered after
+    version = data_version()
+    if version is not None and version[0] == 'parquet':
+        df = None
+        partitions = load_partitions(version)
+        min_date = date.fromisoformat(partitions['day'][0])
+        max_date = date.fromisoformat(partitions['day'][-1])
+        all_sources = partitions['source']
+    else:
+        df = load_latest_csv()
+        if df is None or df.empty:
+            st.warning("No processed feedback data found. Run app.py first to generate data.")
+            return
+        min_date = df['date'].min().date()
+        max_date = df['date'].max().date()
+        all_sources = df['source'].unique().tolist()
     
     # Sidebar filters
     st.sidebar.header("Filters")
     
     # Date range filter
-    min_date = df['date'].min().date()
-    max_date = df['date'].max().date()
     date_range = st.sidebar.date_input(
         "Date Range",
         value=(min_date, max_date),
@@ -84,17 +206,22 @@ def main():
         date_range = (min_date, max_date)
     
     # Source filter
-    all_sources = df['source'].unique().tolist()
     sources = st.sidebar.multiselect("Source", all_sources, default=all_sources)
     
+    if df is None:
+        df = load_parquet(version, tuple(date_range), tuple(sources or all_sources))
+        if df.empty:
+            st.warning("No data matches the selected filters.")
+            return
+    
     # Sentiment filter
     all_sentiments = df['sentiment_label'].unique().tolist()
     sentiments = st.sidebar.multiselect("Sentiment", all_sentiments, default=all_sentiments)
     
-    # Apply filters
-    filtered_df = apply_filters(df, date_range, sources, sentiments)
+    # Apply filters and compute aggregates (memoized per filter combination)
+    views = build_views(version, tuple(date_range), tuple(sources), tuple(sentiments), df)
     
-    if filtered_df.empty:
+    if views is None:
         st.warning("No data matches the selected filters.")
         return
     
@@ -103,19 +230,16 @@ def main():
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Total Feedback", len(filtered_df))
+        st.metric("Total Feedback", views['total'])
     
     with col2:
-        avg_sentiment = filtered_df['sentiment_score'].mean()
-        st.metric("Avg Sentiment", f"{avg_sentiment:.3f}")
+        st.metric("Avg Sentiment", f"{views['avg_sentiment']:.3f}")
     
     with col3:
-        positive_pct = (filtered_df['sentiment_label'] == 'positive').mean() * 100
-        st.metric("Positive %", f"{positive_pct:.1f}%")
+        st.metric("Positive %", f"{views['positive_pct']:.1f}%")
     
     with col4:
-        negative_pct = (filtered_df['sentiment_label'] == 'negative').mean() * 100
-        st.metric("Negative %", f"{negative_pct:.1f}%")
+        st.metric("Negative %", f"{views['negative_pct']:.1f}%")
     
     st.divider()
     
@@ -125,7 +249,7 @@ def main():
     # Sentiment distribution pie chart
     with chart_col1:
         st.subheader("Sentiment Distribution")
-        sentiment_counts = filtered_df['sentiment_label'].value_counts()
+        sentiment_counts = views['sentiment_counts']
         
         fig1, ax1 = plt.subplots(figsize=(6, 4))
         colors = {'positive': '#2ecc71', 'negative': '#e74c3c', 'neutral': '#95a5a6'}
@@ -144,7 +268,7 @@ def main():
     # Trend line chart
     with chart_col2:
         st.subheader("Sentiment Trend Over Time")
-        daily_sentiment = filtered_df.groupby(filtered_df['date'].dt.date)['sentiment_score'].mean()
+        daily_sentiment = views['daily_sentiment']
         
         fig2, ax2 = plt.subplots(figsize=(6, 4))
         ax2.plot(daily_sentiment.index, daily_sentiment.values, marker='o', linewidth=2, color='#3498db')
@@ -164,7 +288,7 @@ def main():
     
     with cat_col1:
         st.subheader("Feedback by Category")
-        category_counts = filtered_df['category'].value_counts()
+        category_counts = views['category_counts']
         
         fig3, ax3 = plt.subplots(figsize=(6, 4))
         bars = ax3.barh(category_counts.index, category_counts.values, color='#3498db')
@@ -176,26 +300,13 @@ def main():
     
     with cat_col2:
         st.subheader("Top 5 Issues by Frequency")
-        top_issues = filtered_df.groupby('category').agg({
-            'content': 'count',
-            'sentiment_score': 'mean',
-            'priority_score': 'mean'
-        }).rename(columns={'content': 'count'})
-        top_issues = top_issues.sort_values('count', ascending=False).head(5)
-        top_issues['sentiment_score'] = top_issues['sentiment_score'].round(3)
-        top_issues['priority_score'] = top_issues['priority_score'].round(2)
-        st.dataframe(top_issues, use_container_width=True)
+        st.dataframe(views['top_issues'], use_container_width=True)
     
     st.divider()
     
     # Recent high priority feedback
     st.header("High Priority Feedback")
-    high_priority = filtered_df.nlargest(10, 'priority_score')[
-        ['date', 'source', 'category', 'sentiment_label', 'priority_score', 'content']
-    ].copy()
-    high_priority['date'] = high_priority['date'].dt.strftime('%Y-%m-%d')
-    high_priority['content'] = high_priority['content'].str[:100] + '...'
-    st.dataframe(high_priority, use_container_width=True, hide_index=True)
+    st.dataframe(views['high_priority'], use_container_width=True, hide_index=True)
 
 
 if __name__ == "__main__":
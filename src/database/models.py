@@ -4,29 +4,133 @@ Database models module.
 Defines SQLAlchemy ORM models for storing feedback data.
 """
 
+import threading
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, Text, DateTime
+from sqlalchemy import Column, Integer, String, Float, Text, Date, DateTime, Index, LargeBinary, inspect, text
 from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
 
+# Sources are fetched in threads that may create the schema concurrently
+_schema_lock = threading.Lock()
+
 
 class Feedback(Base):
     """Model for storing user feedback from various sources."""
     
     __tablename__ = "feedback"
+    __table_args__ = (
+        # Date-window queries and top-N by priority within a window; the
+        # leading column also serves plain date lookups
+        Index("ix_feedback_date_priority", "date", "priority_score"),
+        # The same per source (covering for source + window counts)
+        Index("ix_feedback_source_date_priority", "source", "date", "priority_score"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
+    # Stable natural key: hash of source + review id, or of source +
+    # content + date when the source has no ids
+    feedback_key = Column(String(64), nullable=True, unique=True, index=True)
     content = Column(Text, nullable=False)
     source = Column(String(50), nullable=False)
     rating = Column(Float, nullable=True)
-    sentiment_label = Column(String(20), nullable=True)
+    sentiment_label = Column(String(20), nullable=True, index=True)
     sentiment_score = Column(Float, nullable=True)
-    category = Column(String(50), nullable=True)
+    category = Column(String(50), nullable=True, index=True)
     priority_score = Column(Float, nullable=True)
     date = Column(DateTime, default=datetime.utcnow)
+    # Near-duplicate issue cluster (see intelligence.clustering)
+    cluster_id = Column(Integer, nullable=True, index=True)
+    # Cascade sentiment path (vader, uncertain, rating_mismatch); null
+    # when the row was scored in another SENTIMENT_MODE
+    sentiment_path = Column(String(20), nullable=True)
+
+
+class DailyRollup(Base):
+    """Per day x source x category aggregates of stored feedback."""
+    
+    __tablename__ = "feedback_daily_rollups"
+
+    day = Column(Date, primary_key=True)
+    source = Column(String(50), primary_key=True)
+    category = Column(String(50), primary_key=True)
+    feedback_count = Column(Integer, nullable=False, default=0)
+    sentiment_sum = Column(Float, nullable=False, default=0.0)
+    sentiment_sq_sum = Column(Float, nullable=False, default=0.0)
+    positive_count = Column(Integer, nullable=False, default=0)
+    negative_count = Column(Integer, nullable=False, default=0)
+    priority_sum = Column(Float, nullable=False, default=0.0)
+
+
+class FetchWatermark(Base):
+    """High-water mark of the newest review ingested per source stream."""
+    
+    __tablename__ = "fetch_watermarks"
+
+    source_key = Column(String(200), primary_key=True)
+    last_date = Column(DateTime, nullable=False)
+    last_review_id = Column(String(200), nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class IssueCluster(Base):
+    """Near-duplicate feedback cluster; members reference it by cluster_id."""
+    
+    __tablename__ = "issue_clusters"
+
+    id = Column(Integer, primary_key=True)
+    # MinHash signature of the first member, used to match new feedback
+    signature = Column(LargeBinary, nullable=False)
+    signature_version = Column(Integer, nullable=False)
+    sample_content = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    # Last time new feedback joined the cluster; only recently active
+    # clusters are loaded into the index
+    last_seen_at = Column(DateTime, nullable=True, index=True)
+
+
+# Columns added after the first release: (table, column, DDL type)
+_ADDED_COLUMNS = [
+    ("feedback", "feedback_key", "VARCHAR(64)"),
+    ("feedback", "cluster_id", "INTEGER"),
+    ("issue_clusters", "last_seen_at", "DATETIME"),
+    ("feedback", "sentiment_path", "VARCHAR(20)"),
+]
 
 
 def create_tables(engine):
-    """Create all tables in the database."""
-    Base.metadata.create_all(engine)
+    """Create all tables in the database and migrate older schemas."""
+    with _schema_lock:
+        had_rollups = inspect(engine).has_table(DailyRollup.__tablename__)
+        Base.metadata.create_all(engine)
+        _migrate_columns(engine)
+        
+        # Backfill rollups the first time they are created on an existing database
+        if not had_rollups:
+            from database.rollups import rebuild_rollups
+            with engine.begin() as conn:
+                rebuild_rollups(conn)
+
+
+def _migrate_columns(engine):
+    """Add columns (and their indexes) missing from existing tables."""
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table, column, ddl_type in _ADDED_COLUMNS:
+            existing = {col['name'] for col in inspector.get_columns(table)}
+            if column in existing:
+                continue
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl_type}"))
+        
+        # create_all skips indexes of tables that already existed
+        for model in (Feedback, IssueCluster):
+            existing_indexes = {index['name'] for index in inspector.get_indexes(model.__tablename__)}
+            created = False
+            for index in model.__table__.indexes:
+                if index.name not in existing_indexes:
+                    index.create(conn)
+                    created = True
+            
+            # Refresh planner statistics so the new indexes get used
+            if created and conn.dialect.name == "sqlite":
+                conn.execute(text(f"ANALYZE {model.__tablename__}"))
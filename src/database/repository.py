@@ -0,0 +1,169 @@
+"""
+Feedback repository module.
+
+Query functions over individual stored feedback rows: top-N by
+priority, filtered counts and paged listings. Filters map onto the
+feedback table indexes, so lookups stay fast on large tables.
+"""
+
+from datetime import datetime, time, timedelta
+
+import pandas as pd
+from sqlalchemy import and_, func, or_, select
+
+from database.models import Feedback
+
+
+# Columns returned by the row-level queries
+LIST_COLUMNS = [
+    'id', 'date', 'source', 'category', 'sentiment_label',
+    'sentiment_score', 'priority_score', 'rating', 'content'
+]
+DEFAULT_PAGE_SIZE = 50
+
+
+def _day_bounds(start_date=None, end_date=None):
+    """Convert an inclusive day range into [start, end) datetimes."""
+    start = end = None
+    if start_date is not None:
+        start = datetime.combine(pd.Timestamp(start_date).date(), time.min)
+    if end_date is not None:
+        end = datetime.combine(pd.Timestamp(end_date).date() + timedelta(days=1), time.min)
+    return start, end
+
+
+def _filtered(query, start_date=None, end_date=None, sources=None,
+              categories=None, sentiments=None):
+    """Apply the common date/source/category/sentiment filters."""
+    start, end = _day_bounds(start_date, end_date)
+    if start is not None:
+        query = query.where(Feedback.date >= start)
+    if end is not None:
+        query = query.where(Feedback.date < end)
+    if sources:
+        query = query.where(Feedback.source.in_(list(sources)))
+    if categories:
+        query = query.where(Feedback.category.in_(list(categories)))
+    if sentiments:
+        query = query.where(Feedback.sentiment_label.in_(list(sentiments)))
+    return query
+
+
+def _to_frame(rows, columns: list) -> pd.DataFrame:
+    """Build a DataFrame from result rows."""
+    df = pd.DataFrame(rows, columns=columns)
+    if 'date' in df.columns:
+        df['date'] = pd.to_datetime(df['date'])
+    return df
+
+
+def top_by_priority(engine, start_date=None, end_date=None, limit: int = 10,
+                    columns: list = None, **filters) -> pd.DataFrame:
+    """
+    Highest-priority feedback within a date window.
+
+    Args:
+        engine: SQLAlchemy engine
+        start_date: First day to include (date or 'YYYY-MM-DD')
+        end_date: Last day to include (date or 'YYYY-MM-DD')
+        limit: Number of rows to return
+        columns: Columns to return (default: LIST_COLUMNS)
+        **filters: sources, categories and/or sentiments lists
+
+    Returns:
+        DataFrame ordered by priority_score, highest first
+    """
+    columns = columns or LIST_COLUMNS
+    query = _filtered(
+        select(*[Feedback.__table__.c[col] for col in columns])
+        .where(Feedback.priority_score.isnot(None))
+        .order_by(Feedback.priority_score.desc(), Feedback.id)
+        .limit(limit),
+        start_date, end_date, **filters
+    )
+    with engine.connect() as conn:
+        return _to_frame(conn.execute(query).all(), columns)
+
+
+def count_feedback(engine, start_date=None, end_date=None, **filters) -> int:
+    """
+    Number of stored feedback rows matching the filters.
+
+    Args:
+        engine: SQLAlchemy engine
+        start_date: First day to include
+        end_date: Last day to include
+        **filters: sources, categories and/or sentiments lists
+
+    Returns:
+        Row count
+    """
+    query = _filtered(select(func.count()).select_from(Feedback), start_date, end_date, **filters)
+    with engine.connect() as conn:
+        return int(conn.execute(query).scalar())
+
+
+def count_by(engine, dimension: str = 'category', start_date=None, end_date=None,
+             **filters) -> pd.Series:
+    """
+    Row counts grouped by 'category', 'source' or 'sentiment_label'.
+
+    Returns:
+        Series of counts indexed by the dimension, largest first
+    """
+    group = Feedback.__table__.c[dimension]
+    query = _filtered(
+        select(group, func.count()).group_by(group),
+        start_date, end_date, **filters
+    )
+    with engine.connect() as conn:
+        rows = conn.execute(query).all()
+    counts = pd.Series(dict(rows), dtype='int64', name='count')
+    counts.index.name = dimension
+    return counts.sort_values(ascending=False)
+
+
+def list_feedback(engine, start_date=None, end_date=None, page_size: int = DEFAULT_PAGE_SIZE,
+                  after: tuple = None, columns: list = None, **filters):
+    """
+    One page of feedback, newest first.
+
+    Pages are keyed on (date, id) of the last row of the previous page
+    rather than an offset, so deep pages cost the same as the first.
+
+    Args:
+        engine: SQLAlchemy engine
+        start_date: First day to include
+        end_date: Last day to include
+        page_size: Rows per page
+        after: Cursor returned with the previous page (None for the first page)
+        columns: Columns to return (default: LIST_COLUMNS)
+        **filters: sources, categories and/or sentiments lists
+
+    Returns:
+        (DataFrame page, cursor for the next page or None when exhausted)
+    """
+    columns = list(columns or LIST_COLUMNS)
+    selected = columns + [col for col in ('date', 'id') if col not in columns]
+    query = _filtered(
+        select(*[Feedback.__table__.c[col] for col in selected])
+        .where(Feedback.date.isnot(None))
+        .order_by(Feedback.date.desc(), Feedback.id.desc())
+        .limit(page_size),
+        start_date, end_date, **filters
+    )
+    if after is not None:
+        last_date, last_id = after
+        # The plain upper bound lets the date index seek to the cursor
+        query = query.where(Feedback.date <= last_date).where(or_(
+            Feedback.date < last_date,
+            and_(Feedback.date == last_date, Feedback.id < last_id)
+        ))
+
+    with engine.connect() as conn:
+        rows = conn.execute(query).all()
+
+    cursor = None
+    if len(rows) == page_size:
+        cursor = (rows[-1][selected.index('date')], rows[-1][selected.index('id')])
+    return _to_frame([row[:len(columns)] for row in rows], columns), cursor
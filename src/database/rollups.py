@@ -0,0 +1,228 @@
+"""
+Rollup tables module.
+
+Maintains per day x source x category aggregates of stored feedback and
+answers trend, breakdown and top-line queries from them, so reporting
+cost scales with the number of days rather than the number of reviews.
+"""
+
+import pandas as pd
+from sqlalchemy import case, func, insert, select, update
+
+from database.models import DailyRollup, Feedback
+from services.schema import to_float64
+
+
+ROLLUP_KEYS = ['day', 'source', 'category']
+ROLLUP_VALUES = [
+    'feedback_count', 'sentiment_sum', 'sentiment_sq_sum',
+    'positive_count', 'negative_count', 'priority_sum'
+]
+
+
+def _aggregate(df: pd.DataFrame) -> pd.DataFrame:
+    """Aggregate feedback rows into rollup increments."""
+    # Widened like the stored scores, so incremental sums match rebuilds
+    sentiment = to_float64(df['sentiment_score'])
+    frame = pd.DataFrame({
+        'day': pd.to_datetime(df['date']).dt.date,
+        'source': df['source'].astype(str),
+        'category': df['category'].astype(object).fillna('Other').astype(str),
+        'feedback_count': 1,
+        'sentiment_sum': sentiment,
+        'sentiment_sq_sum': sentiment ** 2,
+        'positive_count': (df['sentiment_label'] == 'positive').astype(int),
+        'negative_count': (df['sentiment_label'] == 'negative').astype(int),
+        'priority_sum': (
+            df['priority_score'].fillna(0).astype(float)
+            if 'priority_score' in df.columns else 0.0
+        ),
+    })
+    return frame.groupby(ROLLUP_KEYS, as_index=False).sum()
+
+
+def _apply_increments(conn, increments: pd.DataFrame, columns: list):
+    """Add increments to existing rollup rows, inserting missing rows."""
+    table = DailyRollup.__table__
+    for row in increments.to_dict('records'):
+        key_match = [table.c[key] == row[key] for key in ROLLUP_KEYS]
+        result = conn.execute(
+            update(table)
+            .where(*key_match)
+            .values({col: table.c[col] + row[col] for col in columns})
+        )
+        if result.rowcount == 0:
+            values = {key: row[key] for key in ROLLUP_KEYS}
+            values.update({col: row.get(col, 0) for col in ROLLUP_VALUES})
+            conn.execute(insert(table).values(values))
+
+
+def add_to_rollups(conn, df: pd.DataFrame):
+    """
+    Add newly stored feedback rows to the rollups.
+
+    Args:
+        conn: Connection inside the transaction that stored the rows
+        df: Stored feedback with date, source, category, sentiment and
+            (optionally) priority columns
+    """
+    if df.empty:
+        return
+    _apply_increments(conn, _aggregate(df), ROLLUP_VALUES)
+
+
+def add_priority_to_rollups(conn, df: pd.DataFrame, previous: pd.Series = None):
+    """
+    Add priority score changes of stored feedback to the rollups.
+
+    Args:
+        conn: Connection inside the transaction that updated the rows
+        df: Feedback with date, source, category and new priority_score
+        previous: Previous priority scores aligned with df (default: 0)
+    """
+    if df.empty:
+        return
+    delta = df['priority_score'].astype(float)
+    if previous is not None:
+        delta = delta - previous.fillna(0).astype(float)
+    frame = pd.DataFrame({
+        'day': pd.to_datetime(df['date']).dt.date,
+        'source': df['source'].astype(str),
+        'category': df['category'].astype(object).fillna('Other').astype(str),
+        'priority_sum': delta,
+    })
+    increments = frame.groupby(ROLLUP_KEYS, as_index=False).sum()
+    _apply_increments(conn, increments, ['priority_sum'])
+
+
+def rebuild_rollups(conn):
+    """
+    Recompute all rollups from the feedback table.
+
+    Used to backfill databases created before rollups existed.
+    """
+    conn.execute(DailyRollup.__table__.delete())
+    day = func.date(Feedback.date)
+    category = func.coalesce(Feedback.category, 'Other')
+    score = func.coalesce(Feedback.sentiment_score, 0.0)
+    rows = conn.execute(
+        select(
+            day, Feedback.source, category,
+            func.count(),
+            func.sum(score),
+            func.sum(score * score),
+            func.sum(case((Feedback.sentiment_label == 'positive', 1), else_=0)),
+            func.sum(case((Feedback.sentiment_label == 'negative', 1), else_=0)),
+            func.sum(func.coalesce(Feedback.priority_score, 0.0)),
+        )
+        .where(Feedback.date.isnot(None))
+        .group_by(day, Feedback.source, category)
+    ).all()
+    if rows:
+        conn.execute(insert(DailyRollup.__table__), [
+            dict(zip(ROLLUP_KEYS + ROLLUP_VALUES, (pd.Timestamp(row[0]).date(),) + tuple(row[1:])))
+            for row in rows
+        ])
+
+
+def _filtered(query, start_date=None, end_date=None, sources=None):
+    """Apply the common day/source filters to a rollup query."""
+    if start_date is not None:
+        query = query.where(DailyRollup.day >= start_date)
+    if end_date is not None:
+        query = query.where(DailyRollup.day <= end_date)
+    if sources:
+        query = query.where(DailyRollup.source.in_(list(sources)))
+    return query
+
+
+def query_latest_day(engine):
+    """Return the most recent day with stored feedback, or None."""
+    with engine.connect() as conn:
+        return conn.execute(select(func.max(DailyRollup.day))).scalar()
+
+
+def query_daily_sentiment(engine, start_date=None, end_date=None, sources=None) -> pd.DataFrame:
+    """
+    Per-day feedback count and sentiment sum.
+
+    Returns:
+        DataFrame with columns: day, feedback_count, sentiment_sum, avg_sentiment
+    """
+    query = _filtered(
+        select(
+            DailyRollup.day,
+            func.sum(DailyRollup.feedback_count).label('feedback_count'),
+            func.sum(DailyRollup.sentiment_sum).label('sentiment_sum'),
+        ).group_by(DailyRollup.day).order_by(DailyRollup.day),
+        start_date, end_date, sources
+    )
+    with engine.connect() as conn:
+        df = pd.DataFrame(conn.execute(query).all(), columns=['day', 'feedback_count', 'sentiment_sum'])
+    df['avg_sentiment'] = df['sentiment_sum'] / df['feedback_count']
+    return df
+
+
+def query_breakdown(engine, dimension: str = 'category', start_date=None,
+                    end_date=None, sources=None) -> pd.DataFrame:
+    """
+    Counts and averages grouped by 'category' or 'source'.
+
+    Returns:
+        DataFrame indexed by the dimension with feedback_count,
+        avg_sentiment, negative_count and avg_priority, largest first
+    """
+    group = DailyRollup.__table__.c[dimension]
+    query = _filtered(
+        select(
+            group,
+            func.sum(DailyRollup.feedback_count).label('feedback_count'),
+            func.sum(DailyRollup.sentiment_sum).label('sentiment_sum'),
+            func.sum(DailyRollup.negative_count).label('negative_count'),
+            func.sum(DailyRollup.priority_sum).label('priority_sum'),
+        ).group_by(group),
+        start_date, end_date, sources
+    )
+    with engine.connect() as conn:
+        df = pd.DataFrame(conn.execute(query).all(), columns=[
+            dimension, 'feedback_count', 'sentiment_sum', 'negative_count', 'priority_sum'
+        ])
+    df['avg_sentiment'] = df['sentiment_sum'] / df['feedback_count']
+    df['avg_priority'] = df['priority_sum'] / df['feedback_count']
+    df = df.sort_values('feedback_count', ascending=False).set_index(dimension)
+    return df[['feedback_count', 'avg_sentiment', 'negative_count', 'avg_priority']]
+
+
+def query_totals(engine, start_date=None, end_date=None, sources=None) -> dict:
+    """
+    Top-line metrics over the selected days and sources.
+
+    Returns:
+        dict with total, positive/neutral/negative counts, avg_sentiment,
+        sentiment_std and avg_priority
+    """
+    query = _filtered(
+        select(*[func.coalesce(func.sum(DailyRollup.__table__.c[col]), 0) for col in ROLLUP_VALUES]),
+        start_date, end_date, sources
+    )
+    with engine.connect() as conn:
+        sums = dict(zip(ROLLUP_VALUES, conn.execute(query).one()))
+
+    total = int(sums['feedback_count'])
+    if total == 0:
+        return {
+            'total': 0, 'positive': 0, 'neutral': 0, 'negative': 0,
+            'avg_sentiment': 0.0, 'sentiment_std': 0.0, 'avg_priority': 0.0
+        }
+
+    mean = sums['sentiment_sum'] / total
+    variance = max(0.0, sums['sentiment_sq_sum'] / total - mean ** 2)
+    return {
+        'total': total,
+        'positive': int(sums['positive_count']),
+        'neutral': total - int(sums['positive_count']) - int(sums['negative_count']),
+        'negative': int(sums['negative_count']),
+        'avg_sentiment': mean,
+        'sentiment_std': variance ** 0.5,
+        'avg_priority': sums['priority_sum'] / total
+    }
@@ -7,9 +7,24 @@ Loads user feedback from uploaded CSV files.
 import pandas as pd
 
 
-def load_feedback_from_csv(file_path: str) -> pd.DataFrame:
+REQUIRED_COLUMNS = ['content', 'rating', 'date']
+
+
+def _normalize_feedback(df: pd.DataFrame) -> pd.DataFrame:
+    """Validate required columns and add the source column."""
+    for col in REQUIRED_COLUMNS:
+        if col not in df.columns:
+            raise ValueError(f"Missing required column: {col}")
+    
+    df['date'] = pd.to_datetime(df['date'])
+    df['source'] = 'CSV Upload'
+    
+    return df[['content', 'rating', 'date', 'source']]
+
+
+def read_feedback_csv(file_path: str) -> pd.DataFrame:
     """
-    Load feedback from a CSV file.
+    Load feedback from a CSV file, raising on errors.
     
     Args:
         file_path: Path to the CSV file
@@ -21,20 +36,44 @@ def load_feedback_from_csv(file_path: str) -> pd.DataFrame:
     
     Returns:
         DataFrame with columns: content, rating, date, source
+    
+    Raises:
+        Exception: If the file cannot be read or lacks a required column
+    """
+    return _normalize_feedback(pd.read_csv(file_path))
+
+
+def load_feedback_from_csv(file_path: str) -> pd.DataFrame:
+    """
+    Load feedback from a CSV file.
+    
+    Args:
+        file_path: Path to the CSV file (columns as in read_feedback_csv)
+    
+    Returns:
+        DataFrame with columns: content, rating, date, source (empty on error)
     """
     try:
-        df = pd.read_csv(file_path)
-        
-        required_columns = ['content', 'rating', 'date']
-        for col in required_columns:
-            if col not in df.columns:
-                raise ValueError(f"Missing required column: {col}")
-        
-        df['date'] = pd.to_datetime(df['date'])
-        df['source'] = 'CSV Upload'
-        
-        return df[['content', 'rating', 'date', 'source']]
+        return read_feedback_csv(file_path)
     
     except Exception as e:
         print(f"Error loading CSV: {e}")
         return pd.DataFrame(columns=['content', 'rating', 'date', 'source'])
+
+
+def iter_feedback_csv(file_path: str, chunksize: int = 50000):
+    """
+    Load feedback from a CSV file in chunks.
+    
+    Only one chunk is held in memory at a time. Errors propagate to the
+    caller, since earlier chunks may already have been consumed.
+    
+    Args:
+        file_path: Path to the CSV file
+        chunksize: Rows per chunk
+    
+    Yields:
+        DataFrames with columns: content, rating, date, source
+    """
+    for chunk in pd.read_csv(file_path, chunksize=chunksize):
+        yield _normalize_feedback(chunk)
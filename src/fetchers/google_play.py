@@ -4,10 +4,122 @@ Google Play Store review fetcher.
 Fetches user reviews from Google Play Store for specified apps.
 """
 
+import time
+
 import pandas as pd
 from google_play_scraper import reviews, Sort
 
 
+# Pagination settings
+PAGE_SIZE = 200
+PAGE_RETRIES = 3
+PAGE_RETRY_BACKOFF = 1  # seconds, doubled after each failed attempt
+
+COLUMNS = ['review_id', 'content', 'rating', 'date', 'source']
+
+
+def _fetch_page(reviews_func, app_id: str, page_size: int, token, deadline: float = None):
+    """Fetch one page of reviews, retrying with backoff on errors until the deadline."""
+    delay = PAGE_RETRY_BACKOFF
+    for attempt in range(PAGE_RETRIES + 1):
+        try:
+            return reviews_func(
+                app_id,
+                lang='en',
+                country='us',
+                sort=Sort.NEWEST,
+                count=page_size,
+                continuation_token=token
+            )
+        except Exception as e:
+            if attempt == PAGE_RETRIES or (deadline is not None and time.monotonic() + delay >= deadline):
+                raise
+            print(f"  Google Play page failed ({e}), retrying in {delay}s")
+            time.sleep(delay)
+            delay *= 2
+
+
+def fetch_google_reviews_incremental(app_id: str, since=None, since_id: str = None,
+                                     max_count: int = None, page_size: int = PAGE_SIZE,
+                                     reviews_func=None, resume_from=None,
+                                     resume_from_id: str = None, deadline: float = None) -> pd.DataFrame:
+    """
+    Fetch reviews newest-first, page by page, down to a high-water mark.
+    
+    Follows continuation tokens until it reaches a review that is older
+    than `since` or has id `since_id`, runs out of reviews, or has
+    collected `max_count` reviews.
+    
+    A fetch that stopped at `max_count` can be continued by a later call
+    with `resume_from`/`resume_from_id` set to its oldest review: newer
+    reviews are paged through without being collected or counted.
+    
+    Args:
+        app_id: The Google Play app ID (e.g., 'com.example.app')
+        since: Date of the newest review already ingested (None = no mark)
+        since_id: Review id of the newest review already ingested
+        max_count: Maximum number of reviews to fetch (None = no limit)
+        page_size: Reviews requested per page
+        reviews_func: Replacement for google_play_scraper.reviews (for stubbing)
+        resume_from: Date of the review to continue after (None = newest)
+        resume_from_id: Review id of the review to continue after
+        deadline: time.monotonic() value after which no further page is
+            requested (None = no deadline)
+    
+    Returns:
+        DataFrame with columns: review_id, content, rating, date, source
+    
+    Raises:
+        TimeoutError: If the deadline passes before the fetch is complete
+        Exception: If a page still fails after PAGE_RETRIES retries
+    """
+    reviews_func = reviews_func or reviews
+    collected = []
+    token = None
+    skipping = resume_from is not None or resume_from_id is not None
+    
+    while max_count is None or len(collected) < max_count:
+        if deadline is not None and time.monotonic() >= deadline:
+            raise TimeoutError(f"deadline passed after {len(collected)} reviews")
+        page, token = _fetch_page(reviews_func, app_id, page_size, token, deadline)
+        
+        reached_mark = False
+        for review in page:
+            if skipping:
+                # Skip up to the resume review; by date if it is gone
+                if review['reviewId'] == resume_from_id:
+                    skipping = False
+                    continue
+                if resume_from is None or review['at'] >= resume_from:
+                    continue
+                skipping = False
+            if review['reviewId'] == since_id or (since is not None and review['at'] < since):
+                reached_mark = True
+                break
+            collected.append(review)
+        
+        # An empty page or missing token means there are no older reviews
+        if reached_mark or not page or token is None or getattr(token, 'token', None) is None:
+            break
+    
+    if max_count is not None:
+        collected = collected[:max_count]
+    
+    if not collected:
+        return pd.DataFrame(columns=COLUMNS)
+    
+    df = pd.DataFrame(collected)
+    df = df.rename(columns={
+        'reviewId': 'review_id',
+        'content': 'content',
+        'score': 'rating',
+        'at': 'date'
+    })
+    df['source'] = 'google_play'
+    
+    return df[COLUMNS]
+
+
 def fetch_google_reviews(app_id: str, count: int = 200) -> pd.DataFrame:
     """
     Fetch reviews from Google Play Store for a given app.
@@ -20,28 +132,8 @@ def fetch_google_reviews(app_id: str, count: int = 200) -> pd.DataFrame:
         DataFrame with columns: review_id, content, rating, date, source
     """
     try:
-        result, _ = reviews(
-            app_id,
-            lang='en',
-            country='us',
-            sort=Sort.NEWEST,
-            count=count
-        )
-        
-        if not result:
-            return pd.DataFrame(columns=['review_id', 'content', 'rating', 'date', 'source'])
-        
-        df = pd.DataFrame(result)
-        df = df.rename(columns={
-            'reviewId': 'review_id',
-            'content': 'content',
-            'score': 'rating',
-            'at': 'date'
-        })
-        df['source'] = 'google_play'
-        
-        return df[['review_id', 'content', 'rating', 'date', 'source']]
+        return fetch_google_reviews_incremental(app_id, max_count=count)
     
     except Exception as e:
         print(f"Error fetching Google Play reviews: {e}")
-        return pd.DataFrame(columns=['review_id', 'content', 'rating', 'date', 'source'])
+        return pd.DataFrame(columns=COLUMNS)
@@ -2,54 +2,144 @@
 HuggingFace Dataset review fetcher.
 
 Fetches user reviews from HuggingFace public datasets.
+
+The split is read as a memory-mapped Arrow table: slices and batches
+are zero-copy views, so only the rows being converted are held in
+memory. Callers pass an offset to continue where the previous run
+stopped.
 """
 
+import glob
+import os
+
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
-from datasets import load_dataset
+import pyarrow as pa
+from datetime import datetime
+
+
+# Configuration
+HF_DATASET = "amazon_polarity"
+HF_SPLIT = "train"
+HF_SOURCE = "HuggingFace Dataset"
+# Directory of already-downloaded .arrow files for the split (e.g. in
+# ~/.cache/huggingface/datasets); when set, the datasets library is not used
+HF_ARROW_DIR = os.getenv("HF_ARROW_DIR")
+
+OUTPUT_COLUMNS = ['id', 'content', 'rating', 'date', 'source']
+
 
+def _empty_frame() -> pd.DataFrame:
+    """Empty result in the fetcher's output format."""
+    return pd.DataFrame(columns=OUTPUT_COLUMNS)
 
-def fetch_hf_reviews(limit: int = 200) -> pd.DataFrame:
+
+def open_split(dataset_name: str = HF_DATASET, split: str = HF_SPLIT) -> pa.Table:
     """
-    Fetch reviews from HuggingFace amazon_polarity dataset.
+    Open a dataset split as a memory-mapped Arrow table.
+    
+    Args:
+        dataset_name: HuggingFace dataset name
+        split: Split name
+    
+    Returns:
+        pyarrow Table backed by the cached Arrow files
+    """
+    if HF_ARROW_DIR:
+        paths = sorted(glob.glob(os.path.join(HF_ARROW_DIR, f"*{split}*.arrow")))
+        if not paths:
+            raise FileNotFoundError(f"No {split} .arrow files in {HF_ARROW_DIR}")
+        # The datasets cache stores Arrow IPC streams; reading them from a
+        # memory map keeps the buffers on disk
+        return pa.concat_tables([pa.ipc.open_stream(pa.memory_map(path)).read_all() for path in paths])
+    
+    # Imported here: the datasets library is slow to import and only
+    # needed when this source is fetched
+    from datasets import load_dataset
+    
+    # Downloads on first use; afterwards the cached Arrow files are
+    # memory-mapped
+    dataset = load_dataset(dataset_name, split=split)
+    return dataset.with_format("arrow")[:]
+
+
+def _to_feedback(table: pa.Table, offset: int, today: datetime) -> pd.DataFrame:
+    """Convert a slice of the split, starting at row offset, to feedback rows."""
+    positions = np.arange(offset, offset + table.num_rows)
+    
+    # amazon_polarity: 0 = negative, 1 = positive; map to ratings 1 and 5
+    labels = table.column('label').to_numpy()
+    
+    return pd.DataFrame({
+        # Sequential ids over the whole split, stable across runs
+        'id': positions + 1,
+        'content': table.column('content').to_pandas(),
+        'rating': np.where(labels == 1, 5, 1),
+        # Recent dates distributed over the last 7 days
+        'date': pd.Timestamp(today) - pd.to_timedelta(positions % 7, unit='D'),
+        'source': HF_SOURCE,
+    })
+
+
+def read_hf_reviews(limit: int = 200, offset: int = 0) -> pd.DataFrame:
+    """
+    Fetch reviews from HuggingFace amazon_polarity dataset, raising on errors.
     
     Args:
         limit: Number of reviews to fetch (default: 200)
+        offset: Row of the split to start at (default: 0)
     
     Returns:
         DataFrame with columns: id, content, rating, date, source
+    
+    Raises:
+        Exception: If the split cannot be loaded or read
+    """
+    table = open_split().slice(offset, limit)
+    
+    if table.num_rows == 0:
+        print(f"  HuggingFace: no rows left after offset {offset}")
+        return _empty_frame()
+    
+    return _to_feedback(table, offset, datetime.now())
+
+
+def fetch_hf_reviews(limit: int = 200, offset: int = 0) -> pd.DataFrame:
+    """
+    Fetch reviews from HuggingFace amazon_polarity dataset.
+    
+    Args:
+        limit: Number of reviews to fetch (default: 200)
+        offset: Row of the split to start at (default: 0)
+    
+    Returns:
+        DataFrame with columns: id, content, rating, date, source (empty on error)
     """
     try:
-        # Load dataset from HuggingFace
-        dataset = load_dataset("amazon_polarity", split=f"train[:{limit}]")
-        
-        if len(dataset) == 0:
-            return pd.DataFrame(columns=['id', 'content', 'rating', 'date', 'source'])
-        
-        # Convert to pandas DataFrame
-        df = pd.DataFrame(dataset)
-        
-        # Generate sequential IDs
-        df['id'] = range(1, len(df) + 1)
-        
-        # Map content column (amazon_polarity uses 'content' for review text)
-        df['content'] = df['content']
-        
-        # Map label to rating scale 1-5
-        # amazon_polarity: 0 = negative, 1 = positive
-        # Map: 0 -> 1-2 (negative), 1 -> 4-5 (positive)
-        df['rating'] = df['label'].apply(lambda x: 5 if x == 1 else 1)
-        
-        # Generate recent dates distributed over last 7 days
-        today = datetime.now()
-        df['date'] = df.index.map(lambda i: today - timedelta(days=i % 7))
-        df['date'] = pd.to_datetime(df['date'])
-        
-        # Set source
-        df['source'] = 'HuggingFace Dataset'
-        
-        return df[['id', 'content', 'rating', 'date', 'source']]
+        return read_hf_reviews(limit, offset)
     
     except Exception as e:
         print(f"Error fetching HuggingFace reviews: {e}")
-        return pd.DataFrame(columns=['id', 'content', 'rating', 'date', 'source'])
+        return _empty_frame()
+
+
+def iter_hf_reviews(batch_size: int = 50000, offset: int = 0, limit: int = None):
+    """
+    Stream reviews from the HuggingFace split in batches.
+    
+    Only one converted batch is held in memory at a time. Errors
+    propagate to the caller, since earlier batches may already have
+    been consumed.
+    
+    Args:
+        batch_size: Rows per batch
+        offset: Row of the split to start at
+        limit: Maximum rows to read (None = to the end of the split)
+    
+    Yields:
+        DataFrames with columns: id, content, rating, date, source
+    """
+    table = open_split().slice(offset, limit)
+    today = datetime.now()
+    for start in range(0, table.num_rows, batch_size):
+        yield _to_feedback(table.slice(start, batch_size), offset + start, today)
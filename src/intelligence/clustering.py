@@ -0,0 +1,249 @@
+"""
+Issue clustering module.
+
+Groups near-duplicate feedback into issue clusters using MinHash
+signatures over character shingles and locality-sensitive hashing
+(LSH). Each review is compared only with the clusters that share an
+LSH bucket with it, so clustering runs in linear time and new reviews
+can be added to an existing index.
+"""
+import re
+import zlib
+
+import numpy as np
+
+
+# Signature parameters. Changing any of them (or the shingling) makes
+# stored signatures incomparable: bump SIGNATURE_VERSION when you do.
+SIGNATURE_VERSION = 1
+NUM_PERM = 64
+SHINGLE_SIZE = 5          # characters per shingle
+LSH_BANDS = 16            # NUM_PERM / LSH_BANDS signature rows per band
+SIGNATURE_SEED = 1729
+
+# Estimated Jaccard similarity (share of equal signature values) needed
+# to join a cluster. With 16 bands of 4 rows, pairs at 0.5 similarity
+# share a bucket with ~65% probability, pairs at 0.7 with ~99%.
+SIMILARITY_THRESHOLD = 0.5
+
+# Clusters compared per review, so very common buckets stay cheap
+MAX_CANDIDATES = 100
+
+_ROWS_PER_BAND = NUM_PERM // LSH_BANDS
+
+# Multiply-shift hash family: h(x) = (a * x + b) mod 2^64, top 32 bits
+_rng = np.random.default_rng(SIGNATURE_SEED)
+_PERM_A = (_rng.integers(0, 2 ** 63, NUM_PERM, dtype=np.uint64) * np.uint64(2) + np.uint64(1))[:, None]
+_PERM_B = _rng.integers(0, 2 ** 63, NUM_PERM, dtype=np.uint64)[:, None]
+# Odd multipliers folding the rows of a band into one 64-bit bucket key
+_BAND_MIX = _rng.integers(0, 2 ** 63, _ROWS_PER_BAND, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+
+# Initial capacity of an index's signature matrix (grown by doubling)
+_INITIAL_CAPACITY = 1024
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def shingles(text: str) -> np.ndarray:
+    """
+    Hash the character shingles of a text.
+    
+    Args:
+        text: Cleaned feedback text
+    
+    Returns:
+        Array of unique uint64 shingle hashes (empty for blank text)
+    """
+    text = _WHITESPACE.sub(' ', text or '').strip()
+    if not text:
+        return np.empty(0, dtype=np.uint64)
+    
+    encoded = text.encode('utf-8')
+    if len(encoded) <= SHINGLE_SIZE:
+        grams = {encoded}
+    else:
+        grams = {encoded[i:i + SHINGLE_SIZE] for i in range(len(encoded) - SHINGLE_SIZE + 1)}
+    return np.fromiter((zlib.crc32(gram) for gram in grams), dtype=np.uint64, count=len(grams))
+
+
+def minhash(text: str):
+    """
+    Compute the MinHash signature of a text.
+    
+    Args:
+        text: Cleaned feedback text
+    
+    Returns:
+        uint32 array of length NUM_PERM, or None for blank text
+    """
+    hashes = shingles(text)
+    if hashes.size == 0:
+        return None
+    
+    # uint64 arithmetic wraps, which is the mod 2^64 of the hash family
+    permuted = (_PERM_A * hashes[None, :] + _PERM_B) >> np.uint64(32)
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+def _band_keys(signature: np.ndarray) -> list:
+    """
+    Hash each band of a signature to an integer LSH bucket key.
+    
+    Distinct bands rarely share a key; when they do, the similarity
+    check in _best_match filters the extra candidate out.
+    """
+    bands = signature.reshape(LSH_BANDS, _ROWS_PER_BAND).astype(np.uint64)
+    return (bands * _BAND_MIX).sum(axis=1).tolist()
+
+
+class IssueClusterIndex:
+    """
+    In-memory LSH index of issue clusters.
+    
+    Each cluster is represented by the signature of its first member;
+    a review joins the most similar candidate cluster above
+    SIMILARITY_THRESHOLD, otherwise it starts a new cluster.
+    
+    Most reviews start their own cluster, so storage is kept compact:
+    signatures are rows of one matrix, and a bucket holding a single
+    cluster stores its id rather than a list.
+    """
+    
+    def __init__(self, next_id: int = 1, threshold: float = SIMILARITY_THRESHOLD):
+        """
+        Create an empty index.
+        
+        Args:
+            next_id: First id to give a new cluster
+            threshold: Similarity needed to join an existing cluster
+        """
+        self.threshold = threshold
+        self.next_id = next_id
+        self.sizes = {}
+        self.samples = {}
+        self.new_clusters = []
+        self.matched_clusters = set()
+        self._rows = {}
+        self._matrix = np.empty((_INITIAL_CAPACITY, NUM_PERM), dtype=np.uint32)
+        self._buckets = [{} for _ in range(LSH_BANDS)]
+    
+    def signature(self, cluster_id: int) -> np.ndarray:
+        """Return the signature representing a cluster."""
+        return self._matrix[self._rows[cluster_id]]
+    
+    def add_cluster(self, cluster_id: int, signature: np.ndarray, size: int = 0):
+        """Register an existing (stored) cluster."""
+        row = len(self._rows)
+        if row == len(self._matrix):
+            self._matrix = np.concatenate([self._matrix, np.empty_like(self._matrix)])
+        self._matrix[row] = signature
+        self._rows[cluster_id] = row
+        self.sizes[cluster_id] = size
+        
+        for bucket, key in zip(self._buckets, _band_keys(signature)):
+            members = bucket.get(key)
+            if members is None:
+                bucket[key] = cluster_id
+            elif isinstance(members, list):
+                members.append(cluster_id)
+            else:
+                bucket[key] = [members, cluster_id]
+        self.next_id = max(self.next_id, cluster_id + 1)
+    
+    def _best_match(self, signature: np.ndarray):
+        """Return the most similar candidate cluster above the threshold, or None."""
+        candidates = []
+        seen = set()
+        for bucket, key in zip(self._buckets, _band_keys(signature)):
+            members = bucket.get(key)
+            if members is None:
+                continue
+            for cluster_id in members if isinstance(members, list) else (members,):
+                if cluster_id not in seen:
+                    seen.add(cluster_id)
+                    candidates.append(cluster_id)
+            if len(candidates) >= MAX_CANDIDATES:
+                break
+        if not candidates:
+            return None
+        
+        candidates = candidates[:MAX_CANDIDATES]
+        stacked = self._matrix[[self._rows[cluster_id] for cluster_id in candidates]]
+        similarity = (stacked == signature).mean(axis=1)
+        best = int(similarity.argmax())
+        return candidates[best] if similarity[best] >= self.threshold else None
+    
+    def assign(self, text: str):
+        """
+        Add one review to the index.
+        
+        Args:
+            text: Cleaned feedback text
+        
+        Returns:
+            Cluster id, or None for blank text
+        """
+        signature = minhash(text)
+        if signature is None:
+            return None
+        
+        cluster_id = self._best_match(signature)
+        if cluster_id is None:
+            cluster_id = self.next_id
+            self.next_id += 1
+            self.add_cluster(cluster_id, signature)
+            self.samples[cluster_id] = text
+            self.new_clusters.append(cluster_id)
+        else:
+            self.matched_clusters.add(cluster_id)
+        
+        self.sizes[cluster_id] += 1
+        return cluster_id
+    
+    def assign_batch(self, texts) -> list:
+        """
+        Add many reviews; identical texts are signed once.
+        
+        Args:
+            texts: Sequence of cleaned feedback texts
+        
+        Returns:
+            List of cluster ids (None for blank texts) aligned with texts
+        """
+        assigned = {}
+        cluster_ids = []
+        for text in texts:
+            if text in assigned:
+                cluster_id = assigned[text]
+                if cluster_id is not None:
+                    self.sizes[cluster_id] += 1
+            else:
+                cluster_id = self.assign(text)
+                assigned[text] = cluster_id
+            cluster_ids.append(cluster_id)
+        return cluster_ids
+    
+    def pop_new_clusters(self) -> list:
+        """
+        Return clusters created since the last call, for persisting.
+        
+        Returns:
+            List of (cluster_id, signature, sample text) tuples
+        """
+        created = [
+            (cluster_id, self.signature(cluster_id).copy(), self.samples.pop(cluster_id, None))
+            for cluster_id in self.new_clusters
+        ]
+        self.new_clusters = []
+        return created
+    
+    def pop_matched_clusters(self) -> list:
+        """
+        Return existing clusters that gained members since the last call.
+        
+        Returns:
+            List of cluster ids
+        """
+        matched = sorted(self.matched_clusters)
+        self.matched_clusters = set()
+        return matched
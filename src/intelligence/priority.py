@@ -3,6 +3,7 @@ Priority scoring module.
 
 Assigns priority scores to feedback based on urgency and impact.
 """
+import numpy as np
 
 
 def calculate_priority(sentiment_score: float, frequency: int, recency_days: int) -> float:
@@ -46,4 +47,32 @@ def calculate_priority(sentiment_score: float, frequency: int, recency_days: int
     
     priority = negativity_recency + frequency_bonus
     
-    return round(priority, 2)
\ No newline at end of file
+    return round(priority, 2)
+
+
+def calculate_priority_batch(sentiment_scores, frequencies, recency_days) -> np.ndarray:
+    """
+    Calculate priority scores for many feedback items at once.
+    
+    Vectorized equivalent of calculate_priority, using the same formula.
+    
+    Args:
+        sentiment_scores: Array of sentiment scores (-1 to 1)
+        frequencies: Array of similar feedback counts
+        recency_days: Array of days since each feedback was posted (NaN =
+            unknown, which gets no recency weight, as in calculate_priority)
+    
+    Returns:
+        Array of priority scores (0 for positive/neutral sentiment)
+    """
+    sentiment_scores = np.asarray(sentiment_scores, dtype=np.float64)
+    frequencies = np.asarray(frequencies, dtype=np.float64)
+    recency_days = np.asarray(recency_days, dtype=np.float64)
+    
+    negativity = np.abs(sentiment_scores)
+    # fmax, like the scalar max(0, nan), yields 0 for an unknown recency
+    recency_weight = np.fmax(0, 30 - recency_days) / 30
+    priority = negativity * recency_weight * 80 + frequencies * 3
+    
+    priority = np.round(priority, 2)
+    return np.where(sentiment_scores >= 0, 0.0, priority)
@@ -6,6 +6,101 @@ Identifies trends and patterns in feedback over time.
 import pandas as pd
 
 
+class SentimentTrendAccumulator:
+    """
+    Mergeable per-day sentiment state (count and sum of scores).
+    
+    Chunks can be added one at a time with update(), and accumulators
+    built on different partitions or workers combined with merge().
+    result() returns the same summary as analyze_sentiment_trend on the
+    concatenated rows (up to floating-point summation order).
+    """
+    
+    def __init__(self):
+        """Create an empty accumulator."""
+        self.daily_sum = {}
+        self.daily_count = {}
+        self.total_sum = 0.0
+        self.total_count = 0
+    
+    def update(self, df: pd.DataFrame) -> 'SentimentTrendAccumulator':
+        """
+        Add a chunk of feedback.
+        
+        Args:
+            df: DataFrame with 'date' and 'sentiment_score' columns
+        
+        Returns:
+            self, for chaining
+        """
+        if df.empty or 'date' not in df.columns or 'sentiment_score' not in df.columns:
+            return self
+        
+        # Scores may be float32; sum in float64
+        scores = df['sentiment_score'].astype('float64')
+        days = pd.to_datetime(df['date']).dt.date
+        daily = scores.groupby(days).agg(['sum', 'count'])
+        for day, day_sum, day_count in zip(daily.index, daily['sum'], daily['count']):
+            if day_count == 0:
+                continue
+            self.daily_sum[day] = self.daily_sum.get(day, 0.0) + float(day_sum)
+            self.daily_count[day] = self.daily_count.get(day, 0) + int(day_count)
+        
+        self.total_sum += float(scores.sum())
+        self.total_count += int(scores.count())
+        return self
+    
+    def add_daily_totals(self, daily_sum: dict, daily_count: dict) -> 'SentimentTrendAccumulator':
+        """
+        Add precomputed per-day sums and counts (e.g. from rollup tables).
+        
+        Args:
+            daily_sum: dict of date -> sum of sentiment scores
+            daily_count: dict of date -> number of scored rows
+        
+        Returns:
+            self, for chaining
+        """
+        for day, day_count in daily_count.items():
+            if not day_count:
+                continue
+            self.daily_sum[day] = self.daily_sum.get(day, 0.0) + float(daily_sum[day])
+            self.daily_count[day] = self.daily_count.get(day, 0) + int(day_count)
+            self.total_sum += float(daily_sum[day])
+            self.total_count += int(day_count)
+        return self
+    
+    def merge(self, other: 'SentimentTrendAccumulator') -> 'SentimentTrendAccumulator':
+        """
+        Combine another accumulator's state into this one.
+        
+        Returns:
+            self, for chaining
+        """
+        for day, day_count in other.daily_count.items():
+            self.daily_sum[day] = self.daily_sum.get(day, 0.0) + other.daily_sum[day]
+            self.daily_count[day] = self.daily_count.get(day, 0) + day_count
+        self.total_sum += other.total_sum
+        self.total_count += other.total_count
+        return self
+    
+    def result(self) -> dict:
+        """Compute the trend summary from the accumulated state."""
+        if self.total_count == 0:
+            return {
+                'daily_sentiment': {},
+                'overall_trend': 'stable',
+                'negative_spike_dates': [],
+                'avg_sentiment': 0.0
+            }
+        
+        daily_sentiment = {
+            day: self.daily_sum[day] / self.daily_count[day]
+            for day in sorted(self.daily_count)
+        }
+        return summarize_sentiment_trend(daily_sentiment, self.total_sum / self.total_count)
+
+
 def analyze_sentiment_trend(df: pd.DataFrame) -> dict:
     """
     Analyze sentiment trends over time.
@@ -20,26 +115,26 @@ def analyze_sentiment_trend(df: pd.DataFrame) -> dict:
             - negative_spike_dates: list of dates with significant negative sentiment
             - avg_sentiment: overall average sentiment score
     """
-    if df.empty or 'date' not in df.columns or 'sentiment_score' not in df.columns:
-        return {
-            'daily_sentiment': {},
-            'overall_trend': 'stable',
-            'negative_spike_dates': [],
-            'avg_sentiment': 0.0
-        }
+    return SentimentTrendAccumulator().update(df).result()
+
+
+def summarize_sentiment_trend(daily_sentiment: dict, avg_sentiment: float) -> dict:
+    """
+    Build the trend summary from per-day average sentiment.
     
-    df = df.copy()
-    df['date'] = pd.to_datetime(df['date']).dt.date
+    Shared by every path that produces daily averages (in-memory
+    frames, streamed chunks, rollup tables).
     
-    # Group by date and calculate average sentiment
-    daily_sentiment = df.groupby('date')['sentiment_score'].mean().to_dict()
+    Args:
+        daily_sentiment: dict of date -> average sentiment score
+        avg_sentiment: Overall average sentiment score
     
+    Returns:
+        Trend summary dict (see analyze_sentiment_trend)
+    """
     # Convert dates to strings for JSON serialization
     daily_sentiment = {str(k): round(v, 3) for k, v in daily_sentiment.items()}
     
-    # Calculate overall average
-    avg_sentiment = df['sentiment_score'].mean()
-    
     # Detect negative spikes (days with avg sentiment below -0.3)
     negative_spike_dates = [
         date for date, score in daily_sentiment.items() if score < -0.3
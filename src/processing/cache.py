@@ -0,0 +1,167 @@
+"""
+Result cache module.
+
+Persists sentiment and category results keyed by a hash of the cleaned
+text, so unchanged feedback is not re-scored on every run.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+
+# Configuration
+RESULT_CACHE_PATH = os.getenv("RESULT_CACHE_PATH", "data/result_cache.db")
+MAX_CACHE_ENTRIES = 500_000
+# Eviction trims this fraction below the bound, so the table is only
+# counted again after that many more inserts
+EVICT_FRACTION = 0.1
+
+# SQLite limits the number of bound parameters per statement
+_QUERY_CHUNK = 500
+
+
+def _hash_key(namespace: str, text: str) -> str:
+    """Build the cache key for a text under a model/version namespace."""
+    return hashlib.sha256(f"{namespace}\0{text}".encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """Size-bounded on-disk key-value cache backed by SQLite."""
+
+    def __init__(self, path: str = RESULT_CACHE_PATH, max_entries: int = MAX_CACHE_ENTRIES):
+        """Open (or create) the cache database."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.max_entries = max_entries
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " accessed REAL NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_results_accessed ON results (accessed)"
+        )
+        self.conn.commit()
+        # Upper bound on the row count (replaced keys are counted again)
+        self.entries = self._count()
+
+    def _count(self) -> int:
+        """Count the cached rows (a full scan)."""
+        return self.conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def get_many(self, namespace: str, texts) -> dict:
+        """
+        Look up cached results.
+
+        Args:
+            namespace: Model name and version the results belong to
+            texts: Iterable of texts
+
+        Returns:
+            dict of text -> cached result for every hit
+        """
+        keys = {_hash_key(namespace, text): text for text in texts}
+        found = {}
+        key_list = list(keys)
+        for start in range(0, len(key_list), _QUERY_CHUNK):
+            chunk = key_list[start:start + _QUERY_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT key, value FROM results WHERE key IN ({placeholders})",
+                chunk
+            ).fetchall()
+            for key, value in rows:
+                found[keys[key]] = json.loads(value)
+
+        # Refresh access time so hits survive eviction
+        if found:
+            now = time.time()
+            self.conn.executemany(
+                "UPDATE results SET accessed = ? WHERE key = ?",
+                [(now, _hash_key(namespace, text)) for text in found]
+            )
+            self.conn.commit()
+
+        return found
+
+    def set_many(self, namespace: str, results: dict):
+        """
+        Store results and evict the least recently used entries if needed.
+
+        Once the cache exceeds max_entries, the least recently used
+        entries are evicted down to EVICT_FRACTION below it.
+
+        Args:
+            namespace: Model name and version the results belong to
+            results: dict of text -> JSON-serializable result
+        """
+        if not results:
+            return
+
+        now = time.time()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO results (key, value, accessed) VALUES (?, ?, ?)",
+            [
+                (_hash_key(namespace, text), json.dumps(value), now)
+                for text, value in results.items()
+            ]
+        )
+
+        # The exact count is only taken once the bound may be exceeded
+        self.entries += len(results)
+        if self.entries > self.max_entries:
+            self.entries = self._count()
+            if self.entries > self.max_entries:
+                keep = int(self.max_entries * (1 - EVICT_FRACTION))
+                self.conn.execute(
+                    "DELETE FROM results WHERE key IN ("
+                    " SELECT key FROM results ORDER BY accessed ASC LIMIT ?)",
+                    (self.entries - keep,)
+                )
+                self.entries = keep
+        self.conn.commit()
+
+    def close(self):
+        """Close the underlying database connection."""
+        self.conn.close()
+
+
+def cached_batch(texts, compute_batch, cache: ResultCache = None, namespace: str = "") -> list:
+    """
+    Compute results for texts, scoring each distinct text at most once.
+
+    Exact duplicates are collapsed, cached results are reused, and only
+    the remaining texts are passed to compute_batch. None results mark
+    failures: they are returned but not cached, so the text is computed
+    again next time.
+
+    Args:
+        texts: Sequence of texts
+        compute_batch: Function mapping a list of texts to a list of
+            results (None where computing a text failed)
+        cache: Optional ResultCache to read from and write to
+        namespace: Model name and version used to key the cache
+
+    Returns:
+        List of results aligned with texts
+    """
+    texts = list(texts)
+    unique = list(dict.fromkeys(texts))
+
+    results = cache.get_many(namespace, unique) if cache is not None else {}
+    missing = [text for text in unique if text not in results]
+
+    if missing:
+        computed = dict(zip(missing, compute_batch(missing)))
+        if cache is not None:
+            cache.set_many(namespace, {text: result for text, result in computed.items() if result is not None})
+        results.update(computed)
+
+    return [results[text] for text in texts]
@@ -3,10 +3,17 @@ Feedback categorizer module.
 
 Categorizes feedback into predefined topics or themes.
 """
+import hashlib
+import json
+import re
+
+import pandas as pd
+
 CATEGORY_KEYWORDS = {
     'Bug': [
         'bug', 'crash', 'error', 'broken', 'fix', 'issue', 'problem',
-        'not working', 'doesnt work', 'fails', 'glitch', 'freeze'
+        'not working', 'doesnt work', 'fails', 'glitch', 'freeze',
+        'bugged', 'buggy'
     ],
     'Feature Request': [
         'feature', 'add', 'want', 'need', 'wish', 'should have',
@@ -14,7 +21,8 @@ CATEGORY_KEYWORDS = {
     ],
     'Performance': [
         'slow', 'fast', 'speed', 'lag', 'performance', 'loading',
-        'battery', 'memory', 'cpu', 'optimization', 'heavy'
+        'battery', 'memory', 'cpu', 'optimization', 'heavy',
+        'lagged', 'lagging', 'laggy'
     ],
     'UI/UX': [
         'ui', 'ux', 'design', 'interface', 'layout', 'look', 'ugly',
@@ -23,10 +31,73 @@ CATEGORY_KEYWORDS = {
 }
 
 
+def _trie_regex(words) -> str:
+    """
+    Build a regex alternation for words, factored as a prefix trie.
+    
+    Shared prefixes are matched once, so adding keywords does not add
+    a full scan per keyword.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    return _trie_node_regex(trie)
+
+
+def _trie_node_regex(node: dict) -> str:
+    """Convert one trie node (and its children) into a regex fragment."""
+    is_end = '' in node
+    branches = [
+        re.escape(char) + _trie_node_regex(child)
+        for char, child in sorted(node.items()) if char != ''
+    ]
+    if not branches:
+        return ''
+    if len(branches) == 1 and not is_end:
+        return branches[0]
+    body = '(?:' + '|'.join(branches) + ')'
+    return body + '?' if is_end else body
+
+
+# Keywords match whole words, allowing simple inflections ("crash"
+# matches "crashes", "slow" matches "slowly", but "ui" does not match
+# "guide"). Forms that double the final consonant ("laggy", "bugged")
+# are listed as keywords.
+_INFLECTION = r'(?:s|es|d|ed|ing|er|est|ly|y)?'
+
+# Cache namespace derived from the keyword table and inflections, so
+# editing either invalidates previously cached categories
+CATEGORY_CACHE_NAMESPACE = "category:v2:" + hashlib.sha256(
+    json.dumps([CATEGORY_KEYWORDS, _INFLECTION], sort_keys=True).encode("utf-8")
+).hexdigest()[:16]
+
+# One word-bounded pattern per category, in priority order
+_CATEGORY_NAMES = list(CATEGORY_KEYWORDS)
+_CATEGORY_PATTERNS = {
+    category: re.compile(r'\b' + _trie_regex(keywords) + _INFLECTION + r'\b')
+    for category, keywords in CATEGORY_KEYWORDS.items()
+}
+
+# Combined pattern: a lookahead at every position reports the highest
+# priority category whose keyword starts there, so one scan finds all hits
+_COMBINED_PATTERN = re.compile(
+    r'(?=\b(?:' + '|'.join(
+        f'(?P<c{i}>{_trie_regex(keywords)})'
+        for i, keywords in enumerate(CATEGORY_KEYWORDS.values())
+    ) + r')' + _INFLECTION + r'\b)'
+)
+
+
 def categorize_feedback(text: str) -> str:
     """
     Categorize feedback based on keywords.
     
+    Keywords match whole words (plus simple inflections), and the first
+    category in CATEGORY_KEYWORDS with a hit wins.
+    
     Args:
         text: Feedback text
     
@@ -36,11 +107,40 @@ def categorize_feedback(text: str) -> str:
     if not text:
         return 'Other'
     
-    text_lower = text.lower()
+    best = None
+    for match in _COMBINED_PATTERN.finditer(text.lower()):
+        index = int(match.lastgroup[1:])
+        if best is None or index < best:
+            best = index
+            if best == 0:
+                break
+    
+    return 'Other' if best is None else _CATEGORY_NAMES[best]
+
+
+def categorize_batch(texts: pd.Series) -> pd.Series:
+    """
+    Categorize a Series of feedback texts.
+    
+    Runs one vectorized regex pass per category, in priority order,
+    over the rows that are still unassigned.
+    
+    Args:
+        texts: Series of feedback text
+    
+    Returns:
+        Series of category strings with the same index as texts
+    """
+    texts = texts.fillna('').astype(str).str.lower()
+    categories = pd.Series('Other', index=texts.index, dtype=object)
+    unassigned = texts != ''
     
-    for category, keywords in CATEGORY_KEYWORDS.items():
-        for keyword in keywords:
-            if keyword in text_lower:
-                return category
+    for category, pattern in _CATEGORY_PATTERNS.items():
+        if not unassigned.any():
+            break
+        hits = texts[unassigned].str.contains(pattern)
+        hit_index = hits.index[hits.to_numpy()]
+        categories[hit_index] = category
+        unassigned[hit_index] = False
     
-    return 'Other'
\ No newline at end of file
+    return categories
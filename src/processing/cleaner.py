@@ -6,6 +6,24 @@ Cleans and preprocesses raw feedback text for analysis.
 import re
 
 
+# Compiled once; used by both clean_text and clean_batch
+URL_PATTERN = re.compile(r'http\S+|www\S+|https\S+')
+# Emoji ranges: various Unicode blocks. a-z, 0-9 and space are already
+# covered by \w and \s; listing them first makes the common case faster.
+SPECIAL_CHARS_PATTERN = re.compile(r'[^a-z0-9 \w\s\U0001F300-\U0001F9FF\U00002600-\U000026FF\U00002700-\U000027BF]')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# clean_batch joins a batch into one string with this separator. It is
+# whitespace, so URL matches stop at it and the special-character pass
+# keeps it; texts that contain it are cleaned one by one instead.
+_SEPARATOR = '\x1e'
+
+# Entries kept by a clean_batch cache before it is cleared
+CLEAN_CACHE_MAX_ENTRIES = 200_000
+# Texts joined per regex pass; bounds the temporary strings
+CLEAN_JOIN_SIZE = 10_000
+
+
 def clean_text(text: str) -> str:
     """
     Clean and preprocess text for analysis.
@@ -22,13 +40,57 @@ def clean_text(text: str) -> str:
     text = str(text).lower()
     
     # Remove URLs
-    text = re.sub(r'http\S+|www\S+|https\S+', '', text)
+    text = URL_PATTERN.sub('', text)
     
     # Remove special characters but keep emojis and alphanumeric
-    # Emoji ranges: various Unicode blocks
-    text = re.sub(r'[^\w\s\U0001F300-\U0001F9FF\U00002600-\U000026FF\U00002700-\U000027BF]', '', text)
+    text = SPECIAL_CHARS_PATTERN.sub('', text)
     
     # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = WHITESPACE_PATTERN.sub(' ', text).strip()
+    
+    return text
+
+
+def _clean_joined(texts: list) -> list:
+    """Clean separator-free texts with one regex pass each over the joined batch."""
+    # Lowercasing per text keeps mostly-ASCII texts compact (and the
+    # context-dependent final sigma rule confined to its own text)
+    joined = _SEPARATOR.join([text.lower() for text in texts])
+    joined = URL_PATTERN.sub('', joined)
+    joined = SPECIAL_CHARS_PATTERN.sub('', joined)
+    # str.split() splits on the same characters as \s and drops the
+    # leading and trailing runs, i.e. collapse + strip in one call
+    return [' '.join(text.split()) for text in joined.split(_SEPARATOR)]
+
+
+def clean_batch(texts, cache: dict = None) -> list:
+    """
+    Clean many texts at once; output is identical to clean_text per text.
+    
+    Identical texts are cleaned once, and the regex passes run over
+    joined slices of CLEAN_JOIN_SIZE texts instead of once per text.
+    
+    Args:
+        texts: Iterable of raw texts (a list or pandas Series)
+        cache: Optional dict of raw text -> cleaned text, reused across
+            calls and cleared once it exceeds CLEAN_CACHE_MAX_ENTRIES
+    
+    Returns:
+        List of cleaned texts in input order
+    """
+    raw = ["" if text is None else str(text) for text in texts]
+    cleaned = {} if cache is None else cache
+    if len(cleaned) > CLEAN_CACHE_MAX_ENTRIES:
+        cleaned.clear()
+    
+    pending = [text for text in dict.fromkeys(raw) if text not in cleaned]
+    if pending:
+        joinable = [text for text in pending if _SEPARATOR not in text]
+        for start in range(0, len(joinable), CLEAN_JOIN_SIZE):
+            texts = joinable[start:start + CLEAN_JOIN_SIZE]
+            cleaned.update(zip(texts, _clean_joined(texts)))
+        for text in pending:
+            if _SEPARATOR in text:
+                cleaned[text] = clean_text(text)
     
-    return text
\ No newline at end of file
+    return [cleaned[text] for text in raw]
@@ -0,0 +1,82 @@
+"""
+Parallel processing module.
+
+Runs the per-row text stages (cleaning, VADER, categorization) on a
+process pool, splitting inputs into ordered chunks.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from nltk.sentiment.vader import SentimentIntensityAnalyzer
+
+from processing.cleaner import clean_batch
+from processing.categorizer import categorize_batch
+from processing.sentiment import vader_polarity
+
+
+# Default number of rows handed to a worker at a time
+DEFAULT_CHUNK_SIZE = 1000
+
+# Per-process VADER analyzer, created once by the pool initializer
+_vader = None
+
+# Per-process raw -> cleaned text cache, kept across chunks
+_clean_cache = {}
+
+
+def _init_worker():
+    """Initialize the VADER analyzer for this worker process."""
+    global _vader
+    _vader = SentimentIntensityAnalyzer()
+
+
+def clean_chunk(texts: list) -> list:
+    """Clean a chunk of raw texts."""
+    return clean_batch(texts, _clean_cache)
+
+
+def vader_chunk(texts: list) -> list:
+    """Score a chunk of cleaned texts with VADER."""
+    if _vader is None:
+        _init_worker()
+    return [vader_polarity(_vader, text) for text in texts]
+
+
+def categorize_chunk(texts: list) -> list:
+    """Categorize a chunk of cleaned texts."""
+    return categorize_batch(pd.Series(texts, dtype=object)).tolist()
+
+
+def create_executor(workers: int) -> ProcessPoolExecutor:
+    """
+    Create a process pool with one VADER analyzer per worker.
+    
+    Args:
+        workers: Number of worker processes
+    
+    Returns:
+        ProcessPoolExecutor ready for map_chunks
+    """
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+
+
+def map_chunks(func, items, executor: ProcessPoolExecutor = None,
+               chunk_size: int = DEFAULT_CHUNK_SIZE) -> list:
+    """
+    Apply a chunk function to items, optionally across a process pool.
+    
+    Args:
+        func: Module-level function mapping a list of items to a list of results
+        items: Sequence of items
+        executor: Process pool to run on; runs in-process when None
+        chunk_size: Number of items per chunk
+    
+    Returns:
+        List of results in the same order as items
+    """
+    items = list(items)
+    if executor is None:
+        return func(items)
+    
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    return [result for chunk in executor.map(func, chunks) for result in chunk]
@@ -3,23 +3,81 @@ Sentiment analysis module.
 
 Analyzes the sentiment of feedback text (positive, negative, neutral).
 """
+import math
+import os
+import time
+
 import nltk
 from nltk.sentiment.vader import SentimentIntensityAnalyzer
-from transformers import pipeline
+
+from processing.cache import ResultCache, cached_batch
+
+
+TRANSFORMER_MODEL = "distilbert-base-uncased-finetuned-sst-2-english"
+
+# Number of texts sent to the transformer per forward pass
+TRANSFORMER_BATCH_SIZE = 32
+
+# Transformer inference backend for CPU hosts:
+#   'pytorch' - full-precision PyTorch model
+#   'int8'    - PyTorch model with dynamic int8 quantization of Linear layers
+#   'onnx'    - ONNX Runtime session (needs optimum[onnxruntime]); the
+#               exported model is kept in ONNX_MODEL_DIR
+TRANSFORMER_BACKENDS = ('pytorch', 'int8', 'onnx')
+TRANSFORMER_BACKEND = os.getenv("TRANSFORMER_BACKEND", "pytorch")
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", os.path.join("data", "models", "onnx", TRANSFORMER_MODEL))
+
+# Cache namespaces: bump the version when scoring logic changes. Backends
+# score slightly differently, so each gets its own transformer namespace.
+VADER_CACHE_NAMESPACE = f"vader:nltk-{nltk.__version__}:v1"
+TRANSFORMER_CACHE_NAMESPACE = f"transformer:{TRANSFORMER_MODEL}:v1"
+
+# Which model(s) produce sentiment: 'vader' (primary, no transformer
+# load), 'transformer' (primary), 'both' (VADER primary, transformer
+# scores kept alongside for comparison), or 'cascade' (VADER, with the
+# transformer re-scoring only the rows VADER is unsure about)
+SENTIMENT_MODES = ('vader', 'transformer', 'both', 'cascade')
+
+# Cascade mode: a row goes to the transformer when its VADER compound is
+# within CASCADE_BAND of zero, or when the VADER label contradicts the
+# star rating (>= 4 stars but negative, <= 2 stars but positive)
+CASCADE_BAND = float(os.getenv("CASCADE_BAND", "0.2"))
 
 
 class SentimentAnalyzer:
     """Sentiment analyzer using VADER and HuggingFace transformers."""
     
-    def __init__(self):
-        """Initialize sentiment analysis models."""
-        nltk.download('vader_lexicon', quiet=True)
+    def __init__(self, cache: ResultCache = None, backend: str = TRANSFORMER_BACKEND):
+        """
+        Initialize the VADER analyzer; the transformer loads on first use.
+        
+        Args:
+            cache: Optional ResultCache consulted by the batch methods
+            backend: Transformer inference backend, one of TRANSFORMER_BACKENDS
+        """
+        if backend not in TRANSFORMER_BACKENDS:
+            raise ValueError(f"Unknown transformer backend: {backend} (expected one of {TRANSFORMER_BACKENDS})")
+        
+        ensure_vader_lexicon()
         self.vader = SentimentIntensityAnalyzer()
-        self.transformer = pipeline(
-            "sentiment-analysis",
-            model="distilbert-base-uncased-finetuned-sst-2-english",
-            truncation=True
-        )
+        self.backend = backend
+        self._transformer = None
+        self.cache = cache
+    
+    @property
+    def transformer(self):
+        """HuggingFace sentiment pipeline, imported and loaded on first access."""
+        if self._transformer is None:
+            print(f"  Loading transformer model ({self.backend})...")
+            self._transformer = load_transformer(self.backend)
+        return self._transformer
+    
+    @property
+    def transformer_cache_namespace(self) -> str:
+        """Result cache namespace for this analyzer's transformer backend."""
+        if self.backend == 'pytorch':
+            return TRANSFORMER_CACHE_NAMESPACE
+        return f"{TRANSFORMER_CACHE_NAMESPACE}:{self.backend}"
     
     def vader_sentiment(self, text: str) -> dict:
         """
@@ -31,20 +89,27 @@ class SentimentAnalyzer:
         Returns:
             dict with 'label' and 'score'
         """
-        if not text:
-            return {'label': 'neutral', 'score': 0.0}
+        return vader_polarity(self.vader, text)
+    
+    def vader_sentiment_batch(self, texts, map_func=None) -> dict:
+        """
+        Analyze sentiment for many texts using VADER.
         
-        scores = self.vader.polarity_scores(text)
-        compound = scores['compound']
+        Duplicate texts are scored once and cached results are reused.
         
-        if compound >= 0.05:
-            label = 'positive'
-        elif compound <= -0.05:
-            label = 'negative'
-        else:
-            label = 'neutral'
+        Args:
+            texts: Sequence of input texts
+            map_func: Optional function scoring a list of texts, e.g. a
+                process-pool runner; defaults to this analyzer in-process
         
-        return {'label': label, 'score': compound}
+        Returns:
+            dict with 'label' and 'score' lists aligned with texts
+        """
+        if map_func is None:
+            map_func = lambda batch: [self.vader_sentiment(text) for text in batch]
+        
+        results = cached_batch(texts, map_func, self.cache, VADER_CACHE_NAMESPACE)
+        return _to_columns(results)
     
     def transformer_sentiment(self, text: str) -> dict:
         """
@@ -66,4 +131,295 @@ class SentimentAnalyzer:
             return {'label': label, 'score': score}
         except Exception as e:
             print(f"Transformer sentiment error: {e}")
-            return {'label': 'neutral', 'score': 0.0}
\ No newline at end of file
+            return {'label': 'neutral', 'score': 0.0}
+    
+    def transformer_sentiment_batch(self, texts, batch_size: int = TRANSFORMER_BATCH_SIZE) -> dict:
+        """
+        Analyze sentiment for many texts using batched transformer inference.
+        
+        Duplicate texts are scored once and cached results are reused.
+        The remaining texts are sorted by length so each batch holds
+        similarly sized inputs and dynamic padding stays small.
+        
+        Args:
+            texts: Sequence of input texts
+            batch_size: Number of texts per forward pass
+        
+        Returns:
+            dict with 'label' and 'score' lists aligned with texts; rows
+            the transformer failed on are neutral with score 0.0
+        """
+        results = self._transformer_results(texts, batch_size)
+        return _to_columns([
+            {'label': 'neutral', 'score': 0.0} if result is None else result
+            for result in results
+        ])
+    
+    def cascade_sentiment_batch(self, texts, ratings=None, vader_results: dict = None,
+                                band: float = CASCADE_BAND, map_func=None) -> dict:
+        """
+        Analyze sentiment with VADER, escalating uncertain rows to the transformer.
+        
+        Escalated rows take the transformer's label, with its confidence
+        rescaled to the VADER compound range (see combine_transformer_score).
+        
+        Args:
+            texts: Sequence of input texts
+            ratings: Optional star ratings aligned with texts (NaN = unknown)
+            vader_results: VADER results for texts, if already computed
+            band: Half-width of the uncertain compound band around zero
+            map_func: Passed to vader_sentiment_batch when VADER runs here
+        
+        Returns:
+            dict with 'label', 'score' and 'path' lists aligned with texts;
+            path is 'vader', 'uncertain' or 'rating_mismatch'
+        """
+        texts = list(texts)
+        if vader_results is None:
+            vader_results = self.vader_sentiment_batch(texts, map_func)
+        
+        labels = list(vader_results['label'])
+        scores = list(vader_results['score'])
+        paths = cascade_paths(texts, labels, scores, ratings, band)
+        
+        escalated = [i for i, path in enumerate(paths) if path != 'vader']
+        if escalated:
+            results = self._transformer_results([texts[i] for i in escalated])
+            for i, result in zip(escalated, results):
+                if result is None:
+                    # Transformer failed on this row; keep VADER's result
+                    paths[i] = 'vader'
+                    continue
+                scores[i] = combine_transformer_score(result['score'])
+                labels[i] = polarity_label(scores[i])
+        
+        return {'label': labels, 'score': scores, 'path': paths}
+    
+    def _transformer_results(self, texts, batch_size: int = TRANSFORMER_BATCH_SIZE) -> list:
+        """Cached transformer results aligned with texts; None where inference failed."""
+        return cached_batch(
+            texts,
+            lambda batch: self._run_transformer(batch, batch_size),
+            self.cache,
+            self.transformer_cache_namespace
+        )
+    
+    def _run_transformer(self, texts: list, batch_size: int) -> list:
+        """
+        Run the transformer over texts in length-sorted batches.
+        
+        Rows of a batch whose inference raised are None, so they are
+        not cached and are scored again on the next run.
+        """
+        results = [{'label': 'neutral', 'score': 0.0} for _ in texts]
+        
+        # Empty texts keep the neutral default, like transformer_sentiment
+        order = sorted(
+            (i for i, text in enumerate(texts) if text),
+            key=lambda i: len(texts[i])
+        )
+        if not order:
+            return results
+        
+        # Load errors propagate; only per-batch inference errors are skipped
+        transformer = self.transformer
+        
+        for start in range(0, len(order), batch_size):
+            indices = order[start:start + batch_size]
+            batch = [texts[i][:512] for i in indices]
+            try:
+                outputs = transformer(batch, batch_size=len(batch))
+            except Exception as e:
+                print(f"Transformer sentiment error: {e}")
+                for i in indices:
+                    results[i] = None
+                continue
+            
+            for i, output in zip(indices, outputs):
+                label = output['label'].lower()
+                score = output['score'] if label == 'positive' else -output['score']
+                results[i] = {'label': label, 'score': score}
+        
+        return results
+
+
+def load_transformer(backend: str = 'pytorch'):
+    """
+    Build the sentiment pipeline for an inference backend.
+    
+    All backends return the same pipeline interface and labels, so
+    callers do not depend on which one is in use.
+    
+    Args:
+        backend: One of TRANSFORMER_BACKENDS
+    
+    Returns:
+        HuggingFace text-classification pipeline
+    """
+    from transformers import pipeline
+    
+    if backend == 'pytorch':
+        return pipeline("sentiment-analysis", model=TRANSFORMER_MODEL, truncation=True)
+    
+    from transformers import AutoTokenizer
+    tokenizer = AutoTokenizer.from_pretrained(TRANSFORMER_MODEL)
+    
+    if backend == 'int8':
+        import torch
+        from transformers import AutoModelForSequenceClassification
+        
+        model = AutoModelForSequenceClassification.from_pretrained(TRANSFORMER_MODEL)
+        model.eval()
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    elif backend == 'onnx':
+        try:
+            from optimum.onnxruntime import ORTModelForSequenceClassification
+        except ImportError as e:
+            raise ImportError(
+                "The 'onnx' backend needs optimum with ONNX Runtime: pip install optimum[onnxruntime]"
+            ) from e
+        
+        # Export once, then load the saved graph on later runs
+        if os.path.isdir(ONNX_MODEL_DIR) and os.listdir(ONNX_MODEL_DIR):
+            model = ORTModelForSequenceClassification.from_pretrained(ONNX_MODEL_DIR)
+        else:
+            print(f"  Exporting {TRANSFORMER_MODEL} to ONNX ({ONNX_MODEL_DIR})...")
+            model = ORTModelForSequenceClassification.from_pretrained(TRANSFORMER_MODEL, export=True)
+            model.save_pretrained(ONNX_MODEL_DIR)
+            tokenizer.save_pretrained(ONNX_MODEL_DIR)
+    else:
+        raise ValueError(f"Unknown transformer backend: {backend} (expected one of {TRANSFORMER_BACKENDS})")
+    
+    return pipeline("sentiment-analysis", model=model, tokenizer=tokenizer, truncation=True)
+
+
+def compare_backends(texts: list, backend: str, reference: str = 'pytorch',
+                     batch_size: int = TRANSFORMER_BATCH_SIZE) -> dict:
+    """
+    Score the same texts with two transformer backends and compare them.
+    
+    No result cache is used, so both backends run every text.
+    
+    Args:
+        texts: Cleaned texts to score
+        backend: Backend under test
+        reference: Backend treated as ground truth
+        batch_size: Number of texts per forward pass
+    
+    Returns:
+        dict with 'samples', 'label_agreement' (fraction of equal labels),
+        'mean_abs_score_diff', 'max_abs_score_diff' and per-backend
+        'seconds' (inference time, excluding model load)
+    """
+    scored = {}
+    seconds = {}
+    for name in (reference, backend):
+        analyzer = SentimentAnalyzer(backend=name)
+        analyzer.transformer  # load the model outside the timed section
+        start = time.perf_counter()
+        scored[name] = analyzer.transformer_sentiment_batch(texts, batch_size)
+        seconds[name] = time.perf_counter() - start
+    
+    pairs = list(zip(
+        scored[reference]['label'], scored[reference]['score'],
+        scored[backend]['label'], scored[backend]['score']
+    ))
+    diffs = [abs(ref_score - score) for _, ref_score, _, score in pairs]
+    agree = sum(1 for ref_label, _, label, _ in pairs if ref_label == label)
+    
+    return {
+        'samples': len(pairs),
+        'label_agreement': agree / len(pairs) if pairs else 1.0,
+        'mean_abs_score_diff': sum(diffs) / len(diffs) if diffs else 0.0,
+        'max_abs_score_diff': max(diffs, default=0.0),
+        'seconds': seconds
+    }
+
+
+def ensure_vader_lexicon():
+    """Check for the VADER lexicon locally; download it only if missing."""
+    try:
+        nltk.data.find('sentiment/vader_lexicon.zip')
+    except LookupError:
+        print("VADER lexicon not found locally, downloading...")
+        nltk.download('vader_lexicon', quiet=True)
+
+
+def cascade_paths(texts, labels, scores, ratings=None, band: float = CASCADE_BAND) -> list:
+    """
+    Decide which rows the cascade sends to the transformer.
+    
+    Args:
+        texts: Input texts (empty texts always stay on VADER)
+        labels: VADER labels
+        scores: VADER compound scores
+        ratings: Optional star ratings aligned with texts
+        band: Half-width of the uncertain compound band around zero
+    
+    Returns:
+        List of 'vader', 'uncertain' or 'rating_mismatch' per row
+    """
+    if ratings is None:
+        ratings = [None] * len(labels)
+    
+    paths = []
+    for text, label, score, rating in zip(texts, labels, scores, ratings):
+        try:
+            rating = float(rating)
+        except (TypeError, ValueError):
+            rating = math.nan
+        
+        if not text:
+            paths.append('vader')
+        elif abs(score) < band:
+            paths.append('uncertain')
+        elif (rating >= 4 and label == 'negative') or (rating <= 2 and label == 'positive'):
+            paths.append('rating_mismatch')
+        else:
+            paths.append('vader')
+    return paths
+
+
+def combine_transformer_score(score: float) -> float:
+    """
+    Rescale a signed transformer probability to the VADER compound range.
+    
+    The transformer reports a confidence in [0.5, 1] for its label; a
+    coin-flip maps to 0 and full confidence to +/-1.
+    """
+    return math.copysign(2 * abs(score) - 1, score)
+
+
+def polarity_label(score: float) -> str:
+    """Map a compound-style score in [-1, 1] to a sentiment label."""
+    if score >= 0.05:
+        return 'positive'
+    if score <= -0.05:
+        return 'negative'
+    return 'neutral'
+
+
+def vader_polarity(vader: SentimentIntensityAnalyzer, text: str) -> dict:
+    """
+    Score text with a VADER analyzer and map the compound score to a label.
+    
+    Args:
+        vader: Initialized SentimentIntensityAnalyzer
+        text: Input text
+    
+    Returns:
+        dict with 'label' and 'score'
+    """
+    if not text:
+        return {'label': 'neutral', 'score': 0.0}
+    
+    compound = vader.polarity_scores(text)['compound']
+    return {'label': polarity_label(compound), 'score': compound}
+
+
+def _to_columns(results: list) -> dict:
+    """Convert a list of label/score dicts into label and score lists."""
+    return {
+        'label': [result['label'] for result in results],
+        'score': [result['score'] for result in results]
+    }
@@ -0,0 +1,100 @@
+"""
+Fetch service module.
+
+Runs registered feedback sources concurrently with per-source
+timeouts and retries.
+
+Each source runs in a daemon thread and is given its deadline. A fetch
+that overruns it is abandoned: its result is discarded and, being a
+daemon, it does not hold up interpreter exit.
+"""
+
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+
+import pandas as pd
+
+from services.metrics import stage
+
+
+# Defaults for sources that don't set their own policy
+DEFAULT_TIMEOUT = 120  # seconds, covering all attempts
+DEFAULT_RETRIES = 1
+RETRY_BACKOFF = 2  # seconds, doubled after each failed attempt
+
+
+def _fetch_with_retry(source: dict, deadline: float) -> pd.DataFrame:
+    """Call a source's fetch function, retrying with backoff on errors until the deadline."""
+    retries = source.get('retries', DEFAULT_RETRIES)
+    delay = RETRY_BACKOFF
+    # Sources run concurrently, so CPU time is measured per thread
+    with stage('fetch', thread_cpu=True, source=source['name']) as record:
+        for attempt in range(retries + 1):
+            try:
+                df = source['fetch'](deadline)
+                record.rows_out = 0 if df is None else len(df)
+                return df
+            except Exception as e:
+                if attempt == retries or time.monotonic() + delay >= deadline:
+                    raise
+                print(f"  {source['name']}: attempt {attempt + 1} failed ({e}), retrying in {delay}s")
+                time.sleep(delay)
+                delay *= 2
+
+
+def _start_fetch(source: dict, deadline: float) -> Future:
+    """Run a source's fetch in a daemon thread; the future gets its result."""
+    future = Future()
+    
+    def run():
+        future.set_running_or_notify_cancel()
+        try:
+            future.set_result(_fetch_with_retry(source, deadline))
+        except BaseException as e:
+            future.set_exception(e)
+    
+    threading.Thread(target=run, name=f"fetch-{source['name']}", daemon=True).start()
+    return future
+
+
+def fetch_sources(sources: list) -> dict:
+    """
+    Fetch all sources concurrently.
+    
+    A source that raises after its retries or exceeds its timeout is
+    logged and skipped without delaying the others.
+    
+    Args:
+        sources: List of dicts with 'name', 'fetch' (callable taking the
+            source's deadline as a time.monotonic() value and returning a
+            DataFrame) and optional 'timeout' and 'retries'
+    
+    Returns:
+        dict of source name -> fetched DataFrame (failed sources omitted)
+    """
+    if not sources:
+        return {}
+    
+    results = {}
+    # All sources start together, so each deadline is relative to the start
+    started = time.monotonic()
+    futures = []
+    for source in sources:
+        deadline = started + source.get('timeout', DEFAULT_TIMEOUT)
+        futures.append((source, deadline, _start_fetch(source, deadline)))
+    
+    for source, deadline, future in futures:
+        try:
+            df = future.result(timeout=max(0, deadline - time.monotonic()))
+        except TimeoutError:
+            print(f"  {source['name']}: timed out after {source.get('timeout', DEFAULT_TIMEOUT)}s (skipping)")
+            continue
+        except Exception as e:
+            print(f"  {source['name']}: failed ({e}) (skipping)")
+            continue
+        
+        if df is not None and not df.empty:
+            results[source['name']] = df
+    
+    return results
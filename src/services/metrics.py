@@ -0,0 +1,317 @@
+"""
+Pipeline metrics module.
+
+Times pipeline stages (wall and CPU time, rows in/out, throughput and
+peak RSS). Each stage is written as a JSON log line. At the end of a
+run the totals go to a Prometheus textfile (for node_exporter's
+textfile collector) and to a per-run history file.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+# Configuration
+METRICS_DIR = os.getenv("PIPELINE_METRICS_DIR", os.path.join("data", "metrics"))
+PROMETHEUS_TEXTFILE = os.getenv(
+    "PIPELINE_PROMETHEUS_TEXTFILE", os.path.join(METRICS_DIR, "feedback_pipeline.prom")
+)
+EVENT_LOG = os.path.join(METRICS_DIR, "pipeline_events.jsonl")
+RUN_HISTORY = os.path.join(METRICS_DIR, "pipeline_runs.jsonl")
+
+METRIC_PREFIX = "feedback_pipeline"
+
+# The run currently being recorded; stage() is a no-op without one
+_active_run = None
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process so far, or None if unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+
+class StageRecord:
+    """Measurements of one stage execution; set rows_out inside the block."""
+    
+    def __init__(self, name: str, rows_in: int = None, labels: dict = None):
+        """Create a record for a stage about to start."""
+        self.name = name
+        self.labels = labels or {}
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.status = "ok"
+        self.wall_seconds = None
+        self.cpu_seconds = None
+        self.peak_rss_bytes = None
+    
+    def to_dict(self) -> dict:
+        """Serialize the record, with rows/sec derived from rows_in."""
+        rows = self.rows_in if self.rows_in is not None else self.rows_out
+        return {
+            'stage': self.name,
+            **self.labels,
+            'status': self.status,
+            'wall_seconds': round(self.wall_seconds, 6),
+            'cpu_seconds': round(self.cpu_seconds, 6),
+            'rows_in': self.rows_in,
+            'rows_out': self.rows_out,
+            'rows_per_sec': round(rows / self.wall_seconds, 1) if rows and self.wall_seconds else None,
+            'peak_rss_bytes': self.peak_rss_bytes,
+        }
+
+
+class PipelineRun:
+    """Collects stage records for one pipeline run."""
+    
+    def __init__(self, mode: str = "batch"):
+        """Start a run."""
+        self.run_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        self.mode = mode
+        self.started_at = time.time()
+        self.stages = []
+        self._lock = threading.Lock()
+    
+    def record(self, record: StageRecord):
+        """Add a finished stage and append it to the JSON event log."""
+        event = {'run_id': self.run_id, 'timestamp': datetime.now().isoformat(timespec='milliseconds')}
+        event.update(record.to_dict())
+        with self._lock:
+            self.stages.append(record)
+            _append_json_line(EVENT_LOG, event)
+    
+    def totals(self) -> list:
+        """
+        Aggregate records per stage and labels (streamed chunks add up).
+        
+        Returns:
+            List of dicts with summed times and rows and the maximum RSS
+        """
+        grouped = {}
+        for record in self.stages:
+            key = (record.name, tuple(sorted(record.labels.items())))
+            total = grouped.setdefault(key, {
+                'stage': record.name, 'labels': dict(record.labels), 'calls': 0, 'errors': 0,
+                'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'rows_in': 0, 'rows_out': 0,
+                'peak_rss_bytes': 0,
+            })
+            total['calls'] += 1
+            total['errors'] += record.status != "ok"
+            total['wall_seconds'] += record.wall_seconds
+            total['cpu_seconds'] += record.cpu_seconds
+            total['rows_in'] += record.rows_in or 0
+            total['rows_out'] += record.rows_out or 0
+            total['peak_rss_bytes'] = max(total['peak_rss_bytes'], record.peak_rss_bytes or 0)
+        
+        for total in grouped.values():
+            rows = total['rows_in'] or total['rows_out']
+            total['rows_per_sec'] = round(rows / total['wall_seconds'], 1) if rows and total['wall_seconds'] else None
+        return list(grouped.values())
+
+
+def _append_json_line(path: str, payload: dict):
+    """Append one JSON object as a line to a file."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(payload, default=str) + "\n")
+
+
+def start_run(mode: str = "batch") -> PipelineRun:
+    """Begin recording a pipeline run; stages record into it until finish_run."""
+    global _active_run
+    _active_run = PipelineRun(mode)
+    return _active_run
+
+
+@contextmanager
+def stage(name: str, rows_in: int = None, thread_cpu: bool = False, **labels):
+    """
+    Measure a pipeline stage.
+    
+    Usage:
+        with stage('vader', rows_in=len(df)) as s:
+            ...
+            s.rows_out = len(result)
+    
+    rows_out defaults to rows_in. Exceptions are recorded as status
+    'error' and re-raised.
+    
+    Args:
+        name: Stage name
+        rows_in: Rows entering the stage
+        thread_cpu: Measure CPU time of the calling thread only (for
+            stages running concurrently in threads)
+        **labels: Extra labels, e.g. source='CSV'
+    """
+    record = StageRecord(name, rows_in, {key: str(value) for key, value in labels.items()})
+    cpu_clock = time.thread_time if thread_cpu else time.process_time
+    start_wall, start_cpu = time.perf_counter(), cpu_clock()
+    try:
+        yield record
+    except BaseException:
+        record.status = "error"
+        raise
+    finally:
+        record.wall_seconds = time.perf_counter() - start_wall
+        record.cpu_seconds = cpu_clock() - start_cpu
+        record.peak_rss_bytes = peak_rss_bytes()
+        if record.rows_out is None:
+            record.rows_out = rows_in
+        run = _active_run
+        if run is not None:
+            run.record(record)
+
+
+def _escape_label(value: str) -> str:
+    """Escape a Prometheus label value."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict) -> str:
+    """Format a label set as {key="value",...}."""
+    return "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in sorted(labels.items())) + "}"
+
+
+def prometheus_text(run: PipelineRun, status: str, duration: float) -> str:
+    """
+    Render a run's metrics in the Prometheus text exposition format.
+    
+    Returns:
+        Text with gauges for the last run (per stage and overall)
+    """
+    stage_metrics = [
+        ('stage_wall_seconds', 'wall_seconds', 'Wall-clock seconds spent in the stage during the last run'),
+        ('stage_cpu_seconds', 'cpu_seconds', 'CPU seconds spent in the stage during the last run'),
+        ('stage_rows_in', 'rows_in', 'Rows entering the stage during the last run'),
+        ('stage_rows_out', 'rows_out', 'Rows leaving the stage during the last run'),
+        ('stage_rows_per_second', 'rows_per_sec', 'Stage throughput during the last run'),
+        ('stage_peak_rss_bytes', 'peak_rss_bytes', 'Process peak RSS when the stage finished'),
+        ('stage_errors', 'errors', 'Stage executions that raised during the last run'),
+    ]
+    totals = run.totals()
+    lines = []
+    for metric, field, help_text in stage_metrics:
+        name = f"{METRIC_PREFIX}_{metric}"
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        for total in totals:
+            value = total[field]
+            if value is None:
+                continue
+            labels = {'stage': total['stage'], **total['labels']}
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+    
+    run_metrics = [
+        ('last_run_timestamp_seconds', run.started_at, 'Start time of the last run'),
+        ('last_run_duration_seconds', round(duration, 3), 'Duration of the last run'),
+        ('last_run_success', int(status == "success"), '1 if the last run completed successfully'),
+    ]
+    for metric, value, help_text in run_metrics:
+        name = f"{METRIC_PREFIX}_{metric}"
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name}{_format_labels({'mode': run.mode})} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def _write_atomic(path: str, text: str):
+    """Write a file via rename so collectors never read a partial file."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def load_run_history(limit: int = 10) -> list:
+    """
+    Read the most recent run summaries.
+    
+    Args:
+        limit: Maximum number of runs to return
+    
+    Returns:
+        List of run summary dicts, oldest first
+    """
+    if not os.path.exists(RUN_HISTORY):
+        return []
+    with open(RUN_HISTORY, encoding="utf-8") as f:
+        lines = f.readlines()[-limit:]
+    return [json.loads(line) for line in lines if line.strip()]
+
+
+def print_run_summary(summary: dict, previous: dict = None):
+    """Print per-stage timings, with the previous run's wall time if available."""
+    before = {}
+    if previous is not None:
+        before = {(s['stage'], tuple(sorted(s['labels'].items()))): s for s in previous['stages']}
+    
+    print(f"\nStage timings (run {summary['run_id']}):")
+    for total in summary['stages']:
+        label = total['stage'] + "".join(f" [{value}]" for value in total['labels'].values())
+        line = (
+            f"  {label:32s} {total['wall_seconds']:8.2f}s wall {total['cpu_seconds']:8.2f}s cpu "
+            f"{total['rows_in'] or total['rows_out']:>9} rows"
+        )
+        if total['errors']:
+            line += f"  {total['errors']} failed"
+        prior = before.get((total['stage'], tuple(sorted(total['labels'].items()))))
+        if prior and prior['wall_seconds']:
+            change = total['wall_seconds'] / prior['wall_seconds'] - 1
+            line += f"  ({change:+.0%} vs previous)"
+        print(line)
+
+
+def finish_run(status: str = "success") -> dict:
+    """
+    End the active run: write the Prometheus textfile and run history.
+    
+    Args:
+        status: 'success' or 'failed'
+    
+    Returns:
+        Run summary dict, or None if no run was active
+    """
+    global _active_run
+    run = _active_run
+    if run is None:
+        return None
+    _active_run = None
+    
+    duration = time.time() - run.started_at
+    summary = {
+        'run_id': run.run_id,
+        'mode': run.mode,
+        'status': status,
+        'started_at': datetime.fromtimestamp(run.started_at).isoformat(timespec='seconds'),
+        'duration_seconds': round(duration, 3),
+        'peak_rss_bytes': peak_rss_bytes(),
+        'stages': run.totals(),
+    }
+    
+    try:
+        # Compare with the latest earlier run of the same mode
+        previous = [past for past in load_run_history() if past['mode'] == run.mode]
+        _write_atomic(PROMETHEUS_TEXTFILE, prometheus_text(run, status, duration))
+        _append_json_line(RUN_HISTORY, summary)
+        print_run_summary(summary, previous[-1] if previous else None)
+    except OSError as e:
+        print(f"  Error writing pipeline metrics: {e}")
+    return summary
@@ -0,0 +1,252 @@
+"""
+Parquet store module.
+
+Stores processed feedback as a Parquet dataset partitioned by day and
+source, and reads it back with column and partition pruning. Appends
+add small part files; compaction rewrites each partition as one file.
+"""
+
+import os
+import uuid
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from services.schema import to_float64
+
+
+# Configuration
+PARQUET_DIR = os.path.join("data", "processed_feedback")
+COMPRESSION = "zstd"
+
+# Partitions with at least this many part files are compacted into one
+COMPACT_MIN_FILES = int(os.getenv("PARQUET_COMPACT_MIN_FILES", "2"))
+
+# Marker holding the id of the last write; the leading underscore keeps
+# it out of dataset discovery
+VERSION_FILE = "_version"
+
+# Hive-style layout: <PARQUET_DIR>/day=YYYY-MM-DD/source=<source>/part-*.parquet
+PARTITIONING = ds.partitioning(
+    pa.schema([("day", pa.string()), ("source", pa.string())]),
+    flavor="hive"
+)
+
+# On-disk schema; low-cardinality labels are dictionary encoded
+SCHEMA = pa.schema([
+    ("content", pa.string()),
+    ("rating", pa.float32()),
+    ("date", pa.timestamp("us")),
+    ("sentiment_label", pa.dictionary(pa.int8(), pa.string())),
+    ("sentiment_score", pa.float64()),
+    ("category", pa.dictionary(pa.int8(), pa.string())),
+    ("priority_score", pa.float64()),
+    ("sentiment_path", pa.dictionary(pa.int8(), pa.string())),
+    ("day", pa.string()),
+    ("source", pa.string()),
+])
+
+# Schema of each part file (partition columns live in the directory names)
+FILE_SCHEMA = pa.schema([field for field in SCHEMA if field.name not in ("day", "source")])
+
+
+def _new_run_id() -> str:
+    """Return a unique, time-ordered id for one write."""
+    return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+
+def partition_days(df: pd.DataFrame) -> set:
+    """Return the day partitions ('YYYY-MM-DD') that rows of df are saved to."""
+    return set(pd.to_datetime(df["date"]).dt.strftime("%Y-%m-%d").dropna())
+
+
+def save_to_parquet(df: pd.DataFrame, base_dir: str = PARQUET_DIR) -> str:
+    """
+    Append processed feedback to the partitioned Parquet dataset.
+
+    Each call writes new files (one per day/source partition) and never
+    rewrites existing ones, so runs and streamed chunks can append.
+
+    Args:
+        df: Processed feedback DataFrame
+        base_dir: Dataset root directory
+
+    Returns:
+        Dataset root directory, or None if there was nothing to save
+    """
+    if df.empty:
+        return None
+
+    frame = df.reindex(columns=[field.name for field in SCHEMA if field.name != "day"])
+    frame["date"] = pd.to_datetime(frame["date"])
+    frame["day"] = frame["date"].dt.strftime("%Y-%m-%d")
+    frame["source"] = frame["source"].astype(str)
+    frame["rating"] = pd.to_numeric(frame["rating"], errors="coerce")
+    frame["sentiment_score"] = to_float64(frame["sentiment_score"])
+    # All null outside cascade mode, which reindex leaves as float NaN
+    frame["sentiment_path"] = frame["sentiment_path"].astype("string")
+
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    table = table.select(SCHEMA.names).cast(SCHEMA, safe=False)
+
+    run_id = _new_run_id()
+    ds.write_dataset(
+        table,
+        base_dir,
+        format="parquet",
+        partitioning=PARTITIONING,
+        basename_template=f"part-{run_id}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+        file_options=ds.ParquetFileFormat().make_write_options(compression=COMPRESSION)
+    )
+    _write_version(base_dir, run_id)
+    print(f"\nSaved processed data to {base_dir} (Parquet)")
+    return base_dir
+
+
+def compact_partitions(base_dir: str = PARQUET_DIR, days=None,
+                       min_files: int = COMPACT_MIN_FILES) -> int:
+    """
+    Rewrite partitions holding many small part files as one file each.
+
+    The merged file is written under a hidden name and renamed into
+    place before the parts are removed. Readers racing a compaction may
+    briefly see rows twice, so the version marker is bumped afterwards
+    to invalidate anything they cached.
+
+    Args:
+        base_dir: Dataset root directory
+        days: Day partitions ('YYYY-MM-DD') to compact (default: all)
+        min_files: Compact only partitions with at least this many files
+
+    Returns:
+        Number of partitions compacted
+    """
+    if not has_parquet_store(base_dir):
+        return 0
+
+    partition_filter = ds.field("day").isin(sorted(days)) if days is not None else None
+    files = {}
+    for fragment in _open_dataset(base_dir).get_fragments(filter=partition_filter):
+        files.setdefault(os.path.dirname(fragment.path), []).append(fragment.path)
+
+    run_id = _new_run_id()
+    compacted = 0
+    for directory, paths in sorted(files.items()):
+        if len(paths) < max(min_files, 2):
+            continue
+        table = ds.dataset(sorted(paths), format="parquet", schema=FILE_SCHEMA).to_table()
+        # Leading underscore keeps the unfinished file out of reads
+        tmp_path = os.path.join(directory, f"_compact-{run_id}.parquet")
+        pq.write_table(table.sort_by("date"), tmp_path, compression=COMPRESSION)
+        os.replace(tmp_path, os.path.join(directory, f"part-{run_id}-compact.parquet"))
+        for path in paths:
+            os.remove(path)
+        compacted += 1
+
+    if compacted:
+        _write_version(base_dir, run_id)
+        print(f"  Compacted {compacted} Parquet partition(s) in {base_dir}")
+    return compacted
+
+
+def _write_version(base_dir: str, run_id: str):
+    """Record the latest write in the version marker (atomically replaced)."""
+    path = os.path.join(base_dir, VERSION_FILE)
+    tmp_path = f"{path}.{run_id}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(run_id)
+    os.replace(tmp_path, path)
+
+
+def store_version(base_dir: str = PARQUET_DIR) -> str:
+    """
+    Return the id of the latest write to the dataset, or None.
+
+    Reads a single marker file, so it is cheap enough to check on every
+    dashboard rerun. Stores written before the marker existed return None.
+    """
+    try:
+        with open(os.path.join(base_dir, VERSION_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _open_dataset(base_dir: str) -> ds.Dataset:
+    """Open the partitioned dataset (files lacking newer columns read them as null)."""
+    return ds.dataset(base_dir, format="parquet", partitioning=PARTITIONING, schema=SCHEMA)
+
+
+def has_parquet_store(base_dir: str = PARQUET_DIR) -> bool:
+    """Return True if the dataset directory exists and holds any files."""
+    if not os.path.isdir(base_dir):
+        return False
+    return any(files for _, _, files in os.walk(base_dir))
+
+
+def partition_values(base_dir: str = PARQUET_DIR) -> dict:
+    """
+    List the days and sources present, from directory names only.
+
+    Args:
+        base_dir: Dataset root directory
+
+    Returns:
+        dict with sorted 'day' and 'source' lists
+    """
+    days, sources = set(), set()
+    for fragment in _open_dataset(base_dir).get_fragments():
+        keys = ds.get_partition_keys(fragment.partition_expression)
+        days.add(keys.get("day"))
+        sources.add(keys.get("source"))
+    days.discard(None)
+    sources.discard(None)
+    return {"day": sorted(days), "source": sorted(sources)}
+
+
+def load_feedback(base_dir: str = PARQUET_DIR, columns: list = None,
+                  start_date=None, end_date=None, sources: list = None) -> pd.DataFrame:
+    """
+    Load processed feedback, reading only the needed columns and partitions.
+
+    Args:
+        base_dir: Dataset root directory
+        columns: Columns to read (default: all)
+        start_date: First day to include (date or 'YYYY-MM-DD')
+        end_date: Last day to include (date or 'YYYY-MM-DD')
+        sources: Sources to include (default: all)
+
+    Returns:
+        DataFrame of matching feedback with plain string label columns
+    """
+    dataset = _open_dataset(base_dir)
+
+    # Partition filters prune whole directories before any file is read
+    conditions = []
+    if start_date is not None:
+        conditions.append(ds.field("day") >= str(start_date))
+    if end_date is not None:
+        conditions.append(ds.field("day") <= str(end_date))
+    if sources is not None:
+        conditions.append(ds.field("source").isin(list(sources)))
+
+    row_filter = None
+    for condition in conditions:
+        row_filter = condition if row_filter is None else row_filter & condition
+
+    table = dataset.to_table(columns=columns, filter=row_filter)
+
+    # Decode dictionary columns so filters and value_counts see only present values
+    decoded = pa.schema([
+        pa.field(field.name, field.type.value_type)
+        if pa.types.is_dictionary(field.type) else field
+        for field in table.schema
+    ])
+    df = table.cast(decoded).to_pandas()
+    if "date" in df.columns:
+        df["date"] = pd.to_datetime(df["date"])
+    return df
@@ -5,78 +5,246 @@ Orchestrates the feedback intelligence pipeline.
 """
 
 import os
+import tempfile
 from datetime import datetime
 
+import numpy as np
 import pandas as pd
 
-from fetchers.google_play import fetch_google_reviews
-from fetchers.csv_loader import load_feedback_from_csv
-from fetchers.hf_reviews import fetch_hf_reviews
-from processing.cleaner import clean_text
-from processing.sentiment import SentimentAnalyzer
-from processing.categorizer import categorize_feedback
-from intelligence.priority import calculate_priority
-from services.storage_service import store_to_database, save_to_csv
-from services.trend_service import run_trend_analysis
-from services.report_service import generate_pdf_report
+from fetchers.google_play import fetch_google_reviews_incremental
+from fetchers.csv_loader import read_feedback_csv, iter_feedback_csv
+from fetchers.hf_reviews import (
+    read_hf_reviews, iter_hf_reviews, HF_DATASET, HF_SPLIT, HF_SOURCE
+)
+from processing.cache import ResultCache, cached_batch
+from processing.sentiment import SentimentAnalyzer, SENTIMENT_MODES
+from processing.categorizer import CATEGORY_CACHE_NAMESPACE
+from processing.parallel import (
+    clean_chunk, vader_chunk, categorize_chunk, create_executor, map_chunks
+)
+from intelligence.priority import calculate_priority_batch
+from intelligence.trend import SentimentTrendAccumulator
+from services.fetch_service import fetch_sources
+from services.storage_service import (
+    filter_new_feedback, store_to_database, save_to_csv, csv_export_path,
+    update_priority_scores, get_watermark, set_watermark, delete_watermark,
+    load_cluster_index, save_new_clusters
+)
+from services.parquet_store import compact_partitions, partition_days, save_to_parquet
+from services.metrics import start_run, finish_run, stage
+from services.schema import apply_pipeline_dtypes, to_float64
+from services.scheduler import run_stages, print_stage_summary
+from services.trend_service import run_trend_analysis, run_trend_analysis_from_accumulator
+from services.report_service import generate_weekly_report
 
 
 # Configuration
 GOOGLE_PLAY_APP_ID = "com.whatsapp"  # Example app
+GOOGLE_PLAY_WATERMARK_KEY = f"google_play:{GOOGLE_PLAY_APP_ID}"
+# While a fetch that stopped at GOOGLE_PLAY_MAX_REVIEWS is being caught
+# up: the oldest review stored so far, and the newest one, which becomes
+# the watermark once the gap down to it is fetched
+GOOGLE_PLAY_RESUME_KEY = f"{GOOGLE_PLAY_WATERMARK_KEY}:resume"
+GOOGLE_PLAY_PENDING_KEY = f"{GOOGLE_PLAY_WATERMARK_KEY}:pending"
+GOOGLE_PLAY_MAX_REVIEWS = int(os.getenv("GOOGLE_PLAY_MAX_REVIEWS", "1000"))  # per run
 EXTERNAL_FEEDBACK_CSV = "data/external_feedback.csv"
+HF_OFFSET_KEY = f"huggingface:{HF_DATASET}:{HF_SPLIT}"
+# Rows read from the dataset per run; each run continues after the last
+HF_REVIEWS_PER_RUN = int(os.getenv("HF_REVIEWS_PER_RUN", "200"))
 
+# Parallel text processing: 1 worker runs everything in-process
+PROCESS_WORKERS = int(os.getenv("PIPELINE_WORKERS", "1"))
+PROCESS_CHUNK_SIZE = int(os.getenv("PIPELINE_CHUNK_SIZE", "1000"))
 
-def fetch_all_feedback() -> pd.DataFrame:
-    """Fetch feedback from multiple sources: Google Play Store and CSV files."""
-    all_data = []
+# Sentiment model(s) to run: 'vader', 'transformer', 'both' or 'cascade'
+SENTIMENT_MODE = os.getenv("SENTIMENT_MODE", "vader")
+
+# Processed output: 'parquet' (partitioned dataset) or 'csv' (timestamped dump)
+EXPORT_FORMAT = os.getenv("EXPORT_FORMAT", "parquet")
+
+# Streaming mode: sources are processed in chunks with bounded memory
+PIPELINE_STREAMING = os.getenv("PIPELINE_STREAMING", "0") == "1"
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", "50000"))
+
+# Threads for the final stages (store, export, trend, report); 1 runs
+# them one after another
+STAGE_WORKERS = int(os.getenv("PIPELINE_STAGE_WORKERS", "4"))
+
+# Columns kept between the streaming passes
+STREAM_SPILL_COLUMNS = [
+    'feedback_key', 'content', 'source', 'rating', 'date',
+    'sentiment_label', 'sentiment_score', 'category', 'cluster_id',
+    'recency_days', 'sentiment_path'
+]
+
+
+def _fetch_google_play(deadline: float = None) -> pd.DataFrame:
+    """
+    Fetch Google Play reviews newer than the stored watermark.
     
-    # Fetch Google Play reviews
-    print("Fetching Google Play reviews...")
-    gp_count = 0
-    try:
-        gp_reviews = fetch_google_reviews(GOOGLE_PLAY_APP_ID, count=1000)
-        if not gp_reviews.empty:
-            gp_reviews = gp_reviews.rename(columns={'review_id': 'id'})
-            gp_count = len(gp_reviews)
-            all_data.append(gp_reviews)
-            print(f"  Fetched {gp_count} Google Play reviews")
-    except Exception as e:
-        print(f"  Error fetching Google Play reviews: {e}")
-    
-    # Fetch CSV feedback
-    print("Fetching CSV feedback...")
-    csv_count = 0
-    if os.path.exists(EXTERNAL_FEEDBACK_CSV):
-        try:
-            csv_feedback = load_feedback_from_csv(EXTERNAL_FEEDBACK_CSV)
-            if not csv_feedback.empty:
-                csv_count = len(csv_feedback)
-                all_data.append(csv_feedback)
-                print(f"  Fetched {csv_count} CSV records")
-        except Exception as e:
-            print(f"  Error loading CSV feedback: {e}")
+    While a gap left by an earlier fetch that stopped at
+    GOOGLE_PLAY_MAX_REVIEWS is open, continue below its oldest review.
+    No page is requested after the deadline (a time.monotonic() value).
+    """
+    since, since_id = get_watermark(GOOGLE_PLAY_WATERMARK_KEY)
+    resume, resume_id = get_watermark(GOOGLE_PLAY_RESUME_KEY)
+    gp_reviews = fetch_google_reviews_incremental(
+        GOOGLE_PLAY_APP_ID,
+        since=since,
+        since_id=since_id,
+        max_count=GOOGLE_PLAY_MAX_REVIEWS,
+        resume_from=resume,
+        resume_from_id=resume_id,
+        deadline=deadline
+    )
+    if resume is not None and gp_reviews.empty:
+        # Nothing was left in the gap: close it and fetch newer reviews
+        _close_google_play_gap()
+        return _fetch_google_play(deadline)
+    return gp_reviews.rename(columns={'review_id': 'id'})
+
+
+def _close_google_play_gap():
+    """Move the watermark to the newest review of a caught-up gap."""
+    pending = get_watermark(GOOGLE_PLAY_PENDING_KEY)
+    if pending[0] is not None:
+        set_watermark(GOOGLE_PLAY_WATERMARK_KEY, *pending)
+    delete_watermark(GOOGLE_PLAY_RESUME_KEY)
+    delete_watermark(GOOGLE_PLAY_PENDING_KEY)
+
+
+def _google_play_watermark(df: pd.DataFrame):
+    """
+    Summarize the fetched Google Play reviews in df (in fetch order, newest first).
+    
+    Returns:
+        dict with 'newest' and 'oldest' (date, id) and 'count', or None
+    """
+    if 'id' not in df.columns:
+        return None
+    gp_rows = df[df['source'] == 'google_play']
+    if gp_rows.empty:
+        return None
+    newest, oldest = gp_rows.iloc[0], gp_rows.iloc[-1]
+    return {
+        'newest': (newest['date'], newest['id']),
+        'oldest': (oldest['date'], oldest['id']),
+        'count': len(gp_rows),
+    }
+
+
+def _merge_google_play_watermarks(current, later):
+    """Combine the summaries of consecutive chunks; either may be None."""
+    if current is None:
+        return later
+    if later is None:
+        return current
+    return {'newest': current['newest'], 'oldest': later['oldest'], 'count': current['count'] + later['count']}
+
+
+def _save_google_play_watermark(fetched: dict):
+    """
+    Advance the Google Play marks once the fetched reviews are stored.
+    
+    A fetch that stopped at GOOGLE_PLAY_MAX_REVIEWS may have left older
+    reviews above the watermark. The watermark then stays where it is:
+    the next run resumes below the oldest stored review, and the newest
+    one becomes the watermark when a run gets down to the watermark.
+    
+    Args:
+        fetched: Summary from _google_play_watermark
+    """
+    in_gap = get_watermark(GOOGLE_PLAY_RESUME_KEY)[0] is not None
+    if fetched['count'] >= GOOGLE_PLAY_MAX_REVIEWS:
+        if not in_gap:
+            set_watermark(GOOGLE_PLAY_PENDING_KEY, *fetched['newest'])
+        set_watermark(GOOGLE_PLAY_RESUME_KEY, *fetched['oldest'])
+    elif in_gap:
+        _close_google_play_gap()
     else:
+        set_watermark(GOOGLE_PLAY_WATERMARK_KEY, *fetched['newest'])
+
+
+def _fetch_csv(deadline: float = None) -> pd.DataFrame:
+    """Load external CSV feedback if the file exists (not bounded by the deadline)."""
+    if not os.path.exists(EXTERNAL_FEEDBACK_CSV):
+        print(f"  CSV file not found: {EXTERNAL_FEEDBACK_CSV} (skipping)")
+        return pd.DataFrame()
+    return read_feedback_csv(EXTERNAL_FEEDBACK_CSV)
+
+
+def _iter_csv(chunk_size: int):
+    """Stream external CSV feedback in chunks if the file exists."""
+    if not os.path.exists(EXTERNAL_FEEDBACK_CSV):
         print(f"  CSV file not found: {EXTERNAL_FEEDBACK_CSV} (skipping)")
+        return
+    yield from iter_feedback_csv(EXTERNAL_FEEDBACK_CSV, chunksize=chunk_size)
+
+
+def _hf_offset() -> int:
+    """Row of the HuggingFace split the next run starts at."""
+    _, last_id = get_watermark(HF_OFFSET_KEY)
+    return int(last_id) if last_id is not None else 0
+
+
+def _hf_watermark(df: pd.DataFrame):
+    """Return (fetch time, last row id) of fetched HuggingFace reviews, or None."""
+    if 'id' not in df.columns:
+        return None
+    hf_rows = df[df['source'] == HF_SOURCE]
+    if hf_rows.empty:
+        return None
+    return datetime.now(), str(int(hf_rows['id'].max()))
+
+
+def _fetch_huggingface(deadline: float = None) -> pd.DataFrame:
+    """Fetch the next slice of HuggingFace dataset reviews (not bounded by the deadline)."""
+    return read_hf_reviews(limit=HF_REVIEWS_PER_RUN, offset=_hf_offset())
+
+
+def _iter_huggingface(chunk_size: int):
+    """Stream the next slice of HuggingFace dataset reviews in chunks."""
+    yield from iter_hf_reviews(chunk_size, offset=_hf_offset(), limit=HF_REVIEWS_PER_RUN)
+
+
+# Registered feedback sources, fetched concurrently.
+# timeout (seconds) covers all attempts; retries applies to raised errors
+# (Google Play already retries per page). fetch gets the deadline: Google
+# Play stops paging at it; the local CSV and HuggingFace reads (and a
+# first HuggingFace download) are not interrupted, but a fetch past its
+# deadline is abandoned (see services.fetch_service). Sources with
+# 'iter_chunks' are read chunk by chunk in streaming mode.
+FEEDBACK_SOURCES = [
+    {'name': 'Google Play', 'fetch': _fetch_google_play, 'timeout': 180, 'retries': 0},
+    {'name': 'CSV', 'fetch': _fetch_csv, 'iter_chunks': _iter_csv, 'timeout': 60, 'retries': 0},
+    {'name': 'HuggingFace', 'fetch': _fetch_huggingface, 'iter_chunks': _iter_huggingface,
+     'timeout': 180, 'retries': 1},
+]
+
+
+def fetch_all_feedback(sources: list = None) -> pd.DataFrame:
+    """
+    Fetch feedback from all registered sources concurrently.
     
-    # Fetch HuggingFace reviews
-    print("Fetching HuggingFace dataset reviews...")
-    hf_count = 0
-    try:
-        hf_reviews = fetch_hf_reviews(limit=200)
-        if not hf_reviews.empty:
-            hf_count = len(hf_reviews)
-            all_data.append(hf_reviews)
-            print(f"  Fetched {hf_count} HuggingFace records")
-    except Exception as e:
-        print(f"  Error fetching HuggingFace reviews: {e}")
+    Args:
+        sources: Source table to fetch (default: FEEDBACK_SOURCES)
+    
+    Returns:
+        Combined DataFrame of all fetched feedback
+    """
+    if sources is None:
+        sources = FEEDBACK_SOURCES
+    
+    print(f"Fetching feedback from {len(sources)} sources...")
+    fetched = fetch_sources(sources)
     
     # Print summary
     print(f"\nRecords fetched per source:")
-    print(f"  - Google Play: {gp_count}")
-    print(f"  - CSV: {csv_count}")
-    print(f"  - HuggingFace: {hf_count}")
+    for source in sources:
+        print(f"  - {source['name']}: {len(fetched.get(source['name'], []))}")
     
-    # Combine all data
+    # Combine all data, keeping registry order
+    all_data = [fetched[source['name']] for source in sources if source['name'] in fetched]
     if all_data:
         combined = pd.concat(all_data, ignore_index=True)
         print(f"Total feedback collected: {len(combined)}")
@@ -86,94 +254,482 @@ def fetch_all_feedback() -> pd.DataFrame:
         return pd.DataFrame()
 
 
-def process_feedback(df: pd.DataFrame) -> pd.DataFrame:
-    """Clean, analyze, and categorize feedback."""
-    if df.empty:
-        return df
+def iter_feedback_chunks(sources: list = None, chunk_size: int = STREAM_CHUNK_SIZE):
+    """
+    Yield feedback from all sources as DataFrame chunks.
     
-    print("\nProcessing feedback...")
+    Sources with an 'iter_chunks' function are streamed; the rest are
+    fetched concurrently up front and split into chunks.
     
-    # Initialize sentiment analyzer
-    print("  Initializing sentiment analyzer...")
-    analyzer = SentimentAnalyzer()
+    Args:
+        sources: Source table to fetch (default: FEEDBACK_SOURCES)
+        chunk_size: Maximum rows per chunk
     
-    # Clean text
-    print("  Cleaning text...")
-    df['cleaned_content'] = df['content'].apply(clean_text)
+    Yields:
+        DataFrames in the fetched-source format
+    """
+    if sources is None:
+        sources = FEEDBACK_SOURCES
     
-    # Run VADER sentiment
-    print("  Running VADER sentiment analysis...")
-    vader_results = df['cleaned_content'].apply(analyzer.vader_sentiment)
-    df['vader_label'] = vader_results.apply(lambda x: x['label'])
-    df['vader_score'] = vader_results.apply(lambda x: x['score'])
+    print(f"Fetching feedback from {len(sources)} sources...")
+    fetched = fetch_sources([source for source in sources if 'iter_chunks' not in source])
     
-    # Run Transformer sentiment
-    print("  Running Transformer sentiment analysis...")
-    transformer_results = df['cleaned_content'].apply(analyzer.transformer_sentiment)
-    df['transformer_label'] = transformer_results.apply(lambda x: x['label'])
-    df['transformer_score'] = transformer_results.apply(lambda x: x['score'])
+    for source in sources:
+        name = source['name']
+        if 'iter_chunks' in source:
+            try:
+                chunks = source['iter_chunks'](chunk_size)
+                while True:
+                    with stage('fetch', source=name) as record:
+                        chunk = next(chunks, None)
+                        record.rows_out = 0 if chunk is None else len(chunk)
+                    if chunk is None:
+                        break
+                    yield chunk
+            except Exception as e:
+                print(f"  {name}: failed ({e}) (skipping remaining chunks)")
+        elif name in fetched:
+            df = fetched.pop(name)
+            for start in range(0, len(df), chunk_size):
+                yield df.iloc[start:start + chunk_size].reset_index(drop=True)
+
+
+class FeedbackProcessor:
+    """Per-row feedback analysis with models and workers kept across batches."""
+    
+    def __init__(self, workers: int = PROCESS_WORKERS, chunk_size: int = PROCESS_CHUNK_SIZE,
+                 sentiment_mode: str = SENTIMENT_MODE):
+        """
+        Initialize the result cache, sentiment models and worker pool.
+        
+        Args:
+            workers: Worker processes for cleaning, VADER and categorization
+                (1 = run in-process)
+            chunk_size: Rows per chunk handed to a worker
+            sentiment_mode: One of SENTIMENT_MODES; the transformer is only
+                loaded by modes that use it
+        """
+        if sentiment_mode not in SENTIMENT_MODES:
+            raise ValueError(f"Unknown sentiment mode: {sentiment_mode} (expected one of {SENTIMENT_MODES})")
+        
+        print("  Initializing sentiment analyzer...")
+        self.cache = ResultCache()
+        self.analyzer = SentimentAnalyzer(cache=self.cache)
+        
+        print("  Loading issue clusters...")
+        self.clusters = load_cluster_index()
+        self.sentiment_mode = sentiment_mode
+        self.chunk_size = chunk_size
+        
+        self.executor = None
+        if workers > 1:
+            print(f"  Starting {workers} worker processes...")
+            self.executor = create_executor(workers)
+    
+    def _run_chunks(self, func):
+        """Wrap a chunk function to run on this processor's workers."""
+        return lambda items: map_chunks(func, items, self.executor, self.chunk_size)
+    
+    def analyze(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Clean, analyze sentiment, categorize and date a batch of feedback.
+        
+        Args:
+            df: Feedback batch with 'content' and 'date' columns
+        
+        Returns:
+            DataFrame with sentiment, category and recency columns added
+        """
+        rows = len(df)
+        
+        # Cleaned text feeds every stage below but is not kept on the frame
+        print("  Cleaning text...")
+        with stage('clean', rows_in=rows):
+            cleaned = self._run_chunks(clean_chunk)(df['content'].tolist())
+        
+        # Run VADER sentiment
+        if self.sentiment_mode != 'transformer':
+            print("  Running VADER sentiment analysis...")
+            with stage('vader', rows_in=rows):
+                vader_results = self.analyzer.vader_sentiment_batch(
+                    cleaned,
+                    map_func=self._run_chunks(vader_chunk) if self.executor else None
+                )
+        
+        # Run Transformer sentiment
+        if self.sentiment_mode in ('transformer', 'both'):
+            print("  Running Transformer sentiment analysis...")
+            with stage('transformer', rows_in=rows, backend=self.analyzer.backend):
+                transformer_results = self.analyzer.transformer_sentiment_batch(cleaned)
+        
+        if self.sentiment_mode == 'cascade':
+            # VADER everywhere; the transformer only re-scores uncertain rows
+            print("  Running cascade sentiment analysis...")
+            # rows_out of the cascade stage is the number of rows the
+            # transformer re-scored, so the escalation rate is recorded
+            # with the run metrics
+            with stage('cascade', rows_in=rows, backend=self.analyzer.backend) as record:
+                cascade = self.analyzer.cascade_sentiment_batch(
+                    cleaned,
+                    ratings=df['rating'].tolist() if 'rating' in df.columns else None,
+                    vader_results=vader_results
+                )
+                escalated = sum(path != 'vader' for path in cascade['path'])
+                record.rows_out = escalated
+            df['sentiment_label'] = cascade['label']
+            df['sentiment_score'] = cascade['score']
+            df['sentiment_path'] = cascade['path']
+            print(f"  Cascade: {escalated} of {len(df)} rows ({escalated / max(len(df), 1):.1%}) sent to the transformer")
+        else:
+            # VADER is primary unless only the transformer runs
+            primary = transformer_results if self.sentiment_mode == 'transformer' else vader_results
+            df['sentiment_label'] = primary['label']
+            df['sentiment_score'] = primary['score']
+        
+        # Per-model columns are only kept when both models run, for comparison
+        if self.sentiment_mode == 'both':
+            df['vader_label'] = vader_results['label']
+            df['vader_score'] = vader_results['score']
+            df['transformer_label'] = transformer_results['label']
+            df['transformer_score'] = transformer_results['score']
+        
+        # Categorize feedback
+        print("  Categorizing feedback...")
+        with stage('categorize', rows_in=rows):
+            df['category'] = cached_batch(
+                cleaned,
+                self._run_chunks(categorize_chunk),
+                self.cache,
+                CATEGORY_CACHE_NAMESPACE
+            )
+        
+        # Group near-duplicates into issue clusters (new clusters are
+        # saved now; their sizes come from the stored rows)
+        print("  Clustering similar feedback...")
+        with stage('cluster', rows_in=rows):
+            df['cluster_id'] = pd.array(self.clusters.assign_batch(cleaned), dtype='Int32')
+            save_new_clusters(self.clusters)
+        del cleaned
+        
+        today = datetime.now()
+        df['date'] = pd.to_datetime(df['date'])
+        
+        # Distribute reviews across last 7 days for trend demo
+        df['date'] = df['date'] - pd.to_timedelta(df.index % 7, unit='D')
+        df['recency_days'] = (today - df['date']).dt.days
+        
+        return apply_pipeline_dtypes(df)
+    
+    def close(self):
+        """Shut down workers and close the result cache."""
+        if self.executor is not None:
+            self.executor.shutdown()
+        self.cache.close()
+
+
+def score_priority(df: pd.DataFrame, cluster_sizes: dict) -> pd.DataFrame:
+    """
+    Add frequency and priority_score columns.
     
-    # Use VADER as primary sentiment (faster, good for social media)
-    df['sentiment_label'] = df['vader_label']
-    df['sentiment_score'] = df['vader_score']
+    Args:
+        df: Analyzed feedback with cluster, sentiment and recency columns
+        cluster_sizes: dict of cluster_id -> number of reviews in the
+            issue cluster (stored plus this run)
     
-    # Categorize feedback
-    print("  Categorizing feedback...")
-    df['category'] = df['cleaned_content'].apply(categorize_feedback)
+    Returns:
+        DataFrame with 'frequency' and 'priority_score' added
+    """
+    # Frequency is the size of the near-duplicate issue cluster; rows
+    # without a cluster (blank text) count once
+    df['frequency'] = df['cluster_id'].map(cluster_sizes).fillna(1).astype('int32')
+    
+    df['priority_score'] = calculate_priority_batch(
+        to_float64(df['sentiment_score']),
+        df['frequency'].to_numpy(),
+        df['recency_days'].to_numpy(dtype='float64', na_value=np.nan)
+    )
+    return apply_pipeline_dtypes(df)
+
+
+def process_feedback(df: pd.DataFrame, workers: int = PROCESS_WORKERS,
+                     chunk_size: int = PROCESS_CHUNK_SIZE) -> pd.DataFrame:
+    """
+    Clean, analyze, and categorize feedback.
+    
+    Args:
+        df: Combined feedback DataFrame
+        workers: Worker processes for cleaning, VADER and categorization
+            (1 = run in-process)
+        chunk_size: Rows per chunk handed to a worker
+    
+    Returns:
+        DataFrame with sentiment, category and priority columns added
+    """
+    if df.empty:
+        return df
+    
+    print("\nProcessing feedback...")
+    
+    processor = FeedbackProcessor(workers, chunk_size)
+    try:
+        df = processor.analyze(df)
+        cluster_sizes = processor.clusters.sizes
+    finally:
+        processor.close()
     
     # Calculate priority score
     print("  Calculating priority scores...")
-    today = datetime.now()
-    df['date'] = pd.to_datetime(df['date'])
-
-    # Distribute reviews across last 7 days for trend demo
-    df['date'] = df['date'] - pd.to_timedelta(df.index % 7, unit='D')
-    df['recency_days'] = (today - df['date']).dt.days
-    
-    # Count frequency of similar categories
-    category_counts = df['category'].value_counts().to_dict()
-    df['frequency'] = df['category'].map(category_counts)
-    
-    df['priority_score'] = df.apply(
-        lambda row: calculate_priority(
-            row['sentiment_score'],
-            row['frequency'],
-            row['recency_days']
-        ),
-        axis=1
-    )
+    with stage('priority', rows_in=len(df)):
+        df = score_priority(df, cluster_sizes)
     
     print(f"Processing complete. {len(df)} records processed.")
     return df
 
 
-def run_pipeline():
-    """Main pipeline orchestration."""
+def run_pipeline_streaming(chunk_size: int = STREAM_CHUNK_SIZE, sources: list = None):
+    """
+    Run the pipeline chunk by chunk with bounded memory.
+    
+    Pass 1 analyzes and stores each chunk, spills the columns needed
+    later to disk and accumulates per-day sentiment. Pass 2 re-reads
+    the spilled chunks to compute priorities (which need the final
+    issue cluster sizes), update them in the database and export them.
+    
+    Args:
+        chunk_size: Maximum rows per chunk
+        sources: Source table to fetch (default: FEEDBACK_SOURCES)
+    
+    Returns:
+        Outcomes of the final stages (see services.scheduler), or None
+        if there was nothing to process
+    """
+    trend_state = SentimentTrendAccumulator()
+    gp_watermark = None
+    hf_watermark = None
+    total = 0
+    
+    with tempfile.TemporaryDirectory(prefix="feedback_stream_") as spill_dir:
+        spill_paths = []
+        
+        # Pass 1: analyze, store and spill each chunk
+        processor = FeedbackProcessor()
+        try:
+            for chunk in iter_feedback_chunks(sources, chunk_size):
+                # Watermarks advance once the chunk is stored (or had
+                # nothing new)
+                chunk_gp_watermark = _google_play_watermark(chunk)
+                chunk_hf_watermark = _hf_watermark(chunk)
+                
+                # Earlier chunks are already stored, so this also drops
+                # duplicates across chunks
+                with stage('dedup', rows_in=len(chunk)) as record:
+                    chunk = filter_new_feedback(chunk)
+                    record.rows_out = len(chunk)
+                if chunk.empty:
+                    gp_watermark = _merge_google_play_watermarks(gp_watermark, chunk_gp_watermark)
+                    hf_watermark = chunk_hf_watermark or hf_watermark
+                    continue
+                
+                print(f"\nProcessing chunk {len(spill_paths) + 1} ({len(chunk)} records)...")
+                chunk = processor.analyze(chunk).reindex(columns=STREAM_SPILL_COLUMNS)
+                with stage('store', rows_in=len(chunk)) as record:
+                    record.rows_out = store_to_database(chunk)
+                if not record.rows_out:
+                    print("  Chunk not stored; stopping stream")
+                    # Google Play chunks are parts of one newest-first
+                    # fetch; unless all of them are stored, the next run
+                    # must fetch from the old marks again
+                    if chunk_gp_watermark is not None:
+                        gp_watermark = None
+                    break
+                gp_watermark = _merge_google_play_watermarks(gp_watermark, chunk_gp_watermark)
+                hf_watermark = chunk_hf_watermark or hf_watermark
+                
+                total += len(chunk)
+                trend_state.update(chunk)
+                
+                path = os.path.join(spill_dir, f"chunk_{len(spill_paths):06d}.pkl")
+                chunk.to_pickle(path)
+                spill_paths.append(path)
+            cluster_sizes = processor.clusters.sizes
+        finally:
+            processor.close()
+        
+        if gp_watermark is not None:
+            _save_google_play_watermark(gp_watermark)
+        if hf_watermark is not None:
+            set_watermark(HF_OFFSET_KEY, *hf_watermark)
+        
+        if total == 0:
+            print("No new feedback to process. Exiting.")
+            return
+        
+        # Pass 2 (priorities from final cluster sizes, then export) runs
+        # alongside the trend analysis; the report reads the updated
+        # priorities
+        def finalize():
+            print("\nCalculating priority scores...")
+            csv_path = csv_export_path() if EXPORT_FORMAT == 'csv' else None
+            exported_days = set()
+            for index, path in enumerate(spill_paths):
+                chunk = pd.read_pickle(path)
+                with stage('priority', rows_in=len(chunk), thread_cpu=True):
+                    chunk = score_priority(chunk, cluster_sizes)
+                with stage('priority_update', rows_in=len(chunk), thread_cpu=True):
+                    update_priority_scores(chunk)
+                with stage('export', rows_in=len(chunk), format=EXPORT_FORMAT, thread_cpu=True):
+                    if EXPORT_FORMAT == 'csv':
+                        save_to_csv(chunk, csv_path, append=index > 0)
+                    else:
+                        save_to_parquet(chunk)
+                        exported_days |= partition_days(chunk)
+            # Every chunk appended a file per partition; merge them
+            if exported_days:
+                _compact_stage(exported_days)
+            print(f"Processing complete. {total} records processed.")
+        
+        def trend():
+            with stage('trend', rows_in=total, thread_cpu=True):
+                return run_trend_analysis_from_accumulator(trend_state)
+        
+        outcomes = run_stages([
+            {'name': 'finalize', 'run': finalize},
+            {'name': 'trend', 'run': trend},
+            {'name': 'report', 'run': _report_stage, 'after': ['finalize']},
+        ], max_workers=STAGE_WORKERS)
+    
+    print_stage_summary(outcomes)
+    return outcomes
+
+
+def run_pipeline(streaming: bool = PIPELINE_STREAMING):
+    """
+    Main pipeline orchestration.
+    
+    Stage timings are recorded for the run and written to the metrics
+    directory (see services.metrics) when it ends, also on failure. The
+    run is marked failed if any of the final stages failed.
+    
+    Args:
+        streaming: Process sources chunk by chunk with bounded memory
+    """
     print("=" * 50)
     print("Feedback Intelligence System")
     print("=" * 50)
     
+    start_run('streaming' if streaming else 'batch')
+    try:
+        if streaming:
+            outcomes = run_pipeline_streaming()
+        else:
+            outcomes = run_pipeline_batch()
+    except BaseException:
+        finish_run('failed')
+        raise
+    failed = [name for name, outcome in (outcomes or {}).items() if outcome['status'] == 'failed']
+    finish_run('failed' if failed else 'success')
+    
+    print("\n" + "=" * 50)
+    if failed:
+        print(f"Pipeline finished with failed stages: {', '.join(failed)}")
+    else:
+        print("Pipeline complete!")
+    print("=" * 50)
+
+
+def run_pipeline_batch():
+    """
+    Run the pipeline with all fetched feedback in memory.
+    
+    Returns:
+        Outcomes of the final stages (see services.scheduler), or None
+        if there was nothing to process
+    """
     # Step 1: Fetch feedback
     df = fetch_all_feedback()
     if df.empty:
         print("No data to process. Exiting.")
         return
     
-    # Step 2: Process feedback
-    df = process_feedback(df)
-    
-    # Step 3: Store to database
-    store_to_database(df)
+    # Fetched Google Play reviews and last HuggingFace row; saved once
+    # the run is stored
+    gp_watermark = _google_play_watermark(df)
+    hf_watermark = _hf_watermark(df)
     
-    # Step 4: Save to CSV
-    save_to_csv(df)
-    
-    # Step 5: Run trend analysis
-    trends = run_trend_analysis(df)
+    # Skip feedback stored by earlier runs
+    with stage('dedup', rows_in=len(df)) as record:
+        df = filter_new_feedback(df)
+        record.rows_out = len(df)
+    if df.empty:
+        # Already stored: move past the slice so the next run reads new rows
+        if gp_watermark is not None:
+            _save_google_play_watermark(gp_watermark)
+        if hf_watermark is not None:
+            set_watermark(HF_OFFSET_KEY, *hf_watermark)
+        print("No new feedback to process. Exiting.")
+        return
     
-    # Step 6: Generate PDF report
-    generate_pdf_report(df, trends)
+    # Step 2: Process feedback
+    df = process_feedback(df)
     
-    print("\n" + "=" * 50)
-    print("Pipeline complete!")
-    print("=" * 50)
+    # Steps 3-6 run concurrently: trend analysis only needs df; the
+    # export waits for the store, so rows that were not stored (and will
+    # be fetched again) are never appended, and the weekly PDF report
+    # reads the stored rollups
+    outcomes = run_stages([
+        {'name': 'store', 'run': lambda: _store_stage(df, gp_watermark, hf_watermark)},
+        {'name': 'export', 'run': lambda: _export_stage(df), 'after': ['store']},
+        {'name': 'trend', 'run': lambda: _trend_stage(df)},
+        {'name': 'report', 'run': _report_stage, 'after': ['store']},
+    ], max_workers=STAGE_WORKERS)
+    print_stage_summary(outcomes)
+    return outcomes
+
+
+def _store_stage(df: pd.DataFrame, gp_watermark, hf_watermark) -> int:
+    """Store processed feedback, then advance the source watermarks."""
+    with stage('store', rows_in=len(df), thread_cpu=True) as record:
+        stored = store_to_database(df)
+        record.rows_out = stored
+        if not stored:
+            raise RuntimeError("no feedback stored")
+    if gp_watermark is not None:
+        _save_google_play_watermark(gp_watermark)
+    if hf_watermark is not None:
+        set_watermark(HF_OFFSET_KEY, *hf_watermark)
+    return stored
+
+
+def _export_stage(df: pd.DataFrame):
+    """Save processed feedback in EXPORT_FORMAT."""
+    with stage('export', rows_in=len(df), format=EXPORT_FORMAT, thread_cpu=True):
+        if EXPORT_FORMAT == 'csv':
+            save_to_csv(df)
+        else:
+            save_to_parquet(df)
+    if EXPORT_FORMAT != 'csv':
+        _compact_stage(partition_days(df))
+
+
+def _compact_stage(days: set):
+    """Compact the Parquet partitions of the given days (errors are logged)."""
+    with stage('compact', thread_cpu=True) as record:
+        try:
+            record.rows_out = compact_partitions(days=days)
+        except Exception as e:
+            # The appended files are intact; they are merged next time
+            # the day is exported to
+            print(f"  Parquet compaction failed ({e})")
+            record.rows_out = 0
+
+
+def _trend_stage(df: pd.DataFrame) -> dict:
+    """Run trend analysis on processed feedback."""
+    with stage('trend', rows_in=len(df), thread_cpu=True):
+        return run_trend_analysis(df)
+
+
+def _report_stage():
+    """Generate the weekly PDF report from the stored rollups."""
+    with stage('report', thread_cpu=True):
+        generate_weekly_report()
@@ -5,15 +5,95 @@ Handles PDF report generation.
 """
 
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 
 import pandas as pd
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 
+from database.db import engine
+from database.models import create_tables
+from database.repository import top_by_priority
+from database.rollups import query_breakdown, query_latest_day, query_totals
+from services.trend_service import rollup_trend_analysis
+
 
 # Configuration
 REPORT_DIR = "data"
+REPORT_WINDOW_DAYS = 7
+
+
+# Number of top priority issues listed in the report
+TOP_ISSUES = 5
+
+
+def build_report_summary(df: pd.DataFrame) -> dict:
+    """
+    Collect the figures shown in the report from processed feedback.
+    
+    Args:
+        df: Processed feedback DataFrame
+    
+    Returns:
+        dict with 'total', 'sentiment_counts', 'category_counts' and
+        'top_issues' (DataFrame of content, category, priority_score)
+    """
+    return {
+        'total': len(df),
+        'sentiment_counts': df['sentiment_label'].value_counts().to_dict(),
+        'category_counts': df['category'].value_counts().to_dict(),
+        'top_issues': df.nlargest(TOP_ISSUES, 'priority_score')[['content', 'category', 'priority_score']]
+    }
+
+
+def build_report_summary_from_rollups(start_date, end_date) -> dict:
+    """
+    Collect the report figures for stored feedback from the daily rollups.
+    
+    Only the top issues list reads individual feedback rows.
+    
+    Args:
+        start_date: First day to include
+        end_date: Last day to include
+    
+    Returns:
+        dict in the same shape as build_report_summary
+    """
+    create_tables(engine)
+    totals = query_totals(engine, start_date, end_date)
+    sentiment_counts = {
+        label: totals[label] for label in ('positive', 'neutral', 'negative') if totals[label]
+    }
+    categories = query_breakdown(engine, 'category', start_date, end_date)
+    
+    top_issues = top_by_priority(
+        engine, start_date, end_date, limit=TOP_ISSUES,
+        columns=['content', 'category', 'priority_score']
+    )
+    
+    return {
+        'total': totals['total'],
+        'sentiment_counts': dict(sorted(sentiment_counts.items(), key=lambda item: -item[1])),
+        'category_counts': categories['feedback_count'].to_dict(),
+        'top_issues': top_issues
+    }
+
+
+def generate_weekly_report():
+    """
+    Generate the weekly PDF report for stored feedback from the rollups.
+    
+    Covers the REPORT_WINDOW_DAYS days up to the latest day with feedback.
+    """
+    create_tables(engine)
+    end_date = query_latest_day(engine)
+    if end_date is None:
+        return
+    end_date = pd.Timestamp(end_date).date()
+    start_date = end_date - timedelta(days=REPORT_WINDOW_DAYS - 1)
+    summary = build_report_summary_from_rollups(start_date, end_date)
+    trends = rollup_trend_analysis(start_date, end_date)
+    generate_pdf_report_from_summary(summary, trends)
 
 
 def generate_pdf_report(df: pd.DataFrame, trends: dict):
@@ -21,6 +101,22 @@ def generate_pdf_report(df: pd.DataFrame, trends: dict):
     if df.empty:
         return
     
+    generate_pdf_report_from_summary(build_report_summary(df), trends)
+
+
+def generate_pdf_report_from_summary(summary: dict, trends: dict):
+    """
+    Generate weekly PDF report from precomputed figures.
+    
+    Args:
+        summary: Report figures (see build_report_summary)
+        trends: Trend summary dict
+    """
+    if not summary.get('total'):
+        return
+    
+    total = summary['total']
+    
     os.makedirs(REPORT_DIR, exist_ok=True)
     timestamp = datetime.now().strftime("%Y%m%d")
     filepath = os.path.join(REPORT_DIR, f"weekly_report_{timestamp}.pdf")
@@ -45,7 +141,7 @@ def generate_pdf_report(df: pd.DataFrame, trends: dict):
         
         c.setFont("Helvetica", 11)
         y = height - 135
-        c.drawString(50, y, f"Total Feedback Analyzed: {len(df)}")
+        c.drawString(50, y, f"Total Feedback Analyzed: {total}")
         y -= 20
         c.drawString(50, y, f"Overall Sentiment Trend: {trends.get('overall_trend', 'N/A')}")
         y -= 20
@@ -58,9 +154,8 @@ def generate_pdf_report(df: pd.DataFrame, trends: dict):
         
         c.setFont("Helvetica", 11)
         y -= 25
-        sentiment_counts = df['sentiment_label'].value_counts().to_dict()
-        for label, count in sentiment_counts.items():
-            pct = count / len(df) * 100
+        for label, count in summary['sentiment_counts'].items():
+            pct = count / total * 100
             c.drawString(50, y, f"{label.capitalize()}: {count} ({pct:.1f}%)")
             y -= 18
         
@@ -71,9 +166,8 @@ def generate_pdf_report(df: pd.DataFrame, trends: dict):
         
         c.setFont("Helvetica", 11)
         y -= 25
-        category_counts = df['category'].value_counts().to_dict()
-        for category, count in category_counts.items():
-            pct = count / len(df) * 100
+        for category, count in summary['category_counts'].items():
+            pct = count / total * 100
             c.drawString(50, y, f"{category}: {count} ({pct:.1f}%)")
             y -= 18
         
@@ -84,8 +178,7 @@ def generate_pdf_report(df: pd.DataFrame, trends: dict):
         
         c.setFont("Helvetica", 10)
         y -= 25
-        high_priority = df.nlargest(5, 'priority_score')[['content', 'category', 'priority_score']]
-        for _, row in high_priority.iterrows():
+        for _, row in summary['top_issues'].iterrows():
             content_preview = row['content'][:60] + "..." if len(row['content']) > 60 else row['content']
             c.drawString(50, y, f"[{row['category']}] Score: {row['priority_score']:.1f}")
             y -= 15
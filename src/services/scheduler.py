@@ -0,0 +1,142 @@
+"""
+Stage scheduler module.
+
+Runs pipeline stages with declared dependencies on a thread pool: a
+stage starts as soon as every stage it depends on has succeeded, so
+independent I/O-bound stages overlap. A failed stage is logged and
+only its dependents are skipped. What a stage prints is buffered and
+written in one piece when it finishes, so concurrent stages do not
+interleave their output.
+"""
+
+import io
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class _StageOutput:
+    """sys.stdout stand-in that collects the writes of each stage thread."""
+    
+    def __init__(self, stream):
+        """Wrap the real stream; threads without a buffer write to it."""
+        self.stream = stream
+        self.buffers = {}
+    
+    def write(self, text):
+        buffer = self.buffers.get(threading.get_ident())
+        return (buffer or self.stream).write(text)
+    
+    def flush(self):
+        self.stream.flush()
+    
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+def _check_stages(stages: list):
+    """Raise ValueError for duplicate names, unknown dependencies or cycles."""
+    names = [stage['name'] for stage in stages]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate stage names in {names}")
+    
+    after = {stage['name']: list(stage.get('after', ())) for stage in stages}
+    for name, deps in after.items():
+        unknown = [dep for dep in deps if dep not in after]
+        if unknown:
+            raise ValueError(f"Stage {name} depends on unknown stage(s) {unknown}")
+    
+    # Repeatedly remove stages whose dependencies are all removed
+    remaining = dict(after)
+    while remaining:
+        ready = [name for name, deps in remaining.items() if not any(dep in remaining for dep in deps)]
+        if not ready:
+            raise ValueError(f"Dependency cycle among stages {sorted(remaining)}")
+        for name in ready:
+            del remaining[name]
+
+
+def _run_stage(stage: dict, output: _StageOutput) -> dict:
+    """Run one stage, catching its errors and collecting its output."""
+    buffer = output.buffers[threading.get_ident()] = io.StringIO()
+    started = time.perf_counter()
+    try:
+        result = stage['run']()
+        outcome = {'status': 'ok', 'result': result, 'error': None}
+    except Exception as e:
+        print(f"  {stage['name']}: failed ({e})")
+        outcome = {'status': 'failed', 'result': None, 'error': str(e)}
+    finally:
+        del output.buffers[threading.get_ident()]
+    outcome['seconds'] = time.perf_counter() - started
+    outcome['output'] = buffer.getvalue()
+    return outcome
+
+
+def run_stages(stages: list, max_workers: int = None) -> dict:
+    """
+    Run stages concurrently in dependency order.
+    
+    Args:
+        stages: List of dicts with 'name', 'run' (callable taking no
+            arguments) and optional 'after' (names of stages that must
+            succeed first)
+        max_workers: Thread pool size (default: one thread per stage)
+    
+    Returns:
+        dict of stage name -> {'status': 'ok', 'failed' or 'skipped',
+        'result', 'error', 'seconds', 'output'}, in the order of stages
+    """
+    if not stages:
+        return {}
+    _check_stages(stages)
+    
+    outcomes = {}
+    pending = list(stages)
+    running = {}
+    output = _StageOutput(sys.stdout)
+    sys.stdout = output
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers or len(stages), thread_name_prefix="stage") as executor:
+            while pending or running:
+                # Start ready stages and skip blocked ones; skipping can
+                # block further stages, so repeat until nothing changes
+                changed = True
+                while changed:
+                    changed = False
+                    for stage in list(pending):
+                        deps = stage.get('after', ())
+                        blocked = [dep for dep in deps if dep in outcomes and outcomes[dep]['status'] != 'ok']
+                        if blocked:
+                            reason = f"{blocked[0]} {outcomes[blocked[0]]['status']}"
+                            outcomes[stage['name']] = {
+                                'status': 'skipped', 'result': None, 'error': reason, 'seconds': 0.0, 'output': ''
+                            }
+                        elif all(dep in outcomes for dep in deps):
+                            running[executor.submit(_run_stage, stage, output)] = stage['name']
+                        else:
+                            continue
+                        pending.remove(stage)
+                        changed = True
+                
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    outcome = outcomes[running.pop(future)] = future.result()
+                    output.stream.write(outcome['output'])
+    finally:
+        sys.stdout = output.stream
+    
+    return {stage['name']: outcomes[stage['name']] for stage in stages}
+
+
+def print_stage_summary(outcomes: dict):
+    """Print the status and duration of each stage."""
+    print("\nStage summary:")
+    for name, outcome in outcomes.items():
+        line = f"  {name:12s} {outcome['status']:8s} {outcome['seconds']:7.2f}s"
+        if outcome['error']:
+            line += f"  ({outcome['error']})"
+        print(line)
@@ -0,0 +1,89 @@
+"""
+Pipeline schema module.
+
+Column dtypes of processed feedback. Repeated strings are categorical,
+sentiment scores float32 and counts small integers, so a processed
+batch takes a fraction of the memory of object and float64/int64
+columns. priority_score stays float64: it needs two decimals at values
+in the thousands.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# dtype of each processed column; columns not listed keep their dtype
+PIPELINE_DTYPES = {
+    'source': 'category',
+    'category': 'category',
+    'sentiment_label': 'category',
+    'vader_label': 'category',
+    'transformer_label': 'category',
+    'sentiment_path': 'category',
+    'sentiment_score': 'float32',
+    'vader_score': 'float32',
+    'transformer_score': 'float32',
+    'recency_days': 'Int16',
+    'frequency': 'int32',
+    'cluster_id': 'Int32',
+}
+
+# Ratings are small integers; sources with fractional ratings fall back
+# to float32
+RATING_DTYPE = 'Int8'
+RATING_FALLBACK_DTYPE = 'float32'
+
+# Significant decimal digits a float32 represents
+FLOAT32_DIGITS = 7
+
+
+def _rating_column(values: pd.Series) -> pd.Series:
+    """Convert ratings to RATING_DTYPE, or the float fallback if not integral."""
+    numeric = pd.to_numeric(values, errors='coerce')
+    try:
+        return numeric.astype(RATING_DTYPE)
+    except (TypeError, ValueError):
+        return numeric.astype(RATING_FALLBACK_DTYPE)
+
+
+def apply_pipeline_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert the processed columns present in df to their pipeline dtypes.
+    
+    Args:
+        df: Feedback batch at any pipeline stage
+    
+    Returns:
+        The same DataFrame, with columns converted in place
+    """
+    for column, dtype in PIPELINE_DTYPES.items():
+        if column in df.columns and df[column].dtype != dtype:
+            df[column] = df[column].astype(dtype)
+    if 'rating' in df.columns and df['rating'].dtype not in (RATING_DTYPE, RATING_FALLBACK_DTYPE):
+        df['rating'] = _rating_column(df['rating'])
+    return df
+
+
+def to_float64(values) -> np.ndarray:
+    """
+    Widen scores to float64 for storage and arithmetic.
+    
+    float32 values are rounded to the FLOAT32_DIGITS significant digits
+    float32 holds, so 0.1234 is stored as 0.1234 rather than
+    0.12340000271797180.
+    
+    Args:
+        values: Series or array of scores
+    
+    Returns:
+        float64 NumPy array
+    """
+    array = np.asarray(values)
+    if array.dtype != np.float32:
+        return array.astype(np.float64)
+    
+    wide = array.astype(np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        exponent = np.floor(np.log10(np.abs(wide)))
+    scale = 10.0 ** np.where(np.isfinite(exponent), FLOAT32_DIGITS - 1 - exponent, 0)
+    return np.rint(wide * scale) / scale
@@ -4,69 +4,414 @@ Storage service module.
 Handles data persistence to database and CSV files.
 """
 
+import hashlib
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 
+import numpy as np
 import pandas as pd
+from sqlalchemy import bindparam, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
 
 from database.db import engine, get_db_session
-from database.models import Feedback, create_tables
+from database.models import Feedback, FetchWatermark, IssueCluster, create_tables
+from database.rollups import add_to_rollups, add_priority_to_rollups
+from intelligence.clustering import IssueClusterIndex, SIGNATURE_VERSION
+from services.schema import to_float64
 
 
 # Configuration
 DATA_DIR = "data"
+INSERT_CHUNK_SIZE = 5000
 
+# Issue clusters that gained no feedback for this many days are left out
+# of the in-memory index (new similar feedback starts a new cluster)
+CLUSTER_ACTIVE_DAYS = int(os.getenv("CLUSTER_ACTIVE_DAYS", "90"))
 
-def store_to_database(df: pd.DataFrame):
-    """Store processed feedback to SQLite database."""
+# SQLite limits the number of bound parameters per statement
+KEY_QUERY_CHUNK_SIZE = 500
+
+# DataFrame columns persisted to the feedback table
+DB_COLUMNS = [
+    'feedback_key', 'content', 'source', 'rating', 'sentiment_label',
+    'sentiment_score', 'category', 'priority_score', 'date', 'cluster_id',
+    'sentiment_path'
+]
+
+
+def _format_id(value) -> str:
+    """Format a source id so int-like floats (e.g. after concat) stay stable."""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def compute_feedback_keys(df: pd.DataFrame) -> pd.Series:
+    """
+    Compute a stable natural key for each feedback row.
+    
+    Rows with a source id use source + id; other rows fall back to a
+    hash of source + content + date, with missing parts hashed as empty.
+    
+    Args:
+        df: Fetched feedback with 'source', 'content', 'date' and optional 'id'
+    
+    Returns:
+        Series of hex digests aligned with df
+    """
+    # Missing values stay NaN through astype(str) and strftime, so they
+    # are blanked to keep every key a string
+    source = df['source'].astype(str).fillna('')
+    content = df['content'].astype(str).fillna('')
+    date = pd.to_datetime(df['date'], errors='coerce').dt.strftime('%Y-%m-%d %H:%M:%S').fillna('')
+    content_key = source + '|' + content + '|' + date
+    
+    if 'id' in df.columns:
+        has_id = df['id'].notna()
+        id_key = source + '|id|' + df['id'].map(_format_id)
+        raw_keys = id_key.where(has_id, content_key)
+    else:
+        raw_keys = content_key
+    
+    return raw_keys.map(lambda key: hashlib.sha256(key.encode('utf-8')).hexdigest())
+
+
+def _stored_keys(conn, keys: list) -> set:
+    """Return the subset of feedback keys already in the database."""
+    stored = set()
+    keys = [key for key in keys if key is not None]
+    for start in range(0, len(keys), KEY_QUERY_CHUNK_SIZE):
+        chunk = keys[start:start + KEY_QUERY_CHUNK_SIZE]
+        rows = conn.execute(
+            select(Feedback.feedback_key).where(Feedback.feedback_key.in_(chunk))
+        )
+        stored.update(row[0] for row in rows)
+    return stored
+
+
+def filter_new_feedback(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Drop feedback that is already stored or repeated within the batch.
+    
+    Adds a 'feedback_key' column used later by store_to_database.
+    
+    Args:
+        df: Fetched feedback
+    
+    Returns:
+        DataFrame containing only feedback not yet in the database
+    """
     if df.empty:
-        return
+        return df
+    
+    df = df.assign(feedback_key=compute_feedback_keys(df)).drop_duplicates(subset='feedback_key')
+    
+    create_tables(engine)
+    keys = df['feedback_key'].tolist()
+    with engine.connect() as conn:
+        stored = _stored_keys(conn, keys)
+    
+    new_df = df[~df['feedback_key'].isin(stored)].reset_index(drop=True)
+    print(f"\nNew feedback: {len(new_df)} of {len(keys)} unique records")
+    return new_df
+
+
+def _upsert_statement():
+    """Build an insert that updates rows whose feedback_key already exists."""
+    dialects = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+    dialect_insert = dialects.get(engine.dialect.name)
+    if dialect_insert is None:
+        return insert(Feedback)
+    
+    stmt = dialect_insert(Feedback)
+    return stmt.on_conflict_do_update(
+        index_elements=['feedback_key'],
+        set_={col: stmt.excluded[col] for col in DB_COLUMNS if col != 'feedback_key'}
+    )
+
+
+def _to_db_records(df: pd.DataFrame) -> list:
+    """Convert processed feedback rows into insert parameter dicts."""
+    records = df.reindex(columns=DB_COLUMNS)
+    records['sentiment_score'] = to_float64(records['sentiment_score'])
+    records = records.astype(object)
+    records = records.where(records.notna(), None)
+    return records.to_dict('records')
+
+
+def store_to_database(df: pd.DataFrame, chunk_size: int = INSERT_CHUNK_SIZE) -> int:
+    """
+    Store processed feedback to SQLite database.
+    
+    Rows are upserted on feedback_key with chunked executemany
+    statements, and newly inserted rows are added to the daily rollups,
+    all in one transaction.
+    
+    Args:
+        df: Processed feedback DataFrame
+        chunk_size: Number of rows per insert statement
+    
+    Returns:
+        Number of records stored (0 on error)
+    """
+    if df.empty:
+        return 0
     
     print("\nStoring to database...")
     
     # Create tables if not exist
     create_tables(engine)
     
-    session = get_db_session()
     try:
-        records_added = 0
-        for _, row in df.iterrows():
-            feedback = Feedback(
-                content=row['content'],
-                source=row['source'],
-                rating=row.get('rating'),
-                sentiment_label=row['sentiment_label'],
-                sentiment_score=row['sentiment_score'],
-                category=row['category'],
-                priority_score=row['priority_score'],
-                date=row['date']
-            )
-            session.add(feedback)
-            records_added += 1
+        records = _to_db_records(df)
+        stmt = _upsert_statement()
+        with engine.begin() as conn:
+            # Only rows that are not yet stored add to the rollups
+            if 'feedback_key' in df.columns:
+                existing = _stored_keys(conn, df['feedback_key'].tolist())
+                new_rows = df[~df['feedback_key'].isin(existing)]
+            else:
+                new_rows = df
+            
+            for start in range(0, len(records), chunk_size):
+                conn.execute(stmt, records[start:start + chunk_size])
+            add_to_rollups(conn, new_rows)
         
+        print(f"  Stored {len(records)} records to database")
+        return len(records)
+    except Exception as e:
+        print(f"  Error storing to database: {e}")
+        return 0
+
+
+def _stored_priorities(conn, keys: list) -> dict:
+    """Return feedback_key -> stored priority_score for the given keys."""
+    priorities = {}
+    for start in range(0, len(keys), KEY_QUERY_CHUNK_SIZE):
+        chunk = keys[start:start + KEY_QUERY_CHUNK_SIZE]
+        rows = conn.execute(
+            select(Feedback.feedback_key, Feedback.priority_score)
+            .where(Feedback.feedback_key.in_(chunk))
+        )
+        priorities.update((key, score) for key, score in rows)
+    return priorities
+
+
+def update_priority_scores(df: pd.DataFrame, chunk_size: int = INSERT_CHUNK_SIZE):
+    """
+    Update priority scores of stored feedback, matched on feedback_key.
+    
+    Used by the streaming pipeline, which only knows final priorities
+    after every chunk has been stored.
+    
+    Args:
+        df: Feedback with 'feedback_key', 'priority_score' and the rollup
+            key columns (date, source, category)
+        chunk_size: Number of rows per update statement
+    """
+    if df.empty:
+        return
+    
+    stmt = (
+        update(Feedback)
+        .where(Feedback.feedback_key == bindparam('key'))
+        .values(priority_score=bindparam('score'))
+    )
+    params = [
+        {'key': key, 'score': float(score)}
+        for key, score in zip(df['feedback_key'], df['priority_score'])
+    ]
+    try:
+        with engine.begin() as conn:
+            previous = _stored_priorities(conn, df['feedback_key'].tolist())
+            for start in range(0, len(params), chunk_size):
+                conn.execute(stmt, params[start:start + chunk_size])
+            add_priority_to_rollups(conn, df, df['feedback_key'].map(previous))
+    except Exception as e:
+        print(f"  Error updating priority scores: {e}")
+
+
+def get_watermark(source_key: str):
+    """
+    Read the high-water mark of a source stream.
+    
+    Args:
+        source_key: Stream identifier, e.g. 'google_play:com.whatsapp'
+    
+    Returns:
+        Tuple of (last_date, last_review_id), or (None, None) if unset
+    """
+    create_tables(engine)
+    session = get_db_session()
+    try:
+        mark = session.get(FetchWatermark, source_key)
+        if mark is None:
+            return None, None
+        return mark.last_date, mark.last_review_id
+    finally:
+        session.close()
+
+
+def set_watermark(source_key: str, last_date, last_review_id: str = None):
+    """
+    Record the newest review ingested for a source stream.
+    
+    Args:
+        source_key: Stream identifier, e.g. 'google_play:com.whatsapp'
+        last_date: Date of the newest ingested review
+        last_review_id: Id of the newest ingested review
+    """
+    create_tables(engine)
+    session = get_db_session()
+    try:
+        mark = session.get(FetchWatermark, source_key)
+        if mark is None:
+            mark = FetchWatermark(source_key=source_key)
+            session.add(mark)
+        mark.last_date = pd.Timestamp(last_date).to_pydatetime()
+        mark.last_review_id = last_review_id
         session.commit()
-        print(f"  Stored {records_added} records to database")
     except Exception as e:
         session.rollback()
-        print(f"  Error storing to database: {e}")
+        print(f"  Error saving watermark for {source_key}: {e}")
     finally:
         session.close()
 
 
-def save_to_csv(df: pd.DataFrame):
-    """Save processed data to CSV file."""
-    if df.empty:
+def delete_watermark(source_key: str):
+    """
+    Remove the mark of a source stream, if set.
+    
+    Args:
+        source_key: Stream identifier, e.g. 'google_play:com.whatsapp:resume'
+    """
+    create_tables(engine)
+    session = get_db_session()
+    try:
+        mark = session.get(FetchWatermark, source_key)
+        if mark is not None:
+            session.delete(mark)
+            session.commit()
+    except Exception as e:
+        session.rollback()
+        print(f"  Error deleting watermark for {source_key}: {e}")
+    finally:
+        session.close()
+
+
+def load_cluster_index(active_days: int = CLUSTER_ACTIVE_DAYS) -> IssueClusterIndex:
+    """
+    Load recently active issue clusters into an LSH index.
+    
+    Only clusters created or joined within active_days are loaded, so
+    memory and load time follow recent activity rather than the whole
+    history. Cluster sizes are counted from the stored feedback, so
+    clusters whose rows were never stored count as empty.
+    
+    Args:
+        active_days: Days since a cluster last gained feedback
+    
+    Returns:
+        IssueClusterIndex with the active clusters of the current
+        signature version
+    """
+    create_tables(engine)
+    cutoff = datetime.utcnow() - timedelta(days=active_days)
+    active = select(IssueCluster.id).where(
+        IssueCluster.signature_version == SIGNATURE_VERSION,
+        func.coalesce(IssueCluster.last_seen_at, IssueCluster.created_at) >= cutoff
+    )
+    with engine.connect() as conn:
+        max_id = conn.execute(select(func.max(IssueCluster.id))).scalar() or 0
+        sizes = dict(conn.execute(
+            select(Feedback.cluster_id, func.count())
+            .where(Feedback.cluster_id.in_(active))
+            .group_by(Feedback.cluster_id)
+        ).all())
+        rows = conn.execute(
+            select(IssueCluster.id, IssueCluster.signature)
+            .where(IssueCluster.id.in_(active))
+        )
+        
+        index = IssueClusterIndex(next_id=max_id + 1)
+        for cluster_id, signature in rows:
+            index.add_cluster(cluster_id, np.frombuffer(signature, dtype=np.uint32), sizes.get(cluster_id, 0))
+    return index
+
+
+def save_new_clusters(index: IssueClusterIndex):
+    """
+    Store clusters created since the last save and mark joined clusters active.
+    
+    Args:
+        index: Index that assigned cluster ids to new feedback
+    """
+    created = index.pop_new_clusters()
+    matched = index.pop_matched_clusters()
+    if not created and not matched:
         return
     
+    now = datetime.utcnow()
+    records = [
+        {
+            'id': cluster_id,
+            'signature': signature.tobytes(),
+            'signature_version': SIGNATURE_VERSION,
+            'sample_content': sample[:500] if sample else None,
+            'created_at': now,
+            'last_seen_at': now
+        }
+        for cluster_id, signature, sample in created
+    ]
+    try:
+        with engine.begin() as conn:
+            for start in range(0, len(records), INSERT_CHUNK_SIZE):
+                conn.execute(insert(IssueCluster), records[start:start + INSERT_CHUNK_SIZE])
+            for start in range(0, len(matched), KEY_QUERY_CHUNK_SIZE):
+                conn.execute(
+                    update(IssueCluster)
+                    .where(IssueCluster.id.in_(matched[start:start + KEY_QUERY_CHUNK_SIZE]))
+                    .values(last_seen_at=now)
+                )
+    except Exception as e:
+        print(f"  Error saving issue clusters: {e}")
+
+
+def csv_export_path() -> str:
+    """Return a new timestamped path for a processed feedback export."""
     os.makedirs(DATA_DIR, exist_ok=True)
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filepath = os.path.join(DATA_DIR, f"processed_feedback_{timestamp}.csv")
+    return os.path.join(DATA_DIR, f"processed_feedback_{timestamp}.csv")
+
+
+def save_to_csv(df: pd.DataFrame, filepath: str = None, append: bool = False) -> str:
+    """
+    Save processed data to CSV file.
+    
+    Args:
+        df: Processed feedback DataFrame
+        filepath: Target path (default: new timestamped file in DATA_DIR)
+        append: Append rows without a header (for streamed chunks)
+    
+    Returns:
+        Path written to, or None if there was nothing to save
+    """
+    if df.empty:
+        return None
+    
+    if filepath is None:
+        filepath = csv_export_path()
     
     # Select columns to save
     columns_to_save = [
         'content', 'source', 'rating', 'date',
         'sentiment_label', 'sentiment_score',
-        'category', 'priority_score'
+        'category', 'priority_score', 'sentiment_path'
     ]
-    df[columns_to_save].to_csv(filepath, index=False)
-    print(f"\nSaved processed data to {filepath}")
+    # sentiment_path only exists in cascade mode; it is left blank otherwise
+    df.reindex(columns=columns_to_save).to_csv(
+        filepath, index=False, mode='a' if append else 'w', header=not append
+    )
+    if not append:
+        print(f"\nSaved processed data to {filepath}")
+    return filepath
@@ -6,7 +6,10 @@ Handles trend analysis operations.
 
 import pandas as pd
 
-from intelligence.trend import analyze_sentiment_trend
+from database.db import engine
+from database.models import create_tables
+from database.rollups import query_daily_sentiment
+from intelligence.trend import analyze_sentiment_trend, SentimentTrendAccumulator
 
 
 def run_trend_analysis(df: pd.DataFrame) -> dict:
@@ -16,10 +19,58 @@ def run_trend_analysis(df: pd.DataFrame) -> dict:
     
     print("\nRunning trend analysis...")
     trends = analyze_sentiment_trend(df)
+    print_trend_summary(trends)
+    return trends
+
+
+def run_trend_analysis_from_accumulator(accumulator: SentimentTrendAccumulator) -> dict:
+    """
+    Run trend analysis from accumulated per-day sentiment state.
+    
+    Used by the streaming pipeline, which never holds all rows at once.
+    
+    Args:
+        accumulator: State built chunk by chunk (and/or merged)
     
+    Returns:
+        Trend summary dict
+    """
+    if accumulator.total_count == 0:
+        return {}
+    
+    print("\nRunning trend analysis...")
+    trends = accumulator.result()
+    print_trend_summary(trends)
+    return trends
+
+
+def rollup_trend_analysis(start_date=None, end_date=None, sources=None) -> dict:
+    """
+    Trend analysis of stored feedback, computed from the daily rollups.
+    
+    Args:
+        start_date: First day to include (default: all)
+        end_date: Last day to include (default: all)
+        sources: Sources to include (default: all)
+    
+    Returns:
+        Trend summary dict, or {} if there is no stored feedback
+    """
+    create_tables(engine)
+    daily = query_daily_sentiment(engine, start_date, end_date, sources)
+    if daily.empty:
+        return {}
+    
+    accumulator = SentimentTrendAccumulator().add_daily_totals(
+        dict(zip(daily['day'], daily['sentiment_sum'])),
+        dict(zip(daily['day'], daily['feedback_count']))
+    )
+    return accumulator.result()
+
+
+def print_trend_summary(trends: dict):
+    """Print the headline trend figures."""
     print(f"  Overall trend: {trends['overall_trend']}")
     print(f"  Average sentiment: {trends['avg_sentiment']}")
     if trends['negative_spike_dates']:
         print(f"  Negative spike dates: {', '.join(trends['negative_spike_dates'])}")
-    
-    return trends
@@ -0,0 +1,24 @@
+"""Shared pytest setup."""
+
+import os
+import sys
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+@pytest.fixture
+def db_engine(tmp_path, monkeypatch):
+    """Point the storage service at an empty SQLite database."""
+    from sqlalchemy import create_engine
+    
+    from database.models import create_tables
+    from services import storage_service
+    
+    engine = create_engine(f"sqlite:///{tmp_path / 'feedback.db'}")
+    create_tables(engine)
+    monkeypatch.setattr(storage_service, 'engine', engine)
+    yield engine
+    engine.dispose()
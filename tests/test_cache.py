@@ -0,0 +1,70 @@
+"""Result cache eviction and cached_batch failure handling."""
+
+import pytest
+
+from processing import cache as cache_module
+from processing.cache import ResultCache, cached_batch
+
+
+@pytest.fixture
+def cache(tmp_path):
+    result_cache = ResultCache(str(tmp_path / 'cache.db'), max_entries=10)
+    yield result_cache
+    result_cache.close()
+
+
+def _stored(result_cache):
+    return result_cache.conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+
+def test_eviction_keeps_recently_used_entries(cache, monkeypatch):
+    times = iter(range(1000))
+    monkeypatch.setattr(cache_module.time, 'time', lambda: next(times))
+    
+    for i in range(8):
+        cache.set_many('ns', {f'old {i}': i})
+    cache.get_many('ns', ['old 0'])
+    cache.set_many('ns', {f'new {i}': i for i in range(4)})
+    
+    # 12 entries exceed the bound of 10; eviction trims to 9
+    assert _stored(cache) == cache.entries == 9
+    kept = cache.get_many('ns', [f'old {i}' for i in range(8)] + [f'new {i}' for i in range(4)])
+    assert set(kept) == {'old 0', 'old 4', 'old 5', 'old 6', 'old 7', 'new 0', 'new 1', 'new 2', 'new 3'}
+
+
+def test_replaced_keys_do_not_trigger_eviction(cache):
+    for _ in range(5):
+        cache.set_many('ns', {f'text {i}': i for i in range(6)})
+    
+    assert _stored(cache) == 6
+    assert cache.get_many('ns', ['text 0'])
+
+
+def test_count_is_loaded_on_open(cache, tmp_path):
+    cache.set_many('ns', {f'text {i}': i for i in range(7)})
+    reopened = ResultCache(str(tmp_path / 'cache.db'), max_entries=10)
+    
+    assert reopened.entries == 7
+    reopened.close()
+
+
+def test_cached_batch_does_not_cache_failures(cache):
+    calls = []
+    
+    def compute(texts):
+        calls.append(list(texts))
+        return [None if text == 'bad' else text.upper() for text in texts]
+    
+    assert cached_batch(['ok', 'bad', 'ok'], compute, cache, 'ns') == ['OK', None, 'OK']
+    assert cached_batch(['ok', 'bad'], compute, cache, 'ns') == ['OK', None]
+    
+    # Duplicates are computed once; the failed text is retried, the hit is not
+    assert calls == [['ok', 'bad'], ['bad']]
+    assert _stored(cache) == 1
+
+
+def test_namespaces_are_separate(cache):
+    cache.set_many('a', {'text': 1})
+    
+    assert cache.get_many('b', ['text']) == {}
+    assert cache.get_many('a', ['text']) == {'text': 1}
@@ -0,0 +1,48 @@
+"""Keyword categorization: word boundaries and scalar/batch parity."""
+
+import pandas as pd
+import pytest
+
+from processing.categorizer import categorize_batch, categorize_feedback
+
+
+@pytest.mark.parametrize('text, category', [
+    ('The app keeps lagging on my phone', 'Performance'),
+    ('It lagged twice today', 'Performance'),
+    ('So laggy since the update', 'Performance'),
+    ('Loads slowly', 'Performance'),
+    ('Used to be faster', 'Performance'),
+    ('Crashes every time I open it', 'Bug'),
+    ('Really buggy release', 'Bug'),
+    ('The sync is bugged', 'Bug'),
+    ('Glitchy scrolling', 'Bug'),
+    ('Please add dark mode', 'Feature Request'),
+    ('The ui is clean', 'UI/UX'),
+    ('Great guide for beginners', 'Other'),
+    ('Fantastic breakfast recipes', 'Other'),
+    ('Love it', 'Other'),
+    ('', 'Other'),
+])
+def test_keywords_match_whole_words_and_inflections(text, category):
+    assert categorize_feedback(text) == category
+    assert categorize_batch(pd.Series([text])).tolist() == [category]
+
+
+def test_first_category_wins():
+    # Bug is listed before Performance
+    assert categorize_feedback('Slow and it crashes') == 'Bug'
+
+
+def test_batch_matches_scalar():
+    texts = pd.Series([
+        'lagging', 'slowly loading', 'guide', 'fixes needed', 'UI looks ugly',
+        'I wish it was faster', 'BUGGY', 'not working', 'doesnt work anymore',
+        'needs a button', 'ultimate', 'breakfast', 'issue with navigation',
+        None, float('nan'), 'memory heavy', 'the designer', 'quick',
+    ], index=range(100, 118))
+    
+    expected = [categorize_feedback(text if isinstance(text, str) else '') for text in texts]
+    result = categorize_batch(texts)
+    
+    assert result.index.tolist() == texts.index.tolist()
+    assert result.tolist() == expected
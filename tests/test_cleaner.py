@@ -0,0 +1,61 @@
+"""Parity of batch and per-text cleaning."""
+
+import random
+
+import numpy as np
+import pandas as pd
+
+from processing.cleaner import CLEAN_JOIN_SIZE, _SEPARATOR, clean_batch, clean_text
+
+
+SAMPLES = [
+    "Great app!!! Love it 😀👍",
+    "CRASHES on startup... see https://example.com/bug?id=1 and www.example.org",
+    "  tabs\tand\nnewlines   everywhere  ",
+    "ΟΔΥΣΣΕΥΣ ΣΑΣ",  # final sigma depends on the end of each text
+    "Ünïcödé çafé naïve — “quotes” and ½ ² ٣",
+    "İstanbul ǅ ﬁ ß",
+    "",
+    "!!!",
+    "emoji ❤ ☀ ✂ only",
+    f"text with the{_SEPARATOR}separator inside",
+    f"{_SEPARATOR}",
+    " non-breaking spaces​",
+]
+
+
+def _random_text(rng: random.Random) -> str:
+    alphabet = "abcXYZ 019!?.,'\t\n😀ΣσςÉé— " + _SEPARATOR
+    words = ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 8))) for _ in range(rng.randint(0, 6))]
+    if rng.random() < 0.2:
+        words.insert(rng.randint(0, len(words)), "http://x.io/a" + rng.choice(["", "b", "?q=1"]))
+    return " ".join(words)
+
+
+def test_matches_clean_text_on_edge_cases():
+    texts = SAMPLES + [None, np.nan] + SAMPLES
+    
+    assert clean_batch(texts) == [clean_text(text) for text in texts]
+
+
+def test_accepts_a_series():
+    texts = pd.Series(SAMPLES + [None])
+    
+    assert clean_batch(texts) == [clean_text(text) for text in texts]
+
+
+def test_matches_clean_text_beyond_one_join():
+    rng = random.Random(11)
+    unique = [_random_text(rng) for _ in range(CLEAN_JOIN_SIZE + 500)]
+    texts = unique + rng.sample(unique, 2000) + SAMPLES
+    
+    assert clean_batch(texts) == [clean_text(text) for text in texts]
+
+
+def test_cache_reuses_results():
+    cache = {}
+    first = clean_batch(SAMPLES, cache=cache)
+    cache[SAMPLES[0]] = "cached"
+    
+    assert first == [clean_text(text) for text in SAMPLES]
+    assert clean_batch(SAMPLES, cache=cache)[0] == "cached"
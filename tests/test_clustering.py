@@ -0,0 +1,107 @@
+"""MinHash/LSH issue clustering and its persistence across runs."""
+
+import pandas as pd
+from sqlalchemy import select, update
+
+from database.models import IssueCluster
+from intelligence import clustering
+from intelligence.clustering import IssueClusterIndex, minhash
+from services import storage_service
+
+CRASH = 'the app crashes every time i open the camera on my phone'
+CRASH_VARIANT = 'the app crashes every time i open the camera on my new phone'
+LOGIN = 'cannot log in since yesterday, it keeps saying wrong password'
+PRAISE = 'love the new dark mode, the design looks beautiful'
+
+
+def test_near_duplicates_share_a_cluster():
+    index = IssueClusterIndex()
+    
+    crash, variant, login, praise, blank = index.assign_batch([CRASH, CRASH_VARIANT, LOGIN, PRAISE, '  '])
+    
+    assert crash == variant
+    assert len({crash, login, praise}) == 3
+    assert blank is None
+    assert index.sizes[crash] == 2
+
+
+def test_identical_texts_are_counted_once_signed():
+    index = IssueClusterIndex()
+    
+    ids = index.assign_batch([CRASH, CRASH, CRASH])
+    
+    assert ids == [1, 1, 1]
+    assert index.sizes[1] == 3
+    assert [cluster_id for cluster_id, _, _ in index.pop_new_clusters()] == [1]
+    assert index.pop_matched_clusters() == []
+
+
+def test_candidates_are_capped(monkeypatch):
+    signature = minhash(CRASH)
+    near = signature.copy()
+    near[-4:] += 1  # differs in the last band only
+    
+    def build():
+        index = IssueClusterIndex()
+        for cluster_id in (1, 2, 3):
+            index.add_cluster(cluster_id, near)
+        index.add_cluster(4, signature)
+        return index
+    
+    # Uncapped, the exact match wins
+    assert build().assign(CRASH) == 4
+    
+    # Capped, only the first three bucket members are compared
+    monkeypatch.setattr(clustering, 'MAX_CANDIDATES', 3)
+    assert build().assign(CRASH) == 1
+
+
+def test_second_run_reuses_stored_clusters(db_engine):
+    first = storage_service.load_cluster_index()
+    ids = first.assign_batch([CRASH, LOGIN])
+    storage_service.save_new_clusters(first)
+    storage_service.store_to_database(pd.DataFrame({
+        'feedback_key': ['a', 'b'],
+        'content': [CRASH, LOGIN],
+        'source': 'csv',
+        'date': pd.Timestamp('2026-03-01'),
+        'sentiment_label': 'negative',
+        'sentiment_score': -0.5,
+        'category': 'Bug',
+        'cluster_id': ids,
+    }))
+    
+    second = storage_service.load_cluster_index()
+    assert second.sizes == {ids[0]: 1, ids[1]: 1}
+    
+    assigned = second.assign_batch([CRASH_VARIANT, PRAISE])
+    assert assigned[0] == ids[0]
+    assert assigned[1] == max(ids) + 1
+    assert second.sizes[ids[0]] == 2
+    
+    with db_engine.connect() as conn:
+        before = dict(conn.execute(select(IssueCluster.id, IssueCluster.last_seen_at)).all())
+    storage_service.save_new_clusters(second)
+    with db_engine.connect() as conn:
+        after = dict(conn.execute(select(IssueCluster.id, IssueCluster.last_seen_at)).all())
+    
+    assert set(after) == set(ids) | {assigned[1]}
+    assert after[ids[0]] > before[ids[0]]
+    assert after[ids[1]] == before[ids[1]]
+
+
+def test_inactive_clusters_are_not_loaded(db_engine):
+    index = storage_service.load_cluster_index()
+    crash, login = index.assign_batch([CRASH, LOGIN])
+    storage_service.save_new_clusters(index)
+    with db_engine.begin() as conn:
+        conn.execute(
+            update(IssueCluster).where(IssueCluster.id == crash)
+            .values(created_at=pd.Timestamp('2020-01-01'), last_seen_at=pd.Timestamp('2020-01-01'))
+        )
+    
+    reloaded = storage_service.load_cluster_index(active_days=30)
+    
+    assert set(reloaded.sizes) == {login}
+    # Ids keep increasing past unloaded clusters
+    assert reloaded.assign(CRASH) == max(crash, login) + 1
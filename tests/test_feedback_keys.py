@@ -0,0 +1,38 @@
+"""Stable natural keys for fetched feedback."""
+
+import numpy as np
+import pandas as pd
+
+from services.storage_service import compute_feedback_keys
+
+
+def _feedback(**columns):
+    base = {
+        'source': ['csv', 'csv', 'csv'],
+        'content': ['Crashes on start', None, 'Login fails'],
+        'date': ['2026-01-05 10:00:00', '2026-01-05 11:00:00', None],
+    }
+    base.update(columns)
+    return pd.DataFrame(base)
+
+
+def test_missing_date_and_content_give_string_keys():
+    keys = compute_feedback_keys(_feedback())
+    
+    assert keys.map(lambda key: isinstance(key, str) and len(key) == 64).all()
+    assert keys.nunique() == 3
+
+
+def test_keys_are_stable_across_calls():
+    first = compute_feedback_keys(_feedback())
+    second = compute_feedback_keys(_feedback(date=['2026-01-05 10:00:00', '2026-01-05 11:00:00', pd.NaT]))
+    
+    assert first.tolist() == second.tolist()
+
+
+def test_source_id_takes_precedence_over_content():
+    df = _feedback(id=[101.0, np.nan, 'abc'])
+    keys = compute_feedback_keys(df)
+    
+    assert keys[0] == compute_feedback_keys(_feedback(id=[101, None, 'abc'], content=['edited', None, 'x']))[0]
+    assert keys[1] == compute_feedback_keys(_feedback())[1]
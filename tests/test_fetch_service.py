@@ -0,0 +1,57 @@
+"""Concurrent source fetching with retries and deadlines."""
+
+import threading
+import time
+
+import pandas as pd
+
+import services.fetch_service as fetch_service
+from services.fetch_service import fetch_sources
+
+
+def test_raised_errors_are_retried(monkeypatch):
+    monkeypatch.setattr(fetch_service, 'RETRY_BACKOFF', 0.01)
+    calls = []
+    
+    def flaky(deadline):
+        calls.append(deadline)
+        if len(calls) == 1:
+            raise OSError("transient")
+        return pd.DataFrame({'content': ['ok']})
+    
+    fetched = fetch_sources([{'name': 'flaky', 'fetch': flaky, 'timeout': 5, 'retries': 1}])
+    
+    assert len(calls) == 2
+    assert calls[0] == calls[1] > time.monotonic()
+    assert fetched['flaky']['content'].tolist() == ['ok']
+
+
+def test_no_retry_past_the_deadline(monkeypatch):
+    monkeypatch.setattr(fetch_service, 'RETRY_BACKOFF', 10)
+    calls = []
+    
+    def failing(deadline):
+        calls.append(deadline)
+        raise OSError("down")
+    
+    assert fetch_sources([{'name': 'down', 'fetch': failing, 'timeout': 1, 'retries': 3}]) == {}
+    assert len(calls) == 1
+
+
+def test_overrunning_fetch_is_abandoned_in_a_daemon_thread():
+    release = threading.Event()
+    
+    def hanging(deadline):
+        release.wait(5)
+        return pd.DataFrame({'content': ['late']})
+    
+    started = time.monotonic()
+    fetched = fetch_sources([
+        {'name': 'hanging', 'fetch': hanging, 'timeout': 0.2, 'retries': 0},
+        {'name': 'quick', 'fetch': lambda deadline: pd.DataFrame({'content': ['ok']}), 'timeout': 5},
+    ])
+    
+    assert time.monotonic() - started < 2
+    assert list(fetched) == ['quick']
+    assert all(thread.daemon for thread in threading.enumerate() if thread.name == 'fetch-hanging')
+    release.set()
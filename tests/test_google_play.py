@@ -0,0 +1,133 @@
+"""Incremental Google Play fetching against a stubbed reviews function."""
+
+from datetime import datetime, timedelta
+from functools import partial
+
+import pytest
+
+from fetchers.google_play import fetch_google_reviews_incremental
+import services.pipeline as pipeline
+
+
+class StubToken:
+    """Continuation token; token is None on the last page."""
+    
+    def __init__(self, offset, last):
+        self.offset = offset
+        self.token = None if last else str(offset)
+
+
+class StubStore:
+    """Reviews of one app, newest first, served like google_play_scraper.reviews."""
+    
+    def __init__(self):
+        self.reviews = []
+        self.next_id = 0
+        self.now = datetime(2026, 1, 1)
+    
+    def add(self, count):
+        """Publish count new reviews, each newer than the last."""
+        for _ in range(count):
+            self.next_id += 1
+            self.now += timedelta(minutes=1)
+            self.reviews.insert(0, {
+                'reviewId': f"r{self.next_id}",
+                'content': f"review {self.next_id}",
+                'score': 3,
+                'at': self.now,
+            })
+    
+    def __call__(self, app_id, lang, country, sort, count, continuation_token=None):
+        start = continuation_token.offset if continuation_token is not None else 0
+        end = start + count
+        return self.reviews[start:end], StubToken(end, end >= len(self.reviews))
+
+
+def _ids(df):
+    return df['review_id'].tolist()
+
+
+def test_stops_at_watermark():
+    store = StubStore()
+    store.add(30)
+    mark = store.reviews[20]
+    
+    df = fetch_google_reviews_incremental('app', since=mark['at'], since_id=mark['reviewId'],
+                                          page_size=7, reviews_func=store)
+    
+    assert _ids(df) == [review['reviewId'] for review in store.reviews[:20]]
+
+
+def test_resume_skips_reviews_of_the_earlier_fetch():
+    store = StubStore()
+    store.add(30)
+    
+    first = fetch_google_reviews_incremental('app', max_count=10, page_size=4, reviews_func=store)
+    oldest = store.reviews[9]
+    second = fetch_google_reviews_incremental('app', max_count=10, page_size=4, reviews_func=store,
+                                              resume_from=oldest['at'], resume_from_id=oldest['reviewId'])
+    
+    assert _ids(first) == [f"r{i}" for i in range(30, 20, -1)]
+    assert _ids(second) == [f"r{i}" for i in range(20, 10, -1)]
+
+
+@pytest.fixture
+def gp_pipeline(monkeypatch):
+    """Pipeline Google Play fetching with a stub store and in-memory watermarks."""
+    store = StubStore()
+    marks = {}
+    monkeypatch.setattr(pipeline, 'GOOGLE_PLAY_MAX_REVIEWS', 10)
+    monkeypatch.setattr(pipeline, 'fetch_google_reviews_incremental',
+                        partial(fetch_google_reviews_incremental, page_size=4, reviews_func=store))
+    monkeypatch.setattr(pipeline, 'get_watermark', lambda key: marks.get(key, (None, None)))
+    monkeypatch.setattr(pipeline, 'set_watermark', lambda key, date, review_id=None: marks.__setitem__(key, (date, review_id)))
+    monkeypatch.setattr(pipeline, 'delete_watermark', lambda key: marks.pop(key, None))
+    return store, marks
+
+
+def _run(ingested):
+    """One pipeline run: fetch, 'store' and advance the marks."""
+    df = pipeline._fetch_google_play()
+    df['source'] = 'google_play'
+    assert not set(df['id']) & ingested, "review fetched twice"
+    ingested.update(df['id'])
+    fetched = pipeline._google_play_watermark(df)
+    if fetched is not None:
+        pipeline._save_google_play_watermark(fetched)
+    return len(df)
+
+
+def test_runs_over_max_reviews_leave_no_gap(gp_pipeline):
+    store, marks = gp_pipeline
+    ingested = set()
+    
+    store.add(5)
+    assert _run(ingested) == 5
+    
+    # More new reviews than one run fetches, and more arriving meanwhile
+    store.add(25)
+    assert _run(ingested) == 10
+    assert marks[pipeline.GOOGLE_PLAY_WATERMARK_KEY][1] == "r5"
+    store.add(3)
+    assert _run(ingested) == 10
+    assert _run(ingested) == 5
+    assert pipeline.GOOGLE_PLAY_RESUME_KEY not in marks
+    assert marks[pipeline.GOOGLE_PLAY_WATERMARK_KEY][1] == "r30"
+    
+    assert _run(ingested) == 3
+    assert _run(ingested) == 0
+    assert ingested == {review['reviewId'] for review in store.reviews}
+
+
+def test_gap_that_ends_at_a_page_boundary_closes(gp_pipeline):
+    store, marks = gp_pipeline
+    ingested = set()
+    
+    store.add(20)
+    assert _run(ingested) == 10
+    assert _run(ingested) == 10
+    # The second run also hit the limit; the next finds the gap empty
+    store.add(2)
+    assert _run(ingested) == 2
+    assert pipeline.GOOGLE_PLAY_RESUME_KEY not in marks
+    assert ingested == {review['reviewId'] for review in store.reviews}
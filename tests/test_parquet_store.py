@@ -0,0 +1,65 @@
+"""Parquet store appends, compaction and version marker."""
+
+import glob
+import os
+
+import pandas as pd
+
+from services.parquet_store import compact_partitions, load_feedback, partition_days, save_to_parquet, store_version
+
+
+def _feedback(suffix):
+    return pd.DataFrame({
+        'content': [f'a{suffix}', f'b{suffix}', f'c{suffix}'],
+        'source': ['csv', 'csv', 'huggingface'],
+        'rating': [1.0, 2.0, None],
+        'date': pd.to_datetime(['2026-01-01 05:00', '2026-01-01 01:00', '2026-01-02 00:00']),
+        'sentiment_label': ['negative', 'positive', 'neutral'],
+        'sentiment_score': pd.array([-0.5, 0.25, 0.0], dtype='float32'),
+        'category': ['Bug', 'Other', 'Other'],
+        'priority_score': [40.0, 0.0, 0.0],
+    })
+
+
+def _part_files(base_dir):
+    return sorted(glob.glob(os.path.join(base_dir, '**', '*.parquet'), recursive=True))
+
+
+def _load(base_dir):
+    return load_feedback(base_dir).sort_values('content').reset_index(drop=True)
+
+
+def test_compaction_merges_touched_partitions_only(tmp_path):
+    base_dir = str(tmp_path / 'store')
+    for run in range(3):
+        save_to_parquet(_feedback(run), base_dir)
+    save_to_parquet(_feedback('x').assign(sentiment_path=['uncertain', 'vader', None]), base_dir)
+    before = _load(base_dir)
+    version = store_version(base_dir)
+    
+    assert len(_part_files(base_dir)) == 8
+    assert compact_partitions(base_dir, days={'2026-01-01'}) == 1
+    
+    files = _part_files(base_dir)
+    assert len([path for path in files if 'day=2026-01-01' in path]) == 1
+    assert len([path for path in files if 'day=2026-01-02' in path]) == 4
+    assert _load(base_dir).equals(before)
+    assert store_version(base_dir) != version
+
+
+def test_compaction_of_compacted_store_is_a_no_op(tmp_path):
+    base_dir = str(tmp_path / 'store')
+    save_to_parquet(_feedback(0), base_dir)
+    save_to_parquet(_feedback(1), base_dir)
+    
+    assert compact_partitions(base_dir) == 2
+    version = store_version(base_dir)
+    assert compact_partitions(base_dir) == 0
+    assert store_version(base_dir) == version
+    assert len(_load(base_dir)) == 6
+
+
+def test_partition_days_and_missing_store(tmp_path):
+    assert partition_days(_feedback(0)) == {'2026-01-01', '2026-01-02'}
+    assert compact_partitions(str(tmp_path / 'missing')) == 0
+    assert store_version(str(tmp_path / 'missing')) is None
@@ -0,0 +1,26 @@
+"""Parity of vectorized and scalar priority scoring."""
+
+import numpy as np
+
+from intelligence.priority import calculate_priority, calculate_priority_batch
+
+
+def test_batch_matches_scalar_on_random_inputs():
+    rng = np.random.default_rng(7)
+    size = 5000
+    sentiment = rng.uniform(-1, 1, size)
+    sentiment[:50] = 0.0
+    frequency = rng.integers(0, 500, size)
+    recency = rng.integers(0, 60, size).astype(float)
+    recency[rng.random(size) < 0.05] = np.nan
+    
+    expected = [calculate_priority(*row) for row in zip(sentiment, frequency, recency)]
+    
+    np.testing.assert_array_equal(calculate_priority_batch(sentiment, frequency, recency), expected)
+
+
+def test_unknown_recency_gets_no_recency_weight():
+    batch = calculate_priority_batch([-0.8, 0.5], [4, 4], [np.nan, np.nan])
+    
+    assert calculate_priority(-0.8, 4, float('nan')) == 12.0
+    assert batch.tolist() == [12.0, 0.0]
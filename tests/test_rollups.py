@@ -0,0 +1,58 @@
+"""Incremental rollups against a full rebuild from the feedback table."""
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+
+from database.models import DailyRollup
+from database.rollups import ROLLUP_KEYS, ROLLUP_VALUES, rebuild_rollups
+from services import storage_service
+
+
+def _feedback(rows, seed):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'feedback_key': [f'{seed}-{i}' for i in range(rows)],
+        'content': [f'review {seed}-{i}' for i in range(rows)],
+        'source': rng.choice(['google_play', 'csv', 'huggingface'], rows),
+        'rating': rng.integers(1, 6, rows).astype(float),
+        'date': pd.Timestamp('2026-03-01') + pd.to_timedelta(rng.integers(0, 10 * 24, rows), unit='h'),
+        'sentiment_label': rng.choice(['positive', 'neutral', 'negative'], rows),
+        'sentiment_score': rng.uniform(-1, 1, rows).astype('float32'),
+        'category': pd.Categorical(rng.choice(['Bug', 'Performance', 'Other'], rows)),
+        'priority_score': np.round(rng.uniform(0, 100, rows), 2),
+    })
+    df.loc[df.index[:3], 'sentiment_score'] = np.nan
+    df.loc[df.index[3:5], 'category'] = np.nan
+    df.loc[df.index[5], 'date'] = pd.NaT
+    return df
+
+
+def _rollups(engine) -> pd.DataFrame:
+    with engine.connect() as conn:
+        rows = conn.execute(select(*[DailyRollup.__table__.c[col] for col in ROLLUP_KEYS + ROLLUP_VALUES])).all()
+    df = pd.DataFrame(rows, columns=ROLLUP_KEYS + ROLLUP_VALUES)
+    return df.sort_values(ROLLUP_KEYS).reset_index(drop=True)
+
+
+def test_incremental_rollups_match_rebuild(db_engine):
+    batches = [_feedback(200, seed) for seed in range(4)]
+    for batch in batches:
+        assert storage_service.store_to_database(batch, chunk_size=64) == len(batch)
+    # Re-storing rows that already exist must not count them twice
+    storage_service.store_to_database(batches[1])
+    
+    # Priority updates (as in the streaming pipeline) adjust the sums
+    updated = batches[2].assign(priority_score=batches[2]['priority_score'] * 0.5)
+    storage_service.update_priority_scores(updated)
+    storage_service.update_priority_scores(updated.assign(priority_score=updated['priority_score'] + 1))
+    
+    incremental = _rollups(db_engine)
+    with db_engine.begin() as conn:
+        rebuild_rollups(conn)
+    rebuilt = _rollups(db_engine)
+    
+    assert incremental[ROLLUP_KEYS].equals(rebuilt[ROLLUP_KEYS])
+    assert incremental['feedback_count'].sum() == sum(len(batch) - 1 for batch in batches)
+    for column in ROLLUP_VALUES:
+        np.testing.assert_allclose(incremental[column], rebuilt[column], rtol=1e-9, atol=1e-9, err_msg=column)
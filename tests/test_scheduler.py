@@ -0,0 +1,83 @@
+"""Dependency-ordered stage scheduling."""
+
+import threading
+
+import pytest
+
+from services.scheduler import run_stages
+
+
+def _fail():
+    raise RuntimeError('disk full')
+
+
+def test_failed_stage_skips_only_its_dependents():
+    ran = []
+    stages = [
+        {'name': 'store', 'run': _fail},
+        {'name': 'trend', 'run': lambda: ran.append('trend') or 'rising'},
+        {'name': 'export', 'run': lambda: ran.append('export'), 'after': ['store']},
+        {'name': 'report', 'run': lambda: ran.append('report'), 'after': ['export', 'trend']},
+    ]
+    
+    outcomes = run_stages(stages)
+    
+    assert list(outcomes) == ['store', 'trend', 'export', 'report']
+    assert outcomes['store']['status'] == 'failed'
+    assert outcomes['store']['error'] == 'disk full'
+    assert outcomes['trend']['status'] == 'ok'
+    assert outcomes['trend']['result'] == 'rising'
+    assert outcomes['export']['status'] == 'skipped'
+    assert outcomes['export']['error'] == 'store failed'
+    assert outcomes['report']['status'] == 'skipped'
+    assert outcomes['report']['error'] == 'export skipped'
+    assert ran == ['trend']
+
+
+def test_dependencies_run_first_and_independent_stages_overlap():
+    # Both stages must be running at once to pass the barrier
+    barrier = threading.Barrier(2, timeout=5)
+    order = []
+    stages = [
+        {'name': 'a', 'run': lambda: order.append(('a', barrier.wait()))},
+        {'name': 'b', 'run': lambda: order.append(('b', barrier.wait()))},
+        {'name': 'c', 'run': lambda: order.append(('c', None)), 'after': ['a', 'b']},
+    ]
+    
+    outcomes = run_stages(stages)
+    
+    assert all(outcome['status'] == 'ok' for outcome in outcomes.values())
+    assert order[-1] == ('c', None)
+
+
+def test_stage_output_is_written_in_one_block(capsys):
+    barrier = threading.Barrier(2, timeout=5)
+    
+    def chatty(name):
+        def run():
+            print(f'{name} start')
+            barrier.wait()
+            print(f'{name} end')
+        return run
+    
+    outcomes = run_stages([{'name': 'a', 'run': chatty('a')}, {'name': 'b', 'run': chatty('b')}])
+    
+    lines = capsys.readouterr().out.splitlines()
+    assert sorted([lines[:2], lines[2:]]) == [['a start', 'a end'], ['b start', 'b end']]
+    assert outcomes['a']['output'] == 'a start\na end\n'
+
+
+@pytest.mark.parametrize('stages, message', [
+    ([{'name': 'a', 'after': ['b']}, {'name': 'b', 'after': ['a']}, {'name': 'c'}], 'cycle'),
+    ([{'name': 'a', 'after': ['a']}], 'cycle'),
+    ([{'name': 'a', 'after': ['missing']}], 'unknown'),
+    ([{'name': 'a'}, {'name': 'a'}], 'Duplicate'),
+])
+def test_invalid_graphs_are_rejected_before_running(stages, message):
+    ran = []
+    for stage in stages:
+        stage['run'] = lambda: ran.append(True)
+    
+    with pytest.raises(ValueError, match=message):
+        run_stages(stages)
+    assert ran == []
@@ -0,0 +1,76 @@
+"""Mergeable sentiment trend state against the whole-frame computation."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from intelligence.trend import SentimentTrendAccumulator, analyze_sentiment_trend
+
+
+def _feedback(rows=2000, seed=3):
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp('2026-01-01') + pd.to_timedelta(rng.integers(0, 20 * 24, rows), unit='h')
+    scores = rng.uniform(-1, 1, rows).astype('float32')
+    # Later days skew negative so the trend is not 'stable'
+    scores = scores - (dates.day.to_numpy() > 12) * np.float32(0.4)
+    scores[rng.random(rows) < 0.1] = np.nan
+    return pd.DataFrame({'date': dates, 'sentiment_score': scores}).sample(frac=1, random_state=seed)
+
+
+def _assert_same_trend(result, expected):
+    assert result['overall_trend'] == expected['overall_trend']
+    assert result['negative_spike_dates'] == expected['negative_spike_dates']
+    assert result['avg_sentiment'] == pytest.approx(expected['avg_sentiment'], abs=1e-3)
+    assert result['daily_sentiment'].keys() == expected['daily_sentiment'].keys()
+    for day, score in expected['daily_sentiment'].items():
+        assert result['daily_sentiment'][day] == pytest.approx(score, abs=1e-3)
+
+
+def test_chunked_and_merged_match_whole_frame():
+    df = _feedback()
+    whole = analyze_sentiment_trend(df)
+    
+    # Sequential chunks into one accumulator
+    chunked = SentimentTrendAccumulator()
+    for start in range(0, len(df), 300):
+        chunked.update(df.iloc[start:start + 300])
+    
+    # Independent partitions merged together
+    merged = SentimentTrendAccumulator()
+    for part in np.array_split(np.arange(len(df)), 4):
+        merged.merge(SentimentTrendAccumulator().update(df.iloc[part]))
+    
+    assert whole['overall_trend'] == 'declining'
+    _assert_same_trend(chunked.result(), whole)
+    _assert_same_trend(merged.result(), whole)
+
+
+def test_matches_groupby_mean_and_skips_nan_scores():
+    df = _feedback()
+    scores = df['sentiment_score'].astype('float64')
+    expected_daily = scores.groupby(df['date'].dt.date).mean()
+    
+    result = analyze_sentiment_trend(df)
+    
+    assert result['avg_sentiment'] == pytest.approx(scores.mean(), abs=1e-3)
+    assert list(result['daily_sentiment']) == [str(day) for day in expected_daily.index]
+    for day, score in expected_daily.items():
+        assert result['daily_sentiment'][str(day)] == pytest.approx(score, abs=1e-3)
+
+
+def test_day_with_only_nan_scores_is_left_out():
+    df = pd.DataFrame({
+        'date': ['2026-01-01', '2026-01-02', '2026-01-02'],
+        'sentiment_score': [0.5, np.nan, np.nan],
+    })
+    
+    result = SentimentTrendAccumulator().update(df.iloc[:1]).merge(
+        SentimentTrendAccumulator().update(df.iloc[1:])
+    ).result()
+    
+    assert result['daily_sentiment'] == {'2026-01-01': 0.5}
+    assert result['avg_sentiment'] == 0.5
+
+
+def test_empty_accumulator_is_stable():
+    assert SentimentTrendAccumulator().merge(SentimentTrendAccumulator()).result() == analyze_sentiment_trend(pd.DataFrame())